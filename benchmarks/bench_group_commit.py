@@ -0,0 +1,92 @@
+"""Sales per second with one commit per sale versus group commit.
+
+Run with: python -m benchmarks.bench_group_commit [--sales 2000] [--threads 1 8 32] [--window-ms 0 2 5]
+
+Every counter thread records sales through save_sale(); with batching on
+they share transactions through the database's WriteBatcher. Each run
+uses a fresh temporary database with synchronous=FULL (the durable
+profile), where every commit waits for an fsync. One model is given less
+stock than is asked for, to check that no sale is recorded without stock.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from database.inventory_manager import InventoryManager
+from database.storage_profile import StorageProfile
+
+MODELS = [f"Bench {i}" for i in range(8)]
+SCARCE = MODELS[0]
+SCARCE_STOCK = 50
+
+
+def seed(manager, sales):
+    for name in MODELS:
+        manager.save_motorcycle(name, SCARCE_STOCK if name == SCARCE else sales, 500000.0, "bench")
+
+
+def run(sales, threads, window_ms, synchronous):
+    """(sales/s, sales recorded, sales refused, sales per commit) for one configuration"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = InventoryManager(os.path.join(tmp, 'bench.db'),
+                                   profile=StorageProfile(synchronous=synchronous))
+        seed(manager, sales)
+        batcher = manager.db.enable_batching(window_ms=window_ms) if window_ms is not None else None
+        per_thread = max(1, sales // threads)
+        recorded = [0] * threads
+
+        def counter(index):
+            for i in range(per_thread):
+                name = MODELS[(index + i) % len(MODELS)]
+                if manager.save_sale(name, 1, 500000.0, f"Client {index}", "", ""):
+                    recorded[index] += 1
+
+        workers = [threading.Thread(target=counter, args=(i,)) for i in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        stats = batcher.stats() if batcher else None
+        manager.db.disable_batching()
+
+        # Stock must match what was sold, and the scarce model must not be oversold
+        sold = dict(manager.db.execute_query("""
+            SELECT m.name, COALESCE(SUM(s.quantity), 0) FROM motorcycles m
+            LEFT JOIN sales s ON s.motorcycle_id = m.id GROUP BY m.id
+        """))
+        stock = dict(manager.db.execute_query("SELECT name, quantity FROM motorcycles"))
+        manager.close()
+
+    for name in MODELS:
+        initial = SCARCE_STOCK if name == SCARCE else sales
+        if stock[name] < 0 or stock[name] + sold[name] != initial:
+            raise AssertionError(f"stock of {name} is {stock[name]} after selling {sold[name]} of {initial}")
+    done = per_thread * threads
+    total = sum(recorded)
+    per_commit = stats['writes_per_batch'] if stats else 1.0
+    return done / elapsed, total, done - total, per_commit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sales', type=int, default=2000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--window-ms', type=float, nargs='+', default=[0, 2, 5])
+    parser.add_argument('--synchronous', choices=StorageProfile.SYNCHRONOUS_LEVELS, default='full')
+    args = parser.parse_args(argv)
+
+    for threads in args.threads:
+        print(f"{threads} counters, {args.sales} sales, synchronous={args.synchronous}")
+        configurations = [('off', None)] + [(f"on {window:g} ms", window) for window in args.window_ms]
+        for label, window in configurations:
+            per_sec, recorded, refused, per_commit = run(args.sales, threads, window, args.synchronous)
+            print(f"  batching {label:<9} {per_sec:9.0f} sales/s  {recorded:6d} recorded"
+                  f"  {refused:5d} refused  {per_commit:6.1f} per commit")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Bytes per record of the in-memory models, before and after __slots__.
+
+Run with: python -m benchmarks.bench_memory [--records N]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime
+
+from models.movement_store import MovementStore
+from models.sales import Sale, SalesManager
+from models.stock_movement import StockMovement
+
+NAMES = ["Marques", "Ghana", "Ralo", "Saneli", "M. Diallo", "ARSONIC", "H-EXPRESS",
+         "Royale", "KTM 125", "X-1", "Sanya", "Roche", "KTM 150", "Haojue B40",
+         "Benelli AP-150"]
+
+
+class DictMovement:
+    """StockMovement as it was before __slots__ (one __dict__ per instance)"""
+    def __init__(self, motorcycle_name, date, entries=0, outputs=0, price=0.0, comment=""):
+        self.motorcycle_name = motorcycle_name
+        self.date = date
+        self.entries = entries
+        self.outputs = outputs
+        self.price = price
+        self.comment = comment
+
+
+class DictSale:
+    """Sale as it was before __slots__"""
+    def __init__(self, motorcycle_name, quantity, price, client_name="", client_address="", client_phone=""):
+        self.motorcycle_name = motorcycle_name
+        self.quantity = quantity
+        self.price = price
+        self.date = datetime.now()
+        self.client_name = client_name
+        self.client_address = client_address
+        self.client_phone = client_phone
+
+
+def synthetic_movements(count, seed=42):
+    """Raw rows as they come out of sqlite: a fresh name string and timestamp per row"""
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1).timestamp()
+    for _ in range(count):
+        yield (rng.choice(NAMES).encode().decode(), start + rng.randrange(90_000_000),
+               rng.randint(0, 10), rng.randint(0, 5), float(rng.randint(300, 900) * 1000), "")
+
+
+def records(rows):
+    """Rows with the timestamp turned into a datetime, built lazily inside the measurement"""
+    for name, ts, *rest in rows:
+        yield (name, datetime.fromtimestamp(ts), *rest)
+
+
+def measure(build):
+    """Bytes allocated by `build()` and kept alive by its result"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def run(count):
+    rows = list(synthetic_movements(count))
+    results = {}
+
+    def bench(label, build):
+        size, _ = measure(build)
+        results[label] = size / count
+
+    bench('movement_dict', lambda: [DictMovement(*row) for row in records(rows)])
+    bench('movement_slots', lambda: [StockMovement(*row) for row in records(rows)])
+    bench('movement_columnar', lambda: _columnar(records(rows)))
+    bench('sale_dict', lambda: [DictSale(row[0], row[2], row[4], "Client") for row in rows])
+    bench('sale_slots', lambda: [Sale(row[0], row[2], row[4], "Client") for row in rows])
+    bench('sale_columnar', lambda: _sales(rows))
+    return results
+
+
+def _columnar(rows):
+    store = MovementStore()
+    for row in rows:
+        store.append(*row)
+    return store
+
+
+def _sales(rows):
+    manager = SalesManager()
+    for row in rows:
+        manager.record_sale(row[0], row[2], row[4], "Client", "", "")
+    return manager
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    results = run(args.records)
+    print(f"{args.records} records")
+    for label, per_record in results.items():
+        print(f"  {label:<20} {per_record:8.1f} bytes/record")
+    print(f"  movements: {results['movement_dict'] / results['movement_columnar']:.1f}x smaller columnar, "
+          f"{results['movement_dict'] / results['movement_slots']:.1f}x smaller slotted")
+    print(f"  sales: {results['sale_dict'] / results['sale_columnar']:.1f}x smaller columnar")
+
+
+if __name__ == '__main__':
+    main()
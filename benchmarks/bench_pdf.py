@@ -0,0 +1,57 @@
+"""Reports per second and file size, with the table header stamped from a form or drawn on every page.
+
+Run with: python -m benchmarks.bench_pdf [--rows N] [--repeat N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.letterhead import Letterhead
+from utils.pdf_generator import PDFGenerator
+
+NAMES = ["Ghana", "Ralo", "Saneli", "ARSONIC", "H-EXPRESS", "Royale", "KTM 125", "Haojue B40"]
+
+
+def sales(count):
+    """Sale dicts as yielded by InventoryManager.iter_sales(), a few per day"""
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        quantity = 1 + i % 3
+        price = 450000.0 + 25000 * (i % 7)
+        yield {'date': (start + timedelta(hours=7 * i)).strftime('%Y-%m-%d %H:%M'),
+               'motorcycle': NAMES[i % len(NAMES)], 'client': f"Client {i % 50}",
+               'quantity': quantity, 'price': price, 'total': quantity * price}
+
+
+def run(rows, repeat, use_forms):
+    Letterhead.use_forms = use_forms
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'rapport.pdf')
+            started = time.perf_counter()
+            for _ in range(repeat):
+                PDFGenerator.generate_sales_report_range(datetime(2024, 1, 1), datetime(2024, 12, 31),
+                                                         sales(rows), filename)
+            elapsed = time.perf_counter() - started
+            return repeat / elapsed, os.path.getsize(filename)
+    finally:
+        Letterhead.use_forms = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[50, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for rows in args.rows:
+        print(f"report of {rows} rows")
+        for label, use_forms in (('direct', False), ('forms', True)):
+            per_sec, size = run(rows, args.repeat, use_forms)
+            print(f"  {label:<7} {per_sec:8.2f} reports/s  {size:9d} bytes")
+
+
+if __name__ == '__main__':
+    main()
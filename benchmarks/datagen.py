@@ -0,0 +1,187 @@
+"""Synthetic inventory.db datasets of any size, identical for a given seed.
+
+Run with: python -m benchmarks.datagen OUT.db [--models 60] [--sales 100000] [--movements 5000] [--days 730] [--seed 42]
+
+Models follow a skewed popularity (a few sell most), sales fall in shop
+hours and more on Saturdays, prices drift over time, and deliveries
+arrive on a schedule with an extra delivery whenever a model would run
+out, so stock never goes negative at any point of the history. Dates end
+on a fixed day so that the same seed always gives the same file.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from database.db_manager import DatabaseManager
+from database.inventory_manager import InventoryManager
+from database.stock_ledger import StockLedger
+
+END_DATE = date(2025, 12, 31)
+BRANDS = ["Haojue", "KTM", "Benelli", "Sanya", "Royale", "Jakarta", "Apsonic", "TVS",
+          "Bajaj", "Lifan", "Yamaha", "Honda", "Suzuki", "Dayun", "Kymco"]
+FIRST_NAMES = ["Amadou", "Aminata", "Oumar", "Fatoumata", "Moussa", "Mariam", "Ibrahim",
+               "Awa", "Seydou", "Kadiatou", "Boubacar", "Hawa", "Souleymane", "Rokia"]
+LAST_NAMES = ["Touré", "Traoré", "Diallo", "Coulibaly", "Keïta", "Maïga", "Cissé",
+              "Sangaré", "Konaté", "Dembélé", "Sidibé", "Haïdara"]
+QUARTERS = ["1er Quartier", "2eme Quartier", "3eme Quartier", "4eme Quartier",
+            "5eme Quartier", "Château", "Sossokoira", "Aljanabandja"]
+
+
+def model_names(count):
+    """The models seeded by the first migration first, then generated brand/model names"""
+    names = ["Marques", "Ghana", "Ralo", "Saneli", "M. Diallo", "ARSONIC", "H-EXPRESS", "Royale",
+             "KTM 125", "X-1", "Sanya", "Roche", "KTM 150", "Haojue B40", "Benelli AP-150"]
+    i = 0
+    while len(names) < count:
+        names.append(f"{BRANDS[i % len(BRANDS)]} {100 + 5 * (i // len(BRANDS))}")
+        i += 1
+    return names[:count]
+
+
+def generate(path, models=60, sales=100_000, movements=5_000, days=730, seed=42, clients=2_000):
+    """Write a new dataset to `path` (which must not exist); returns a summary dict"""
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    first_day = datetime.combine(END_DATE - timedelta(days=days - 1), datetime.min.time())
+
+    names = model_names(models)
+    # Zipf-like popularity and a base price per model
+    weights = [1.0 / (rank + 1) ** 0.9 for rank in range(models)]
+    rng.shuffle(weights)
+    base_prices = [rng.randrange(350_000, 1_500_000, 5_000) for _ in names]
+    client_pool = [(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    f"{rng.choice(QUARTERS)}, Gao",
+                    f"+223 {rng.randrange(60, 100)} {rng.randrange(10, 100)} {rng.randrange(10, 100)} "
+                    f"{rng.randrange(10, 100)}") for _ in range(clients)]
+
+    def price_on(model, moment):
+        # About +8% a year, rounded to 5 000 FCFA
+        years = (moment - first_day).days / 365.0
+        return round(base_prices[model] * (1 + 0.08 * years) / 5000) * 5000.0
+
+    def shop_time(day_offset):
+        return first_day + timedelta(days=day_offset, hours=rng.randint(8, 18),
+                                     minutes=rng.randint(0, 59), seconds=rng.randint(0, 59))
+
+    # Sales: Saturdays are busier than other days
+    day_weights = [1.6 if (first_day + timedelta(days=d)).weekday() == 5 else 1.0 for d in range(days)]
+    sale_rows = []
+    for model, day in zip(rng.choices(range(models), weights, k=sales),
+                          rng.choices(range(days), day_weights, k=sales)):
+        moment = shop_time(day)
+        quantity = 1 if rng.random() < 0.85 else rng.randint(2, 4)
+        sale_rows.append((moment, model, quantity, price_on(model, moment) * rng.uniform(0.97, 1.0),
+                          rng.choice(client_pool)))
+    sale_rows.sort(key=lambda row: row[0])
+
+    # Scheduled deliveries, proportional to popularity
+    scheduled = {}
+    for model, day in zip(rng.choices(range(models), weights, k=movements),
+                          (rng.randrange(days) for _ in range(movements))):
+        scheduled.setdefault(model, []).append(shop_time(day).replace(hour=7))
+    for deliveries in scheduled.values():
+        deliveries.sort()
+
+    # Replay each model in time order, adding a delivery before any sale it could not cover
+    expected = {model: sales * weights[model] / sum(weights) for model in range(models)}
+    movement_rows = []
+    balances = [0] * models
+    pending = {model: list(reversed(deliveries)) for model, deliveries in scheduled.items()}
+
+    def deliver(model, moment, comment):
+        lot = max(5, int(expected[model] / max(1, len(scheduled.get(model, ()))) * rng.uniform(0.8, 1.2)))
+        movement_rows.append((moment, model, lot, price_on(model, moment) * 0.8, comment))
+        balances[model] += lot
+
+    for moment, model, quantity, _, _ in sale_rows:
+        queue = pending.get(model)
+        while queue and queue[-1] <= moment:
+            deliver(model, queue.pop(), "Livraison")
+        while balances[model] < quantity:
+            deliver(model, moment - timedelta(hours=1), "Réapprovisionnement")
+        balances[model] -= quantity
+    for model, queue in pending.items():
+        while queue:
+            deliver(model, queue.pop(), "Livraison")
+    movement_rows.sort(key=lambda row: row[0])
+
+    db = DatabaseManager(path)
+    try:
+        with db.transaction() as cursor:
+            cursor.execute("DELETE FROM motorcycles")
+            cursor.executemany(
+                "INSERT INTO motorcycles (id, name, quantity, price, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(model + 1, name, balances[model], price_on(model, first_day + timedelta(days=days)),
+                  first_day.strftime('%Y-%m-%d %H:%M:%S')) for model, name in enumerate(names)])
+            cursor.executemany("""
+                INSERT INTO inventory_movements (motorcycle_id, entries, outputs, price, comment, movement_date)
+                VALUES (?, ?, 0, ?, ?, ?)
+            """, [(model + 1, lot, round(price), comment, moment.strftime('%Y-%m-%d %H:%M:%S'))
+                  for moment, model, lot, price, comment in movement_rows])
+            cursor.executemany("""
+                INSERT INTO sales (motorcycle_id, quantity, price, client_name, client_address,
+                                   client_phone, sale_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(model + 1, quantity, round(price, -3), client[0], client[1], client[2],
+                   moment.strftime('%Y-%m-%d %H:%M:%S'))
+                  for moment, model, quantity, price, client in sale_rows])
+            StockLedger(db).backfill(cursor)
+            # Generated history is not a backlog of changes: a sync target starts from a snapshot
+            cursor.execute("DELETE FROM sync_changes")
+    finally:
+        db.close()
+
+    manager = InventoryManager(path)
+    try:
+        manager.rebuild_daily_stock()
+    finally:
+        manager.close()
+
+    return {
+        'path': str(path),
+        'seed': seed,
+        'models': models,
+        'sales': len(sale_rows),
+        'movements': len(movement_rows),
+        'days': days,
+        'first_day': first_day.date().isoformat(),
+        'last_day': END_DATE.isoformat(),
+        'seconds': round(time.perf_counter() - started, 2),
+        'bytes': os.path.getsize(path),
+    }
+
+
+def dataset(directory, models=60, sales=100_000, movements=5_000, days=730, seed=42):
+    """Path of a cached dataset in `directory`, generated on first use"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"bench_m{models}_s{sales}_v{movements}_d{days}_r{seed}.db")
+    if not os.path.exists(path):
+        partial = path + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        generate(partial, models=models, sales=sales, movements=movements, days=days, seed=seed)
+        os.replace(partial, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('out', help="new database file")
+    parser.add_argument('--models', type=int, default=60)
+    parser.add_argument('--sales', type=int, default=100_000)
+    parser.add_argument('--movements', type=int, default=5_000, help="scheduled deliveries")
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+    summary = generate(args.out, models=args.models, sales=args.sales, movements=args.movements,
+                       days=args.days, seed=args.seed)
+    print(f"{summary['path']}: {summary['models']} models, {summary['sales']} sales, "
+          f"{summary['movements']} movements in {summary['seconds']} s ({summary['bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Requests per second and latency percentiles of the local HTTP service.
+
+Run with: python -m benchmarks.load_test [--url http://127.0.0.1:8765] [--clients 16] [--requests 5000]
+
+Without --url, a service is started in-process on a temporary database
+seeded with stock, so the run never touches inventory.db.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from service.server import InventoryService
+
+READ_PATHS = ('/inventory', '/motorcycles', '/sales', '/reports/summary')
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def request(reader, writer, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else b''
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: load-test\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+                 .encode() + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, count, write_ratio, models, latencies, statuses, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            if rng.random() < write_ratio:
+                kind, method, path = 'write', 'POST', '/sales'
+                body = {'name': rng.choice(models), 'quantity': 1, 'price': 500000,
+                        'client_name': "Client test"}
+            else:
+                kind, method, path, body = 'read', 'GET', rng.choice(READ_PATHS), None
+            started = time.perf_counter()
+            status = await request(reader, writer, method, path, body)
+            latencies[kind].append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, clients, total, write_ratio, models, seed=42):
+    latencies = {'read': [], 'write': []}
+    statuses = {}
+    per_client = max(1, total // clients)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_client, write_ratio, models, latencies, statuses,
+                                  random.Random(seed + i))
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    return elapsed, latencies, statuses
+
+
+def seed_database(path, models):
+    from database.inventory_manager import InventoryManager
+    manager = InventoryManager(path)
+    for name in models:
+        manager.save_motorcycle(name, 1_000_000, 500000.0, "stock de test")
+    manager.close()
+
+
+async def main_async(args):
+    models = [f"Test {i}" for i in range(10)]
+    service = tmp = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, 'load_test.db')
+        seed_database(db_path, models)
+        service = InventoryService(db_path, readers=args.readers, window_ms=args.window_ms)
+        host, port = await service.start('127.0.0.1', 0)
+
+    try:
+        elapsed, latencies, statuses = await run(host, port, args.clients, args.requests,
+                                                 args.write_ratio, models)
+    finally:
+        if service is not None:
+            group_commit = service.batcher.stats()
+            await service.stop()
+            tmp.cleanup()
+
+    done = sum(len(v) for v in latencies.values())
+    print(f"{done} requests, {args.clients} clients, {elapsed:.2f} s: {done / elapsed:.0f} req/s")
+    for kind, values in latencies.items():
+        if values:
+            print(f"  {kind:<5} {len(values):>6}  p50 {percentile(values, 0.50) * 1000:7.2f} ms"
+                  f"  p99 {percentile(values, 0.99) * 1000:7.2f} ms")
+    print(f"  status codes: {dict(sorted(statuses.items()))}")
+    if service is not None and group_commit['batches']:
+        print(f"  group commit: {group_commit['writes']} sales in {group_commit['batches']} transactions "
+              f"({group_commit['writes_per_batch']:.1f} per commit)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="existing service, whose stock must have models 'Test 0'..'Test 9'; "
+                                      "default: start one on a temporary database")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--write-ratio', type=float, default=0.3, help="share of POST /sales")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--window-ms', type=float, default=0, help="group commit window of the in-process service")
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""Timings of the main operations on a synthetic dataset, as JSON, compared with a baseline.
+
+Run with: python -m benchmarks.suite [--sales 100000] [--repeat 5] [--out results.json]
+                                     [--baseline baseline.json] [--save-baseline baseline.json]
+
+Datasets come from benchmarks.datagen and are cached in --data-dir. Each
+run works on a fresh copy so writes never leak into the next run. With
+--baseline, every benchmark whose median is more than --tolerance slower
+than the baseline is reported and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.datagen import END_DATE, dataset
+from database.inventory_manager import InventoryManager
+
+
+class Context:
+    """What a benchmark gets: a manager on a private copy of the dataset and a scratch directory"""
+
+    def __init__(self, manager, tmp, repeat_index):
+        self.manager = manager
+        self.tmp = tmp
+        self.repeat_index = repeat_index
+        self.end = datetime.combine(END_DATE, datetime.min.time())
+
+    def model_names(self):
+        return self.manager.list_motorcycle_names()
+
+
+def bench_get_inventory(ctx):
+    ctx.manager.cache.clear()
+    ctx.manager.get_inventory()
+    return 1
+
+
+def bench_get_sales_report(ctx):
+    """Count and first page of a month of sales, as the Rapports tab does"""
+    ctx.manager.cache.clear()
+    start = (ctx.end - timedelta(days=29)).date()
+    ctx.manager.count_sales_report(start, ctx.end.date())
+    ctx.manager.get_sales_report(start, limit=200, offset=0, end=ctx.end.date())
+    return 1
+
+
+def bench_save_sale(ctx, count=200):
+    names = ctx.model_names()
+    for i in range(count):
+        ctx.manager.save_sale(names[i % len(names)], 1, 500000.0, "Client benchmark", "Gao", "")
+    return count
+
+
+def bench_save_motorcycle(ctx, count=200):
+    names = ctx.model_names()
+    for i in range(count):
+        ctx.manager.save_motorcycle(names[i % len(names)], 3, 450000.0, "Livraison benchmark")
+    return count
+
+
+def bench_delete_motorcycle(ctx):
+    """Delete one model with its whole history (a different one on each repeat)"""
+    names = sorted(ctx.model_names())
+    ctx.manager.delete_motorcycle(names[ctx.repeat_index % len(names)])
+    return 1
+
+
+def bench_daily_movements(ctx):
+    """Inventory.get_daily_movements() over the last 30 days of movements and sales"""
+    from models.inventory import Inventory
+
+    start = (ctx.end - timedelta(days=29)).strftime('%Y-%m-%d')
+    rows = ctx.manager.db.execute_query("""
+        SELECT m.name, i.movement_date, i.entries, 0, i.price, i.comment
+        FROM inventory_movements i JOIN motorcycles m ON m.id = i.motorcycle_id
+        WHERE i.movement_date >= ?
+        UNION ALL
+        SELECT m.name, s.sale_date, 0, s.quantity, s.price, ''
+        FROM sales s JOIN motorcycles m ON m.id = s.motorcycle_id
+        WHERE s.sale_date >= ?
+        ORDER BY 2
+    """, (start, start))
+    inventory = Inventory()
+    for name, moment, entries, outputs, price, comment in rows:
+        inventory.add_movement(name, datetime.fromisoformat(moment), entries, outputs, price, comment)
+    inventory.get_daily_movements()
+    return 1
+
+
+def bench_stock_at(ctx, count=1000):
+    """Point-in-time stock seeks in the stock ledger"""
+    names = ctx.model_names()
+    for i in range(count):
+        ctx.manager.get_stock_at(names[i % len(names)], ctx.end - timedelta(hours=7 * i))
+    return count
+
+
+def bench_pdf_report(ctx):
+    """Sales report PDF of the last 30 days"""
+    from utils.pdf_generator import PDFGenerator
+
+    start = ctx.end - timedelta(days=29)
+    PDFGenerator.generate_sales_report_range(start, ctx.end, ctx.manager.iter_sales(start, ctx.end),
+                                             os.path.join(ctx.tmp, 'rapport.pdf'))
+    return 1
+
+
+def bench_invoices(ctx, count=50):
+    from utils.invoice_generator import InvoiceGenerator
+
+    start = ctx.end - timedelta(days=29)
+    sales = ctx.manager.get_sales_for_invoices(start=start, end=ctx.end)[:count]
+    for sale in sales:
+        InvoiceGenerator.generate_invoice(sale, output_dir=ctx.tmp)
+    return len(sales)
+
+
+BENCHMARKS = {
+    'get_inventory': bench_get_inventory,
+    'get_sales_report': bench_get_sales_report,
+    'save_sale': bench_save_sale,
+    'save_motorcycle': bench_save_motorcycle,
+    'delete_motorcycle': bench_delete_motorcycle,
+    'inventory.get_daily_movements': bench_daily_movements,
+    'stock_at': bench_stock_at,
+    'pdf_report': bench_pdf_report,
+    'invoices': bench_invoices,
+}
+
+
+def run_benchmark(fn, source, repeat):
+    """Median, min and per-operation time of `fn` over `repeat` runs, each on a fresh copy"""
+    timings = []
+    ops = 0
+    for index in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            shutil.copyfile(source, path)
+            manager = InventoryManager(path)
+            try:
+                ctx = Context(manager, tmp, index)
+                started = time.perf_counter()
+                ops = fn(ctx)
+                timings.append(time.perf_counter() - started)
+            finally:
+                manager.close()
+    median = statistics.median(timings)
+    return {
+        'ops': ops,
+        'runs_s': [round(t, 6) for t in timings],
+        'median_s': round(median, 6),
+        'min_s': round(min(timings), 6),
+        'per_op_ms': round(median / max(ops, 1) * 1000, 4),
+        'ops_per_s': round(ops / median, 1) if median else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """(name, baseline median, median, ratio) for every benchmark slower than the tolerance allows"""
+    regressions = []
+    for name, result in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('median_s'):
+            continue
+        ratio = result['median_s'] / previous['median_s']
+        if ratio > 1 + tolerance:
+            regressions.append((name, previous['median_s'], result['median_s'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'gestionmoto-bench'),
+                        help="where generated datasets are cached")
+    parser.add_argument('--models', type=int, default=60)
+    parser.add_argument('--sales', type=int, default=100_000)
+    parser.add_argument('--movements', type=int, default=5_000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument('--out', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare with a results file from an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="slowdown over the baseline reported as a regression (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', help="also write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    source = dataset(args.data_dir, models=args.models, sales=args.sales, movements=args.movements,
+                     days=args.days, seed=args.seed)
+    print(f"dataset {source} ready in {time.perf_counter() - started:.1f} s")
+
+    results = {
+        'meta': {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'dataset': {'models': args.models, 'sales': args.sales, 'movements': args.movements,
+                        'days': args.days, 'seed': args.seed},
+        },
+        'results': {},
+    }
+    for name in args.only or BENCHMARKS:
+        result = run_benchmark(BENCHMARKS[name], source, args.repeat)
+        results['results'][name] = result
+        print(f"  {name:<32} {result['median_s'] * 1000:10.2f} ms  {result['per_op_ms']:10.3f} ms/op"
+              f"  ({result['ops']} ops)")
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('meta', {}).get('dataset') != results['meta']['dataset']:
+        print("warning: the baseline was measured on a different dataset")
+    regressions = compare(results, baseline, args.tolerance)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms (x{ratio:.2f})")
+    if not regressions:
+        print(f"no regression over {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+from pathlib import Path
+from .query_stats import InstrumentedConnection
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a closed pool"""
+
+
+class ConnectionPool:
+    """Pool of long-lived sqlite3 connections shared between callers.
+
+    Two modes are supported:
+      - 'pooled': up to `size` connections are opened lazily and handed out
+        to any thread; callers block (up to `timeout` seconds) when all of
+        them are checked out.
+      - 'thread_local': each thread keeps its own long-lived connection,
+        which is reused for every call made from that thread. Connections
+        of threads that have exited are closed the next time a thread
+        opens one, and all of them by close().
+
+    A read-only pool opens its connections with `mode=ro` so they can never
+    take the write lock. `profile` is a StorageProfile applied to every new
+    connection. With a QueryStats as `query_stats`, connections time every
+    statement into it.
+    """
+
+    MODES = ('pooled', 'thread_local')
+
+    def __init__(self, db_path, size=5, mode='pooled', timeout=30.0, health_check=True,
+                 read_only=False, profile=None, query_stats=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown pool mode: {mode}")
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = str(db_path)
+        self.size = size
+        self.mode = mode
+        self.timeout = timeout
+        self.health_check = health_check
+        self.read_only = read_only
+        self.profile = profile
+        self.query_stats = query_stats
+
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._all = set()
+        # Connections being opened in 'pooled' mode, counted against `size`
+        self._opening = 0
+        # Owning thread of each 'thread_local' connection
+        self._owners = {}
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self):
+        """Open a new connection and register it with the pool"""
+        factory = sqlite3.Connection if self.query_stats is None else InstrumentedConnection
+        if self.read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.timeout, check_same_thread=False,
+                                   factory=factory)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                                   factory=factory)
+        if self.query_stats is not None:
+            conn.query_stats = self.query_stats
+        conn.row_factory = sqlite3.Row
+        if self.profile is not None:
+            self.profile.apply(conn, read_only=self.read_only)
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection and forget about it"""
+        with self._lock:
+            self._all.discard(conn)
+            self._owners.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _is_healthy(self, conn):
+        """Cheap round trip to make sure the connection is still usable"""
+        if not self.health_check:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _acquire_pooled(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                # Check and reserve the slot together, so concurrent callers never exceed `size`
+                with self._lock:
+                    can_open = len(self._all) + self._opening < self.size
+                    if can_open:
+                        self._opening += 1
+                if can_open:
+                    try:
+                        return self._connect()
+                    finally:
+                        with self._lock:
+                            self._opening -= 1
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No database connection available after {self.timeout}s"
+                    )
+            if self._closed:
+                self._discard(conn)
+                raise PoolClosedError("Connection pool is closed")
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def _acquire_thread_local(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and not self._is_healthy(conn):
+            self._discard(conn)
+            conn = None
+        if conn is None:
+            self._close_orphans()
+            conn = self._connect()
+            with self._lock:
+                self._owners[conn] = threading.current_thread()
+            self._local.conn = conn
+        return conn
+
+    def _close_orphans(self):
+        """Close the 'thread_local' connections of threads that have exited"""
+        with self._lock:
+            orphans = [conn for conn, thread in self._owners.items() if not thread.is_alive()]
+            for conn in orphans:
+                del self._owners[conn]
+        for conn in orphans:
+            self._discard(conn)
+
+    def acquire(self):
+        """Check out a connection"""
+        if self._closed:
+            raise PoolClosedError("Connection pool is closed")
+        if self.mode == 'thread_local':
+            return self._acquire_thread_local()
+        return self._acquire_pooled()
+
+    def release(self, conn):
+        """Return a connection to the pool"""
+        if self.mode == 'thread_local':
+            if self._closed:
+                self._discard(conn)
+            return
+        if self._closed or conn.in_transaction and not self._rollback(conn):
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _rollback(self, conn):
+        """Roll back anything a caller left open; False if the connection is broken"""
+        try:
+            conn.rollback()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """Number of open and idle connections"""
+        with self._lock:
+            return {'open': len(self._all), 'idle': self._idle.qsize(), 'size': self.size}
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        with self._lock:
+            self._closed = True
+            conns = list(self._all)
+            self._all.clear()
+            self._owners.clear()
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
@@ -1,32 +1,188 @@
-import sqlite3
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
+from .connection_pool import ConnectionPool
+from .migrator import MigrationError, Migrator
+from .storage_profile import StorageProfile
+from .write_batcher import WriteBatcher
 
 class DatabaseManager:
-    def __init__(self, db_path='inventory.db'):
+    def __init__(self, db_path='inventory.db', pool_size=5, pool_mode='pooled', profile=None,
+                 query_stats=None):
         self.db_path = Path(db_path)
-        self.init_database()
-    
+        self.profile = profile or StorageProfile()
+        # Optional QueryStats timing every statement (see query_stats.py)
+        self.query_stats = query_stats
+        self.checkpoints = self.profile.checkpoint_policy()
+        self.migrator = Migrator()
+        # Versions applied by init_database, so callers can backfill what they added
+        self.migrations_applied = []
+        self.schema_upgraded = False
+        self.batcher = None
+
+        # SQLite only ever has one writer: a single write connection, and a
+        # separate read-only pool so long report reads never hold up a sale.
+        self.write_pool = ConnectionPool(self.db_path, size=1, mode='pooled',
+                                         profile=self.profile, query_stats=query_stats)
+        try:
+            self.init_database()
+        except BaseException:
+            self.write_pool.close()
+            raise
+        if str(db_path) == ':memory:':
+            # Every ':memory:' connection is a distinct database
+            self.read_pool = self.write_pool
+            self.watch_pool = None
+        else:
+            self.read_pool = ConnectionPool(self.db_path, size=pool_size, mode=pool_mode,
+                                            read_only=True, profile=self.profile,
+                                            query_stats=query_stats)
+            # One connection always, as data_version is only comparable on the same one
+            self.watch_pool = ConnectionPool(self.db_path, size=1, mode='pooled',
+                                             read_only=True, profile=self.profile)
+
     def init_database(self):
-        """Initialize database with schema"""
+        """Apply pending schema migrations; does nothing when PRAGMA user_version is current.
+
+        Raises MigrationError when the schema cannot be trusted (an applied
+        migration was edited, or the database is newer than this code):
+        the application must not start on it.
+        """
         try:
-            with open('database/schema.sql', 'r') as f:
-                schema = f.read()
-                
-            with sqlite3.connect(self.db_path) as conn:
-                conn.executescript(schema)
+            with self.write_pool.connection() as conn:
+                self.migrations_applied = self.migrator.migrate(conn)
+                self.schema_upgraded = bool(self.migrations_applied)
+        except MigrationError:
+            raise
         except Exception as e:
             print(f"Error initializing database: {e}")
-    
-    def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+
+    def build_pending_indexes(self):
+        """Build the indexes that online migrations deferred on a large database"""
+        try:
+            with self.write_pool.connection() as conn:
+                return self.migrator.build_pending(conn)
+        except Exception as e:
+            print(f"Error building indexes: {e}")
+            return []
+
+    def get_connection(self, read_only=False):
+        """Get a pooled database connection (use as a context manager)"""
+        if read_only:
+            return self.read_pool.connection()
+        return self.write_pool.connection()
+
+    @contextmanager
+    def transaction(self):
+        """Run several statements as one transaction on the write connection.
+
+        Yields a cursor; commits when the block exits normally and rolls back
+        if it raises. This holds the write connection for the whole block:
+        application writes go through run_write() so that, with batching
+        enabled, they join the group commit instead of waiting for it.
+        """
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn.cursor()
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            self._after_commit(conn)
+
+    def enable_batching(self, window_ms=5, max_batch=100):
+        """Switch writes to group commit: see WriteBatcher"""
+        if self.batcher is None:
+            self.batcher = WriteBatcher(self, window_ms=window_ms, max_batch=max_batch)
+        return self.batcher
+
+    def disable_batching(self):
+        """Flush queued writes and go back to one commit per write"""
+        if self.batcher is not None:
+            batcher, self.batcher = self.batcher, None
+            batcher.close()
+
+    def submit_write(self, write, on_commit=None):
+        """Run `write(cursor)` in a transaction; returns a Future of its result.
+
+        With batching enabled the write is queued for the next group
+        commit; otherwise it is committed right away and the returned
+        future is already done.
+        """
+        if self.batcher is not None:
+            return self.batcher.submit(write, on_commit)
+        future = Future()
+        try:
+            with self.transaction() as cursor:
+                result = write(cursor)
+            if on_commit is not None:
+                on_commit(result)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def run_write(self, write):
+        """Run `write(cursor)` in a transaction and return its result, raising what it raises.
+
+        With batching enabled the write joins the next group commit, in
+        its own savepoint.
+        """
+        return self.submit_write(write).result()
+
+    def data_version(self):
+        """Token that changes after every commit to the file, by this process or another.
+
+        PRAGMA data_version of a dedicated connection, which moves whenever
+        another connection commits. None for ':memory:', which no other
+        connection can write.
+        """
+        if self.watch_pool is None:
+            return None
+        try:
+            with self.watch_pool.connection() as conn:
+                return id(conn), conn.execute("PRAGMA data_version").fetchone()[0]
+        except Exception as e:
+            print(f"Error reading data version: {e}")
+            return object()  # Never equal to a stored token: nothing is served from cache
+
+    def checkpoint(self, mode=None):
+        """Fold the WAL back into the database file"""
+        if self.profile.journal_mode != 'wal':
+            return None
+        try:
+            with self.write_pool.connection() as conn:
+                return tuple(conn.execute(
+                    f"PRAGMA wal_checkpoint({mode or self.profile.checkpoint_mode})"
+                ).fetchone())
+        except Exception as e:
+            print(f"Error running checkpoint: {e}")
+            return None
+
+    def _after_commit(self, conn):
+        """Run the checkpoint policy on the write connection after a commit"""
+        if self.checkpoints.record_write():
+            try:
+                conn.execute(f"PRAGMA wal_checkpoint({self.checkpoints.mode})")
+            except Exception as e:
+                print(f"Error running checkpoint: {e}")
+
+    def close(self):
+        """Checkpoint the WAL and close every pooled connection"""
+        self.disable_batching()
+        if self.read_pool is not self.write_pool:
+            self.read_pool.close()
+        if self.watch_pool is not None:
+            self.watch_pool.close()
+        if str(self.db_path) != ':memory:':
+            self.checkpoint('TRUNCATE')
+        self.write_pool.close()
 
     def execute_query(self, query, params=None):
         """Execute a query and return results"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(read_only=True) as conn:
                 cursor = conn.cursor()
                 if params:
                     cursor.execute(query, params)
@@ -37,16 +193,42 @@ class DatabaseManager:
             print(f"Error executing query: {e}")
             return []
 
+    def iter_query(self, query, params=None, chunk_size=500):
+        """Stream the rows of a query in chunks of `chunk_size`.
+
+        The read connection stays checked out until the generator is
+        exhausted or closed, so consume it promptly.
+        """
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
     def execute_update(self, query, params=None):
         """Execute an update query within a transaction"""
+        if self.batcher is not None:
+            try:
+                self.batcher.submit(lambda cursor: cursor.execute(query, params or ())).result()
+                return True
+            except Exception as e:
+                print(f"Error executing update: {e}")
+                return False
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                conn.commit()
+                with conn:
+                    cursor = conn.cursor()
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                self._after_commit(conn)
                 return True
         except Exception as e:
             print(f"Error executing update: {e}")
@@ -54,13 +236,24 @@ class DatabaseManager:
 
     def execute_transaction(self, queries):
         """Execute multiple queries in a single transaction"""
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
+        if self.batcher is not None:
+            def write(cursor):
                 for query, params in queries:
                     cursor.execute(query, params)
-                conn.commit()
+            try:
+                self.batcher.submit(write).result()
+                return True
+            except Exception as e:
+                print(f"Error executing transaction: {e}")
+                return False
+        try:
+            with self.get_connection() as conn:
+                with conn:
+                    cursor = conn.cursor()
+                    for query, params in queries:
+                        cursor.execute(query, params)
+                self._after_commit(conn)
                 return True
         except Exception as e:
             print(f"Error executing transaction: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -1,12 +1,56 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from .db_manager import DatabaseManager
+from .query_cache import QueryCache
+from .sales_analytics import SalesAnalytics
+from .stock_ledger import StockLedger
+
+class InsufficientStockError(Exception):
+    """Raised inside a transaction to roll it back when stock is too low"""
 
 class InventoryManager:
-    def __init__(self, db_path):
-        self.db = DatabaseManager(db_path)
+    # Tables each write touches, used to invalidate the read cache
+    SALE_TABLES = ('motorcycles', 'sales', 'daily_stock', 'stock_ledger')
+    ENTRY_TABLES = ('motorcycles', 'inventory_movements', 'daily_stock', 'stock_ledger')
+    ALL_TABLES = ('motorcycles', 'inventory_movements', 'sales', 'daily_stock', 'stock_ledger')
+
+    INSERT_SALE = """
+        INSERT INTO sales (
+            motorcycle_id, quantity, price,
+            client_name, client_address, client_phone
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+    UPSERT_DAILY_STOCK = """
+        INSERT INTO daily_stock (motorcycle_id, day, opening, entries, outputs, closing)
+        SELECT id, DATE('now'), quantity - ? + ?, ?, ?, quantity
+        FROM motorcycles WHERE id = ?
+        ON CONFLICT(motorcycle_id, day) DO UPDATE SET
+            entries = entries + excluded.entries,
+            outputs = outputs + excluded.outputs,
+            closing = excluded.closing
+    """
+
+    def __init__(self, db_path, pool_size=5, pool_mode='pooled', profile=None, query_stats=None):
+        self.db = DatabaseManager(db_path, pool_size=pool_size, pool_mode=pool_mode,
+                                  profile=profile, query_stats=query_stats)
+        self.cache = QueryCache(version=self.db.data_version)
+        self.analytics = SalesAnalytics(self.db, self.cache)
+        self.ledger = StockLedger(self.db)
+        # Backfill the tables added by migrations 1 (daily_stock) and 2 (stock_ledger)
+        if 1 in self.db.migrations_applied:
+            self._ensure_daily_stock()
+        if 2 in self.db.migrations_applied:
+            self._ensure_stock_ledger()
+
+    def close(self):
+        """Release the database connections held by this manager"""
+        self.db.close()
     
     def get_inventory(self):
-        """Get current inventory with movements"""
+        """Get current inventory, one row per motorcycle with its movements aggregated"""
+        return self.cache.get_or_compute(('inventory',), self.ALL_TABLES, self._load_inventory)
+
+    def _load_inventory(self):
         query = """
             SELECT 
                 m.name,
@@ -14,10 +58,22 @@ class InventoryManager:
                 m.price,
                 COALESCE(im.entries, 0) as entries,
                 COALESCE(im.outputs, 0) + COALESCE(s.total_sold, 0) as outputs,
-                COALESCE(im.comment, '') as comment,
-                COALESCE(im.movement_date, m.created_at) as date
+                COALESCE((
+                    SELECT comment FROM inventory_movements
+                    WHERE motorcycle_id = m.id
+                    ORDER BY movement_date DESC, id DESC
+                    LIMIT 1
+                ), '') as comment,
+                COALESCE(im.last_date, m.created_at) as date
             FROM motorcycles m
-            LEFT JOIN inventory_movements im ON m.id = im.motorcycle_id
+            LEFT JOIN (
+                SELECT motorcycle_id,
+                       SUM(entries) as entries,
+                       SUM(outputs) as outputs,
+                       MAX(movement_date) as last_date
+                FROM inventory_movements
+                GROUP BY motorcycle_id
+            ) im ON m.id = im.motorcycle_id
             LEFT JOIN (
                 SELECT motorcycle_id, SUM(quantity) as total_sold
                 FROM sales
@@ -52,100 +108,512 @@ class InventoryManager:
             print(f"Error getting inventory: {e}")
             return []
 
-    def save_sale(self, motorcycle_name, quantity, price, client_name, client_address, client_phone):
-        """Record a sale in database"""
+    def list_motorcycle_names(self):
+        """Names of all motorcycles, alphabetically, for pickers"""
+        return self.cache.get_or_compute(('motorcycle_names',), ('motorcycles',), lambda: [
+            row[0] for row in self.db.execute_query("SELECT name FROM motorcycles ORDER BY name")
+        ])
+
+    def get_inventory_ledger(self, motorcycle_name=None, limit=100, offset=0):
+        """Detailed ledger: one row per stock entry or sale, newest first, paginated"""
+        query = """
+            SELECT date, motorcycle, entries, outputs, price, comment FROM (
+                SELECT im.id, im.movement_date as date, m.name as motorcycle,
+                       im.entries, im.outputs, im.price, COALESCE(im.comment, '') as comment
+                FROM inventory_movements im
+                JOIN motorcycles m ON m.id = im.motorcycle_id
+                {where}
+                UNION ALL
+                SELECT s.id, s.sale_date as date, m.name as motorcycle,
+                       0 as entries, s.quantity as outputs, s.price, s.client_name as comment
+                FROM sales s
+                JOIN motorcycles m ON m.id = s.motorcycle_id
+                {where}
+            )
+            ORDER BY date DESC, id DESC
+            LIMIT ? OFFSET ?
+        """
+        params = []
+        where = ""
+        if motorcycle_name:
+            where = "WHERE m.name = ?"
+            params = [motorcycle_name, motorcycle_name]
+        params += [limit, offset]
+
         try:
-            # First get motorcycle id
-            query = "SELECT id, quantity FROM motorcycles WHERE name = ?"
-            results = self.db.execute_query(query, (motorcycle_name,))
-            if not results:
-                return False
-                
-            motorcycle_id, current_quantity = results[0]
-            
-            if current_quantity < quantity:
-                return False
-                
-            # Record sale
+            results = self.db.execute_query(query.format(where=where), params)
+            return [{
+                'date': row[0],
+                'motorcycle': row[1],
+                'entries': row[2],
+                'outputs': row[3],
+                'price': row[4] or 0.0,
+                'comment': row[5]
+            } for row in results]
+        except Exception as e:
+            print(f"Error getting inventory ledger: {e}")
+            return []
+
+    def count_inventory_ledger(self, motorcycle_name=None):
+        """Number of rows in the detailed ledger"""
+        return self.cache.get_or_compute(('count_inventory_ledger', motorcycle_name), self.ALL_TABLES,
+                                         lambda: self._count_inventory_ledger(motorcycle_name))
+
+    def _count_inventory_ledger(self, motorcycle_name):
+        if motorcycle_name:
             query = """
-                INSERT INTO sales (
-                    motorcycle_id, quantity, price, 
-                    client_name, client_address, client_phone
-                ) VALUES (?, ?, ?, ?, ?, ?)
+                SELECT (SELECT COUNT(*) FROM inventory_movements WHERE motorcycle_id = m.id)
+                     + (SELECT COUNT(*) FROM sales WHERE motorcycle_id = m.id)
+                FROM motorcycles m WHERE m.name = ?
             """
-            if not self.db.execute_update(query, (
-                motorcycle_id, quantity, price,
-                client_name, client_address, client_phone
-            )):
-                return False
-            
-            # Update motorcycle quantity
+            results = self.db.execute_query(query, (motorcycle_name,))
+        else:
             query = """
-                UPDATE motorcycles 
-                SET quantity = quantity - ?
-                WHERE id = ?
+                SELECT (SELECT COUNT(*) FROM inventory_movements im
+                        JOIN motorcycles m ON m.id = im.motorcycle_id)
+                     + (SELECT COUNT(*) FROM sales s
+                        JOIN motorcycles m ON m.id = s.motorcycle_id)
             """
-            return self.db.execute_update(query, (quantity, motorcycle_id))
-            
+            results = self.db.execute_query(query)
+        return results[0][0] if results else 0
+
+    def save_sale(self, motorcycle_name, quantity, price, client_name, client_address, client_phone):
+        """Record a sale in database"""
+        try:
+            return self.save_sale_async(motorcycle_name, quantity, price,
+                                        client_name, client_address, client_phone).result()
         except Exception as e:
             print(f"Error recording sale: {e}")
             return False
+
+    def save_sale_async(self, motorcycle_name, quantity, price, client_name, client_address, client_phone):
+        """Record a sale; returns a Future resolved to True once committed, False if stock was short.
+
+        With batching enabled on the database (db.enable_batching()) the
+        sale joins the next group commit; otherwise it is committed before
+        this returns.
+        """
+        def write(cursor):
+            return self._record_sale(cursor, motorcycle_name, quantity, price,
+                                     client_name, client_address, client_phone)
+        return self.db.submit_write(write, on_commit=self._sale_committed)
+
+    def _sale_committed(self, recorded):
+        if recorded:
+            self.cache.invalidate(*self.SALE_TABLES)
+
+    def save_sales(self, sales):
+        """Record several sales atomically: either all of them or none.
+
+        `sales` is an iterable of (motorcycle_name, quantity, price,
+        client_name, client_address, client_phone) tuples.
+        """
+        sales = list(sales)
+        if not sales:
+            return True
+
+        # Aggregate per model so the stock check is one conditional UPDATE each
+        totals = {}
+        for sale in sales:
+            if sale[1] <= 0:
+                return False
+            totals[sale[0]] = totals.get(sale[0], 0) + sale[1]
+
+        def write(cursor):
+            ids = {}
+            for name, quantity in totals.items():
+                motorcycle_id = self._decrement_stock(cursor, name, quantity)
+                if motorcycle_id is None:
+                    raise InsufficientStockError(name)
+                ids[name] = motorcycle_id
+
+            after_id = self.ledger.last_id(cursor, 'sales')
+            cursor.executemany(self.INSERT_SALE, [
+                (ids[name], quantity, price, client_name, client_address, client_phone)
+                for name, quantity, price, client_name, client_address, client_phone in sales
+            ])
+            cursor.executemany(self.UPSERT_DAILY_STOCK, [
+                (0, quantity, 0, quantity, ids[name])
+                for name, quantity in totals.items()
+            ])
+            self.ledger.append_rows(cursor, 'sales', after_id)
+
+        try:
+            self.db.run_write(write)
+            self.cache.invalidate(*self.SALE_TABLES)
+            return True
+        except InsufficientStockError:
+            return False
+        except Exception as e:
+            print(f"Error recording sales: {e}")
+            return False
+
+    def get_motorcycle_index(self):
+        """{name: (id, quantity)} for every motorcycle, to resolve names in bulk"""
+        rows = self.db.execute_query("SELECT name, id, quantity FROM motorcycles")
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def import_entries(self, entries, ids):
+        """Record many stock entries in one transaction, for bulk imports.
+
+        `entries` is a list of (name, entries, price, comment, date) tuples,
+        with `date` as 'YYYY-MM-DD HH:MM:SS' or None for now. `ids` maps
+        names to motorcycle ids and is completed with the models this
+        chunk creates. daily_stock is left alone: rebuild it for the
+        returned ids once every chunk is in. Raises on error, after
+        rolling the chunk back.
+        """
+        created = {}
+
+        def write(cursor):
+            for name, _, price, _, _ in entries:
+                if name not in ids and name not in created:
+                    cursor.execute(
+                        "INSERT INTO motorcycles (name, quantity, price) VALUES (?, 0, ?) RETURNING id",
+                        (name, price))
+                    created[name] = cursor.fetchone()[0]
+            chunk_ids = {**ids, **created}
+
+            after_id = self.ledger.last_id(cursor, 'inventory_movements')
+            cursor.executemany("""
+                INSERT INTO inventory_movements (
+                    motorcycle_id, entries, price, comment, movement_date
+                ) VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, [(chunk_ids[name], quantity, price, comment, date)
+                  for name, quantity, price, comment, date in entries])
+
+            # One stock update per model; the last price of the chunk wins
+            totals = {}
+            for name, quantity, price, _, _ in entries:
+                motorcycle_id = chunk_ids[name]
+                totals[motorcycle_id] = (totals.get(motorcycle_id, (0, 0))[0] + quantity, price)
+            cursor.executemany(
+                "UPDATE motorcycles SET quantity = quantity + ?, price = ? WHERE id = ?",
+                [(quantity, price, motorcycle_id) for motorcycle_id, (quantity, price) in totals.items()])
+            self.ledger.append_rows(cursor, 'inventory_movements', after_id)
+            return set(totals)
+
+        touched = self.db.run_write(write)
+        # Only known once committed: a rolled back chunk must not leave ids behind
+        ids.update(created)
+        self.cache.invalidate(*self.ENTRY_TABLES)
+        return touched
+
+    def import_sales(self, sales, ids):
+        """Record many sales in one transaction, for bulk imports.
+
+        `sales` is a list of (name, quantity, price, client_name,
+        client_address, client_phone, date) tuples with known names.
+        Raises InsufficientStockError, rolling the chunk back, if a model
+        does not have enough stock for its total. daily_stock is left to
+        the caller, as in import_entries().
+        """
+        totals = {}
+        for sale in sales:
+            totals[sale[0]] = totals.get(sale[0], 0) + sale[1]
+
+        def write(cursor):
+            for name, quantity in totals.items():
+                if self._decrement_stock(cursor, name, quantity) is None:
+                    raise InsufficientStockError(name)
+            after_id = self.ledger.last_id(cursor, 'sales')
+            cursor.executemany("""
+                INSERT INTO sales (
+                    motorcycle_id, quantity, price,
+                    client_name, client_address, client_phone, sale_date
+                ) VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, [(ids[sale[0]],) + tuple(sale[1:]) for sale in sales])
+            self.ledger.append_rows(cursor, 'sales', after_id)
+
+        self.db.run_write(write)
+        self.cache.invalidate(*self.SALE_TABLES)
+        return {ids[name] for name in totals}
+
+    def _decrement_stock(self, cursor, motorcycle_name, quantity):
+        """Take `quantity` out of stock if available; returns the motorcycle id or None"""
+        cursor.execute("""
+            UPDATE motorcycles
+            SET quantity = quantity - ?
+            WHERE name = ? AND quantity >= ?
+            RETURNING id
+        """, (quantity, motorcycle_name, quantity))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _record_sale(self, cursor, motorcycle_name, quantity, price,
+                     client_name, client_address, client_phone):
+        """Stock check, stock update and sale insert on an open transaction"""
+        if quantity <= 0:
+            return False
+        motorcycle_id = self._decrement_stock(cursor, motorcycle_name, quantity)
+        if motorcycle_id is None:
+            return False
+        cursor.execute(self.INSERT_SALE, (
+            motorcycle_id, quantity, price,
+            client_name, client_address, client_phone
+        ))
+        self.ledger.append(cursor, motorcycle_id, 'sale', -quantity, cursor.lastrowid)
+        self._record_daily_stock(cursor, motorcycle_id, outputs=quantity)
+        return True
+
+    def _record_daily_stock(self, cursor, motorcycle_id, entries=0, outputs=0):
+        """Fold a write into today's daily_stock row; run after the quantity update"""
+        cursor.execute(self.UPSERT_DAILY_STOCK,
+                       (entries, outputs, entries, outputs, motorcycle_id))
     
     def save_motorcycle(self, name, entries, price, comment=""):
         """Save or update motorcycle in inventory"""
         try:
-            # First, update or insert motorcycle
-            query = """
-                INSERT INTO motorcycles (name, quantity, price)
-                VALUES (?, ?, ?)
-                ON CONFLICT(name) DO UPDATE SET
-                quantity = quantity + ?,
-                price = ?
-            """
-            if not self.db.execute_update(query, (name, entries, price, entries, price)):
-                return False
-            
-            # Then record the movement
-            query = """
-                INSERT INTO inventory_movements (
-                    motorcycle_id, entries, price, comment
-                ) VALUES (
-                    (SELECT id FROM motorcycles WHERE name = ?),
-                    ?, ?, ?
-                )
-            """
-            return self.db.execute_update(query, (name, entries, price, comment))
+            self.db.run_write(lambda cursor: self._record_entry(cursor, name, entries, price, comment))
+            self.cache.invalidate(*self.ENTRY_TABLES)
+            return True
         except Exception as e:
             print(f"Error saving motorcycle: {e}")
             return False
+
+    def _record_entry(self, cursor, name, entries, price, comment=""):
+        """Upsert the motorcycle and record the stock movement on an open transaction"""
+        cursor.execute("""
+            INSERT INTO motorcycles (name, quantity, price)
+            VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+            quantity = quantity + ?,
+            price = ?
+            RETURNING id
+        """, (name, entries, price, entries, price))
+        motorcycle_id = cursor.fetchone()[0]
+
+        cursor.execute("""
+            INSERT INTO inventory_movements (
+                motorcycle_id, entries, price, comment
+            ) VALUES (?, ?, ?, ?)
+        """, (motorcycle_id, entries, price, comment))
+        self.ledger.append(cursor, motorcycle_id, 'entry', entries, cursor.lastrowid, comment)
+        self._record_daily_stock(cursor, motorcycle_id, entries=entries)
+        return motorcycle_id
     
     def delete_motorcycle(self, name):
         """Delete a motorcycle and its related records from inventory"""
+        def write(cursor):
+            cursor.execute("SELECT id FROM motorcycles WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            if not row:
+                return False
+
+            motorcycle_id = row[0]
+            cursor.execute("DELETE FROM inventory_movements WHERE motorcycle_id = ?", (motorcycle_id,))
+            cursor.execute("DELETE FROM sales WHERE motorcycle_id = ?", (motorcycle_id,))
+            cursor.execute("DELETE FROM daily_stock WHERE motorcycle_id = ?", (motorcycle_id,))
+            cursor.execute("DELETE FROM motorcycles WHERE id = ?", (motorcycle_id,))
+            # Ledger rows can only go once their motorcycle is gone
+            cursor.execute("DELETE FROM stock_ledger WHERE motorcycle_id = ?", (motorcycle_id,))
+            cursor.execute("DELETE FROM stock_checkpoints WHERE motorcycle_id = ?", (motorcycle_id,))
+            return True
+
         try:
-            # Get motorcycle id first
-            query = "SELECT id FROM motorcycles WHERE name = ?"
-            results = self.db.execute_query(query, (name,))
-            if not results:
+            if not self.db.run_write(write):
                 return False
-                
-            motorcycle_id = results[0][0]
-            
-            # Prepare all queries for the transaction
-            queries = [
-                ("DELETE FROM inventory_movements WHERE motorcycle_id = ?", (motorcycle_id,)),
-                ("DELETE FROM sales WHERE motorcycle_id = ?", (motorcycle_id,)),
-                ("DELETE FROM motorcycles WHERE id = ?", (motorcycle_id,))
-            ]
-            
-            # Execute all queries in a single transaction
-            return self.db.execute_transaction(queries)
-            
+            self.cache.invalidate(*self.ALL_TABLES)
+            return True
         except Exception as e:
             print(f"Error deleting motorcycle: {e}")
             return False
 
-    def get_sales_report(self, date=None):
-        """Get sales report for specific date"""
+    def adjust_stock(self, motorcycle_name, counted, comment=""):
+        """Set the stock of a motorcycle to a counted quantity, recording the difference.
+
+        The difference goes to inventory_movements (entries or outputs),
+        daily_stock and the ledger as an 'adjustment'. Returns False if the
+        motorcycle is unknown or the count is negative.
+        """
+        if counted < 0:
+            return False
+
+        def write(cursor):
+            cursor.execute("SELECT id, quantity FROM motorcycles WHERE name = ?", (motorcycle_name,))
+            row = cursor.fetchone()
+            if not row:
+                return False
+            motorcycle_id, quantity = row
+            delta = counted - quantity
+            if delta == 0:
+                return True
+            entries, outputs = max(delta, 0), max(-delta, 0)
+            cursor.execute("UPDATE motorcycles SET quantity = ? WHERE id = ?", (counted, motorcycle_id))
+            cursor.execute("""
+                INSERT INTO inventory_movements (
+                    motorcycle_id, entries, outputs, price, comment
+                ) SELECT id, ?, ?, price, ? FROM motorcycles WHERE id = ?
+            """, (entries, outputs, comment, motorcycle_id))
+            self.ledger.append(cursor, motorcycle_id, 'adjustment', delta, cursor.lastrowid, comment)
+            self._record_daily_stock(cursor, motorcycle_id, entries=entries, outputs=outputs)
+            return True
+
+        try:
+            if not self.db.run_write(write):
+                return False
+            self.cache.invalidate(*self.ENTRY_TABLES)
+            return True
+        except Exception as e:
+            print(f"Error adjusting stock: {e}")
+            return False
+
+    def get_stock_at(self, motorcycle_name, when):
+        """Stock of a motorcycle at `when` from the ledger; see StockLedger.balance_at()"""
+        return self.ledger.balance_at(motorcycle_name, when)
+
+    def verify_stock_ledger(self, full=False):
+        """Check the ledger against its running balances and the current stock.
+
+        Read-only: returns a list of problems, starting from the last
+        checkpoint unless `full`. See checkpoint_stock_ledger() to move the
+        checkpoints forward.
+        """
+        try:
+            with self.db.get_connection(read_only=True) as conn:
+                # One snapshot for both checks
+                conn.execute("BEGIN")
+                try:
+                    return self.ledger.verify(conn.cursor(), full=full)
+                finally:
+                    conn.rollback()
+        except Exception as e:
+            print(f"Error verifying stock ledger: {e}")
+            return [f"stock_ledger: verification failed: {e}"]
+
+    def checkpoint_stock_ledger(self, full=False):
+        """Verify the ledger and, when it is healthy, checkpoint the last row of every model.
+
+        Maintenance: later verifications start from these checkpoints.
+        Returns (problems, checkpoints written).
+        """
+        def write(cursor):
+            problems = self.ledger.verify(cursor, full=full)
+            return problems, (0 if problems else self.ledger.checkpoint(cursor))
+
+        try:
+            return self.db.run_write(write)
+        except Exception as e:
+            print(f"Error checkpointing stock ledger: {e}")
+            return [f"stock_ledger: verification failed: {e}"], 0
+
+    def get_stock_on(self, motorcycle_name, day):
+        """Stock of a motorcycle at the end of `day` (date or 'YYYY-MM-DD'); None if unknown"""
+        if not isinstance(day, str):
+            day = day.strftime('%Y-%m-%d')
+        query = """
+            SELECT COALESCE(
+                (SELECT closing FROM daily_stock
+                 WHERE motorcycle_id = m.id AND day <= ?
+                 ORDER BY day DESC LIMIT 1),
+                (SELECT opening FROM daily_stock
+                 WHERE motorcycle_id = m.id AND day > ?
+                 ORDER BY day ASC LIMIT 1),
+                m.quantity
+            )
+            FROM motorcycles m
+            WHERE m.name = ?
+        """
+        results = self.db.execute_query(query, (day, day, motorcycle_name))
+        return results[0][0] if results else None
+
+    def rebuild_daily_stock(self, motorcycle_ids=None):
+        """Regenerate daily_stock from raw movements and sales.
+
+        Closing balances are computed backwards from the current quantity, so
+        stock that was seeded without a movement is still accounted for.
+        """
+        where = ""
+        params = []
+        if motorcycle_ids is not None:
+            motorcycle_ids = list(motorcycle_ids)
+            if not motorcycle_ids:
+                return True
+            where = f"WHERE motorcycle_id IN ({', '.join('?' * len(motorcycle_ids))})"
+            params = motorcycle_ids
+        try:
+            self.db.run_write(lambda cursor: self._rebuild_daily_stock(cursor, where, params))
+            self.cache.invalidate('daily_stock')
+            return True
+        except Exception as e:
+            print(f"Error rebuilding daily stock: {e}")
+            return False
+
+    def _rebuild_daily_stock(self, cursor, where="", params=()):
+        cursor.execute(f"DELETE FROM daily_stock {where}", params)
+        cursor.execute(f"""
+            INSERT INTO daily_stock (motorcycle_id, day, opening, entries, outputs, closing)
+            WITH moves AS (
+                SELECT motorcycle_id, DATE(movement_date) as day, entries, outputs
+                FROM inventory_movements {where}
+                UNION ALL
+                SELECT motorcycle_id, DATE(sale_date) as day, 0, quantity
+                FROM sales {where}
+            ), days AS (
+                SELECT motorcycle_id, day, SUM(entries) as entries, SUM(outputs) as outputs
+                FROM moves
+                GROUP BY motorcycle_id, day
+            ), running AS (
+                SELECT d.motorcycle_id, d.day, d.entries, d.outputs,
+                       m.quantity - COALESCE(SUM(d.entries - d.outputs) OVER (
+                           PARTITION BY d.motorcycle_id ORDER BY d.day DESC
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                       ), 0) as closing
+                FROM days d
+                JOIN motorcycles m ON m.id = d.motorcycle_id
+            )
+            SELECT motorcycle_id, day, closing - entries + outputs, entries, outputs, closing
+            FROM running
+        """, list(params) * 2)
+
+    def check_integrity(self):
+        """Run read-only consistency checks; returns a list of problem descriptions, empty when healthy"""
+        problems = []
+        rows = self.db.execute_query("PRAGMA quick_check")
+        if not rows:
+            problems.append("quick_check: database could not be read")
+        problems += [f"quick_check: {row[0]}" for row in rows if row[0] != 'ok']
+        problems += [f"foreign key: {row[0]} row {row[1]} references missing {row[2]}"
+                     for row in self.db.execute_query("PRAGMA foreign_key_check")]
+        problems += [f"negative stock: {row[0]} = {row[1]}" for row in self.db.execute_query(
+            "SELECT name, quantity FROM motorcycles WHERE quantity < 0")]
+        problems += [f"daily_stock: {row[0]} closes at {row[2]} but stock is {row[1]}"
+                     for row in self.db.execute_query("""
+            SELECT m.name, m.quantity, d.closing
+            FROM motorcycles m
+            JOIN daily_stock d ON d.motorcycle_id = m.id
+            WHERE d.day = (SELECT MAX(day) FROM daily_stock WHERE motorcycle_id = m.id)
+              AND d.closing != m.quantity
+        """)]
+        problems += self.verify_stock_ledger()
+        return problems
+
+    def _ensure_daily_stock(self):
+        """Backfill daily_stock once for databases that predate the table"""
+        try:
+            with self.db.transaction() as cursor:
+                cursor.execute("""
+                    SELECT NOT EXISTS (SELECT 1 FROM daily_stock)
+                       AND (EXISTS (SELECT 1 FROM inventory_movements)
+                            OR EXISTS (SELECT 1 FROM sales))
+                """)
+                if cursor.fetchone()[0]:
+                    self._rebuild_daily_stock(cursor)
+        except Exception as e:
+            print(f"Error initializing daily stock: {e}")
+
+    def _ensure_stock_ledger(self):
+        """Backfill the stock ledger once for databases that predate it"""
+        try:
+            with self.db.transaction() as cursor:
+                cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM stock_ledger)")
+                if cursor.fetchone()[0]:
+                    self.ledger.backfill(cursor)
+        except Exception as e:
+            print(f"Error initializing stock ledger: {e}")
+
+    def get_sales_report(self, date=None, limit=None, offset=0, end=None):
+        """Get sales report for a date, or the days from `date` to `end`, optionally one page of it"""
         query = """
             SELECT 
                 s.sale_date,
@@ -160,10 +628,14 @@ class InventoryManager:
         params = []
         
         if date:
-            query += " WHERE DATE(s.sale_date) = DATE(?)"
-            params.append(date.strftime('%Y-%m-%d'))
+            query += " WHERE s.sale_date >= ? AND s.sale_date < ?"
+            params += SalesAnalytics.date_range(date, end or date)
             
         query += " ORDER BY s.sale_date DESC"
+
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
         
         try:
             results = self.db.execute_query(query, params)
@@ -177,4 +649,85 @@ class InventoryManager:
             } for row in results]
         except Exception as e:
             print(f"Error getting sales report: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def iter_sales(self, start, end, chunk_size=500):
+        """Stream the sales of an inclusive date range, oldest first, without materializing them"""
+        query = """
+            SELECT 
+                s.sale_date,
+                m.name as motorcycle,
+                s.client_name,
+                s.quantity,
+                s.price,
+                (s.quantity * s.price) as total
+            FROM sales s
+            JOIN motorcycles m ON s.motorcycle_id = m.id
+            WHERE s.sale_date >= ? AND s.sale_date < ?
+            ORDER BY s.sale_date, s.id
+        """
+        params = SalesAnalytics.date_range(start, end)
+        for row in self.db.iter_query(query, params, chunk_size):
+            yield {
+                'date': row[0],
+                'motorcycle': row[1],
+                'client': row[2],
+                'quantity': row[3],
+                'price': row[4],
+                'total': row[5]
+            }
+
+    def get_sales_for_invoices(self, sale_ids=None, start=None, end=None):
+        """Sales with everything an invoice needs, by id list or by date range (inclusive days)"""
+        query = """
+            SELECT s.id, m.name, s.quantity, s.price,
+                   s.client_name, s.client_address, s.client_phone, s.sale_date
+            FROM sales s
+            JOIN motorcycles m ON s.motorcycle_id = m.id
+        """
+        conditions = []
+        params = []
+        if sale_ids is not None:
+            sale_ids = list(sale_ids)
+            if not sale_ids:
+                return []
+            conditions.append(f"s.id IN ({', '.join('?' * len(sale_ids))})")
+            params += sale_ids
+        if start is not None:
+            conditions.append("s.sale_date >= ?")
+            params.append(start.strftime('%Y-%m-%d'))
+        if end is not None:
+            conditions.append("s.sale_date < ?")
+            params.append((end + timedelta(days=1)).strftime('%Y-%m-%d'))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY s.id"
+
+        try:
+            return [{
+                'id': row[0],
+                'name': row[1],
+                'quantity': row[2],
+                'price': row[3],
+                'client_name': row[4],
+                'client_address': row[5],
+                'client_phone': row[6],
+                'date': row[7]
+            } for row in self.db.execute_query(query, params)]
+        except Exception as e:
+            print(f"Error getting sales for invoices: {e}")
+            return []
+
+    def count_sales_report(self, date=None, end=None):
+        """Number of rows get_sales_report would return"""
+        return self.cache.get_or_compute(('count_sales_report', date, end), ('motorcycles', 'sales'),
+                                         lambda: self._count_sales_report(date, end))
+
+    def _count_sales_report(self, date, end):
+        query = "SELECT COUNT(*) FROM sales s JOIN motorcycles m ON s.motorcycle_id = m.id"
+        params = []
+        if date:
+            query += " WHERE s.sale_date >= ? AND s.sale_date < ?"
+            params += SalesAnalytics.date_range(date, end or date)
+        results = self.db.execute_query(query, params)
+        return results[0][0] if results else 0
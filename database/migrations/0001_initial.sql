@@ -1,4 +1,5 @@
--- Schema for motorcycle inventory management system
+-- Tables, indexes and seed data of the first versioned schema (PRAGMA user_version 1).
+-- Safe on databases created before versioning: every statement is IF NOT EXISTS / OR IGNORE
 
 CREATE TABLE IF NOT EXISTS motorcycles (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -31,6 +32,18 @@ CREATE TABLE IF NOT EXISTS inventory_movements (
     FOREIGN KEY (motorcycle_id) REFERENCES motorcycles(id)
 );
 
+-- Materialized per-day stock, maintained by InventoryManager on every write
+CREATE TABLE IF NOT EXISTS daily_stock (
+    motorcycle_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    opening INTEGER NOT NULL DEFAULT 0,
+    entries INTEGER NOT NULL DEFAULT 0,
+    outputs INTEGER NOT NULL DEFAULT 0,
+    closing INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (motorcycle_id, day),
+    FOREIGN KEY (motorcycle_id) REFERENCES motorcycles(id)
+) WITHOUT ROWID;
+
 -- Indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(sale_date);
 CREATE INDEX IF NOT EXISTS idx_movements_date ON inventory_movements(movement_date);
@@ -51,4 +64,4 @@ INSERT OR IGNORE INTO motorcycles (name, quantity, price) VALUES
     ("Roche", 0, 0),
     ("KTM 150", 0, 0),
     ("Haojue B40", 0, 0),
-    ("Benelli AP-150", 1, 0);
\ No newline at end of file
+    ("Benelli AP-150", 1, 0);
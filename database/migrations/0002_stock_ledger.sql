@@ -0,0 +1,44 @@
+-- Append-only stock ledger (PRAGMA user_version 2).
+-- InventoryManager backfills opening balances after this migration runs
+
+-- Append-only history of every stock change (entries, sales, adjustments).
+-- balance is the stock right after the event, so the stock at any time is
+-- one seek on idx_ledger_motorcycle_time
+CREATE TABLE IF NOT EXISTS stock_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    motorcycle_id INTEGER NOT NULL,
+    event_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    kind TEXT NOT NULL CHECK (kind IN ('opening', 'entry', 'output', 'sale', 'adjustment')),
+    delta INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    ref_id INTEGER,
+    comment TEXT,
+    FOREIGN KEY (motorcycle_id) REFERENCES motorcycles(id)
+);
+
+-- Verified balances; the verifier only recomputes the ledger after the last one
+CREATE TABLE IF NOT EXISTS stock_checkpoints (
+    motorcycle_id INTEGER NOT NULL,
+    ledger_id INTEGER NOT NULL,
+    event_time TIMESTAMP NOT NULL,
+    balance INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (motorcycle_id, ledger_id),
+    FOREIGN KEY (motorcycle_id) REFERENCES motorcycles(id)
+) WITHOUT ROWID;
+
+-- Ledger rows are never changed, and only removed along with their motorcycle
+CREATE TRIGGER IF NOT EXISTS stock_ledger_no_update
+BEFORE UPDATE ON stock_ledger
+BEGIN
+    SELECT RAISE(ABORT, 'stock_ledger is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS stock_ledger_no_delete
+BEFORE DELETE ON stock_ledger
+WHEN EXISTS (SELECT 1 FROM motorcycles WHERE id = OLD.motorcycle_id)
+BEGIN
+    SELECT RAISE(ABORT, 'stock_ledger is append-only');
+END;
+
+CREATE INDEX IF NOT EXISTS idx_ledger_motorcycle_time ON stock_ledger(motorcycle_id, event_time);
@@ -0,0 +1,4 @@
+-- online
+-- Covering index for the sales analytics (summary, totals per period and
+-- per model): a date range is answered from the index alone.
+CREATE INDEX IF NOT EXISTS idx_sales_date_totals ON sales(sale_date, motorcycle_id, quantity, price);
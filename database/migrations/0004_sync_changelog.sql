@@ -0,0 +1,69 @@
+-- Change capture for replication (see sync/): every insert, update or
+-- delete on the replicated tables appends a row to sync_changes.
+-- The sync worker pushes the latest state of the changed rows and prunes
+-- the changes every target has acknowledged.
+
+CREATE TABLE IF NOT EXISTS sync_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per replication target: changes up to last_seq are acknowledged.
+-- While snapshot_table is set, the initial copy is still running and has
+-- reached snapshot_id in that table
+CREATE TABLE IF NOT EXISTS sync_state (
+    target TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    snapshot_table TEXT,
+    snapshot_id INTEGER NOT NULL DEFAULT 0,
+    rows_synced INTEGER NOT NULL DEFAULT 0,
+    last_sync TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS sync_motorcycles_insert AFTER INSERT ON motorcycles
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('motorcycles', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_motorcycles_update AFTER UPDATE ON motorcycles
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('motorcycles', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_motorcycles_delete AFTER DELETE ON motorcycles
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('motorcycles', OLD.id, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_sales_insert AFTER INSERT ON sales
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('sales', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_sales_update AFTER UPDATE ON sales
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('sales', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_sales_delete AFTER DELETE ON sales
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('sales', OLD.id, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_movements_insert AFTER INSERT ON inventory_movements
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('inventory_movements', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_movements_update AFTER UPDATE ON inventory_movements
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('inventory_movements', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_movements_delete AFTER DELETE ON inventory_movements
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('inventory_movements', OLD.id, 'delete');
+END;
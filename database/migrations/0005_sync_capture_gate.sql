@@ -0,0 +1,68 @@
+-- Capture changes only while a replication target is registered: a shop
+-- that never syncs no longer accumulates sync_changes rows. A target's
+-- first sync starts with a snapshot, so nothing before it is needed.
+
+DELETE FROM sync_changes WHERE NOT EXISTS (SELECT 1 FROM sync_state);
+
+DROP TRIGGER IF EXISTS sync_motorcycles_insert;
+CREATE TRIGGER sync_motorcycles_insert AFTER INSERT ON motorcycles
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('motorcycles', NEW.id, 'upsert');
+END;
+
+DROP TRIGGER IF EXISTS sync_motorcycles_update;
+CREATE TRIGGER sync_motorcycles_update AFTER UPDATE ON motorcycles
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('motorcycles', NEW.id, 'upsert');
+END;
+
+DROP TRIGGER IF EXISTS sync_motorcycles_delete;
+CREATE TRIGGER sync_motorcycles_delete AFTER DELETE ON motorcycles
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('motorcycles', OLD.id, 'delete');
+END;
+
+DROP TRIGGER IF EXISTS sync_sales_insert;
+CREATE TRIGGER sync_sales_insert AFTER INSERT ON sales
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('sales', NEW.id, 'upsert');
+END;
+
+DROP TRIGGER IF EXISTS sync_sales_update;
+CREATE TRIGGER sync_sales_update AFTER UPDATE ON sales
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('sales', NEW.id, 'upsert');
+END;
+
+DROP TRIGGER IF EXISTS sync_sales_delete;
+CREATE TRIGGER sync_sales_delete AFTER DELETE ON sales
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('sales', OLD.id, 'delete');
+END;
+
+DROP TRIGGER IF EXISTS sync_movements_insert;
+CREATE TRIGGER sync_movements_insert AFTER INSERT ON inventory_movements
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('inventory_movements', NEW.id, 'upsert');
+END;
+
+DROP TRIGGER IF EXISTS sync_movements_update;
+CREATE TRIGGER sync_movements_update AFTER UPDATE ON inventory_movements
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('inventory_movements', NEW.id, 'upsert');
+END;
+
+DROP TRIGGER IF EXISTS sync_movements_delete;
+CREATE TRIGGER sync_movements_delete AFTER DELETE ON inventory_movements
+WHEN EXISTS (SELECT 1 FROM sync_state)
+BEGIN
+    INSERT INTO sync_changes (table_name, row_id, op) VALUES ('inventory_movements', OLD.id, 'delete');
+END;
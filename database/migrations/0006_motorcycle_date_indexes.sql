@@ -0,0 +1,6 @@
+-- online
+-- Covering indexes for the per-motorcycle aggregates in get_inventory.
+-- Built at startup on small databases, later by build_pending() on large
+-- ones: a legacy database gets them without a blocking first start.
+CREATE INDEX IF NOT EXISTS idx_movements_motorcycle_date ON inventory_movements(motorcycle_id, movement_date, entries, outputs);
+CREATE INDEX IF NOT EXISTS idx_sales_motorcycle_date ON sales(motorcycle_id, sale_date, quantity);
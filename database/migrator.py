@@ -0,0 +1,244 @@
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+
+MIGRATIONS_DIR = Path(__file__).with_name('migrations')
+
+_FILENAME = re.compile(r'^(\d+)_(\w+)\.sql$')
+_COMMENT_LINES = re.compile(r'^\s*--[^\n]*$', re.M)
+_CREATE_INDEX = re.compile(r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+IF\s+NOT\s+EXISTS\s+\w+\s+ON\s+(\w+)', re.I)
+
+SCHEMA_MIGRATIONS = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        status TEXT NOT NULL CHECK (status IN ('applied', 'adopted', 'pending')),
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class MigrationError(Exception):
+    """Raised when migrations cannot be applied safely"""
+
+
+def split_statements(sql):
+    """The statements of a SQL script, one string each (triggers included)"""
+    statements = []
+    current = ''
+    for line in sql.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if _COMMENT_LINES.sub('', current).strip():
+        raise MigrationError(f"incomplete statement at the end of the script: {current.strip()[:60]}")
+    return statements
+
+
+class Migration:
+    """One numbered file of database/migrations, e.g. 0002_stock_ledger.sql.
+
+    A file starting with a '-- online' line holds only CREATE INDEX IF NOT
+    EXISTS statements. On a large database its indexes are not built in
+    the startup transaction but later by Migrator.build_pending().
+    """
+
+    def __init__(self, version, name, sql):
+        self.version = version
+        self.name = name
+        self.sql = sql
+        self.checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+        self.statements = split_statements(sql)
+        self.online = sql.lstrip().lower().startswith('-- online')
+        self.tables = set()
+        if self.online:
+            for statement in self.statements:
+                match = _CREATE_INDEX.match(_COMMENT_LINES.sub('', statement).strip())
+                if match is None:
+                    raise MigrationError(f"{self.label}: online migrations may only create indexes "
+                                         f"with CREATE INDEX IF NOT EXISTS")
+                self.tables.add(match.group(1))
+
+    @property
+    def label(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def _versions(directory):
+    """{version: file name} of the migration files in `directory`"""
+    versions = {}
+    for path in Path(directory).iterdir():
+        match = _FILENAME.match(path.name)
+        if match is None:
+            continue
+        version = int(match.group(1))
+        if version in versions:
+            raise MigrationError(f"two migrations numbered {version}: {versions[version]}, {path.name}")
+        versions[version] = path.name
+    return versions
+
+
+def latest_version(directory=MIGRATIONS_DIR):
+    """Highest migration number, from the file names only"""
+    return max(_versions(directory), default=0)
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Every migration in `directory`, in order; numbers must run 1, 2, 3... without gaps"""
+    versions = _versions(directory)
+    if sorted(versions) != list(range(1, len(versions) + 1)):
+        raise MigrationError(f"migration numbers must follow each other from 1: {sorted(versions)}")
+    migrations = []
+    for version in sorted(versions):
+        name = versions[version]
+        # Text mode reads CRLF as LF, so a Windows checkout has the same checksums
+        sql = (Path(directory) / name).read_text(encoding='utf-8')
+        migrations.append(Migration(version, _FILENAME.match(name).group(2), sql))
+    return migrations
+
+
+class Migrator:
+    """Applies the migrations of database/migrations, keyed on PRAGMA user_version.
+
+    migrate() costs one PRAGMA read when the database is current.
+    Otherwise it applies every pending migration in a single transaction,
+    records each one with its checksum in schema_migrations, and refuses to
+    run if an applied migration has been edited since. Databases stamped
+    before schema_migrations existed have their versions adopted as they
+    are.
+
+    Online migrations whose tables hold `online_threshold` rows or more
+    are stamped 'pending' instead of being built at startup;
+    build_pending() builds them afterwards, one migration per transaction.
+    In WAL mode the read connections keep working meanwhile, and only
+    writes wait for the index.
+    """
+
+    def __init__(self, directory=MIGRATIONS_DIR, online_threshold=100_000):
+        self.directory = directory
+        self.online_threshold = online_threshold
+
+    @staticmethod
+    def user_version(conn):
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self, conn):
+        """Apply pending migrations on `conn`; returns the versions applied (empty when current)"""
+        current = self.user_version(conn)
+        latest = latest_version(self.directory)
+        if current == latest:
+            return []
+        if current > latest:
+            raise MigrationError(f"database schema version {current} is newer than this "
+                                 f"application's ({latest})")
+
+        migrations = load_migrations(self.directory)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            current = self.user_version(conn)
+            applied = []
+            if current < latest:
+                conn.execute(SCHEMA_MIGRATIONS)
+                self._adopt(conn, migrations[:current])
+                self._verify(conn, migrations[:current])
+                for migration in migrations[current:]:
+                    status = 'pending' if migration.online and self._is_large(conn, migration) else 'applied'
+                    if status == 'applied':
+                        for statement in migration.statements:
+                            conn.execute(statement)
+                    conn.execute("""
+                        INSERT OR REPLACE INTO schema_migrations (version, name, checksum, status)
+                        VALUES (?, ?, ?, ?)
+                    """, (migration.version, migration.name, migration.checksum, status))
+                    applied.append(migration.version)
+                conn.execute(f"PRAGMA user_version = {latest}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return applied
+
+    def build_pending(self, conn):
+        """Build the indexes of online migrations left pending; returns the versions built"""
+        if not self._has_table(conn):
+            return []
+        pending = [row[0] for row in conn.execute(
+            "SELECT version FROM schema_migrations WHERE status = 'pending' ORDER BY version")]
+        if not pending:
+            return []
+        migrations = {migration.version: migration for migration in load_migrations(self.directory)}
+        self._verify(conn, [migrations[version] for version in pending])
+        for version in pending:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in migrations[version].statements:
+                    conn.execute(statement)
+                conn.execute("""
+                    UPDATE schema_migrations SET status = 'applied', applied_at = CURRENT_TIMESTAMP
+                    WHERE version = ?
+                """, (version,))
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        # Let the planner see the new indexes
+        conn.execute("PRAGMA optimize")
+        return pending
+
+    def status(self, conn):
+        """One dict per known migration: version, name, status and whether its checksum matches"""
+        recorded = {}
+        if self._has_table(conn):
+            recorded = {row[0]: (row[1], row[2], row[3]) for row in conn.execute(
+                "SELECT version, checksum, status, applied_at FROM schema_migrations")}
+        current = self.user_version(conn)
+        result = []
+        for migration in load_migrations(self.directory):
+            checksum, status, applied_at = recorded.get(migration.version, (None, None, None))
+            if status is None:
+                status = 'unrecorded' if migration.version <= current else 'new'
+            result.append({
+                'version': migration.version,
+                'name': migration.name,
+                'online': migration.online,
+                'status': status,
+                'applied_at': applied_at,
+                'checksum_ok': checksum is None or checksum == migration.checksum,
+            })
+        return result
+
+    @staticmethod
+    def _has_table(conn):
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+        ).fetchone() is not None
+
+    @staticmethod
+    def _adopt(conn, migrations):
+        """Record versions stamped before schema_migrations existed, with today's checksums"""
+        conn.executemany("""
+            INSERT OR IGNORE INTO schema_migrations (version, name, checksum, status)
+            VALUES (?, ?, ?, 'adopted')
+        """, [(m.version, m.name, m.checksum) for m in migrations])
+
+    @staticmethod
+    def _verify(conn, migrations):
+        """Raise if any of `migrations` was edited after it was recorded"""
+        recorded = dict(conn.execute("SELECT version, checksum FROM schema_migrations").fetchall())
+        changed = [m.label for m in migrations if recorded.get(m.version, m.checksum) != m.checksum]
+        if changed:
+            raise MigrationError(f"applied migrations were modified: {', '.join(changed)}; "
+                                 f"add a new migration instead of editing an applied one")
+
+    def _is_large(self, conn, migration):
+        """Whether any table of an online migration holds at least `online_threshold` rows"""
+        for table in migration.tables:
+            count = conn.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} LIMIT ?)",
+                                 (self.online_threshold,)).fetchone()[0]
+            if count >= self.online_threshold:
+                return True
+        return False
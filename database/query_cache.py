@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+class QueryCache:
+    """LRU cache of read results, invalidated per table.
+
+    Each table has a generation counter that writers bump through
+    invalidate(). An entry remembers the generations of the tables it was
+    read from and is only served while none of them has moved, so a write
+    to `sales` drops every cached sales report but keeps the motorcycle
+    names. Writes from other processes (the HTTP service, a CLI import)
+    do not call invalidate(): with a `version` function, typically
+    DatabaseManager.data_version, entries also remember the token it
+    returned and are dropped once it changes.
+
+    Cached values are shared between callers and must be treated as
+    read-only. Falsy results (empty lists, zero counts) are not stored, so
+    a query that failed and came back empty is retried next time.
+    """
+
+    def __init__(self, max_entries=256, version=None):
+        self.max_entries = max_entries
+        self.version = version
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _snapshot(self, tables):
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def get_or_compute(self, key, tables, compute):
+        """Cached result for `key`, or `compute()` stored under the current generations of `tables`"""
+        # Read before computing, so a commit meanwhile makes the entry stale
+        version = self.version() if self.version is not None else None
+        with self._lock:
+            entry = self._entries.get(key)
+            snapshot = (self._snapshot(tables), version)
+            if entry is not None and entry[1] == snapshot:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Computed outside the lock; a write meanwhile makes the snapshot stale
+        value = compute()
+        if not value:
+            return value
+        with self._lock:
+            self._entries[key] = (value, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, *tables):
+        """Bump the generation of `tables` after a committed write"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,249 @@
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+# Statements worth an EXPLAIN QUERY PLAN when slow
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """One line of SQL with literals replaced by ?, so variants of a query share their stats"""
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _IN_LISTS.sub('(?...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class Histogram:
+    """Count, total, extremes and fixed log-scale buckets of durations in milliseconds"""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples, capped by the max"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'min_ms': round(self.min or 0.0, 3),
+            'max_ms': round(self.max, 3),
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': {('inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in zip(BUCKETS_MS, self.buckets) if count},
+        }
+
+
+class QueryStats:
+    """Per-statement timing histograms and a slow query log.
+
+    Fed by InstrumentedCursor: a statement's time covers its execute()
+    and every fetch until its rows are exhausted. Statements slower than
+    `slow_ms` go to a bounded log, with their EXPLAIN QUERY PLAN captured
+    on the same connection the first time each normalized statement is
+    slow.
+    """
+
+    def __init__(self, slow_ms=100.0, max_slow=200):
+        self.slow_ms = float(slow_ms)
+        self.queries = {}
+        self.errors = {}
+        self.slow = deque(maxlen=max_slow)
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, seconds, conn=None, params=None, error=False):
+        key = normalize_sql(sql)
+        ms = seconds * 1000.0
+        with self._lock:
+            histogram = self.queries.get(key)
+            if histogram is None:
+                histogram = self.queries[key] = Histogram()
+            histogram.add(ms)
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if ms < self.slow_ms or error:
+                return
+            plan = self._plans.get(key)
+            explain = plan is None and conn is not None
+        if explain:
+            plan = self.explain(conn, sql, params)
+        with self._lock:
+            if explain:
+                self._plans[key] = plan
+            self.slow.append({'time': datetime.now().isoformat(timespec='seconds'),
+                              'ms': round(ms, 3), 'sql': key, 'plan': plan})
+
+    @staticmethod
+    def explain(conn, sql, params=None):
+        """EXPLAIN QUERY PLAN lines for `sql`, on a plain cursor so it is not recorded itself"""
+        if not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return []
+        try:
+            cursor = sqlite3.Cursor(conn)
+            try:
+                rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+            finally:
+                cursor.close()
+            return [row[3] for row in rows]
+        except sqlite3.Error as e:
+            return [f"(plan unavailable: {e})"]
+
+    def reset(self):
+        with self._lock:
+            self.queries.clear()
+            self.errors.clear()
+            self.slow.clear()
+            self._plans.clear()
+
+    def as_dict(self):
+        with self._lock:
+            queries = [dict(histogram.as_dict(), sql=sql, errors=self.errors.get(sql, 0))
+                       for sql, histogram in self.queries.items()]
+            slow = list(self.slow)
+        queries.sort(key=lambda q: q['total_ms'], reverse=True)
+        return {'slow_ms': self.slow_ms, 'queries': queries, 'slow': slow}
+
+    def report(self, top=15):
+        """Text table of the statements with the most total time"""
+        lines = [f"{'count':>7} {'total ms':>10} {'mean':>8} {'p95':>8} {'max':>8}  sql"]
+        for query in self.as_dict()['queries'][:top]:
+            lines.append(f"{query['count']:>7} {query['total_ms']:>10.1f} {query['mean_ms']:>8.2f} "
+                         f"{query['p95_ms']:>8.2f} {query['max_ms']:>8.2f}  {query['sql'][:100]}")
+        return "\n".join(lines)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor timing each statement from execute() until its last row is fetched"""
+
+    ITER_CHUNK = 256
+    _sql = None
+    _params = None
+    _elapsed = 0.0
+
+    def _finish(self, explain=True):
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        self.connection.query_stats.record(sql, self._elapsed,
+                                           self.connection if explain else None, self._params)
+
+    def _start(self, method, sql, params, explain_params):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            method(self, sql, params)
+        except Exception:
+            self.connection.query_stats.record(sql, time.perf_counter() - started, error=True)
+            raise
+        self._sql, self._params, self._elapsed = sql, explain_params, time.perf_counter() - started
+        if self.description is None:
+            self._finish()
+        return self
+
+    def execute(self, sql, params=()):
+        return self._start(sqlite3.Cursor.execute, sql, params, params)
+
+    def executemany(self, sql, seq_of_params):
+        if not isinstance(seq_of_params, (list, tuple)):
+            seq_of_params = list(seq_of_params)
+        # Explained, if slow, with the first row of parameters
+        return self._start(sqlite3.Cursor.executemany, sql, seq_of_params,
+                           seq_of_params[0] if seq_of_params else None)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        result = method(self, *args)
+        self._elapsed += time.perf_counter() - started
+        return result
+
+    def fetchone(self):
+        row = self._fetch(sqlite3.Cursor.fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._fetch(sqlite3.Cursor.fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(sqlite3.Cursor.fetchall)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        # In chunks, so the timing costs one call per ITER_CHUNK rows rather than per row
+        while True:
+            rows = self.fetchmany(self.ITER_CHUNK)
+            yield from rows
+            if len(rows) < self.ITER_CHUNK:
+                return
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # A cursor dropped before its last row (fetchone() of a single row):
+        # record it, without a plan, as the connection may be in use elsewhere
+        self._finish(explain=False)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, and commits, report to `query_stats`"""
+
+    query_stats = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        started = time.perf_counter()
+        super().commit()
+        self.query_stats.record("COMMIT", time.perf_counter() - started)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+class SalesAnalytics:
+    """Aggregated sales figures over an inclusive date range.
+
+    Every query filters on `sale_date >= start AND sale_date < end + 1 day`
+    so idx_sales_date can be used, and running totals, shares and ranks
+    are computed by SQLite window functions. Sales whose motorcycle was
+    deleted are left out, as in the sales report. Results go through the
+    manager's QueryCache when one is given.
+    """
+
+    TABLES = ('motorcycles', 'sales')
+
+    # Bucket expression per period; weeks start on Monday
+    PERIODS = {
+        'day': "DATE(s.sale_date)",
+        'week': "DATE(s.sale_date, '-6 days', 'weekday 1')",
+        'month': "strftime('%Y-%m', s.sale_date)",
+    }
+
+    def __init__(self, db, cache=None):
+        self.db = db
+        self.cache = cache
+
+    def _cached(self, key, compute):
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(key, self.TABLES, compute)
+
+    @staticmethod
+    def date_range(start, end):
+        """Sargable bounds for an inclusive range of days"""
+        return start.strftime('%Y-%m-%d'), (end + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def summary(self, start, end):
+        """Number of sales, units sold, revenue and average sale over the range"""
+        return self._cached(('summary', start, end), lambda: self._summary(start, end))
+
+    def _summary(self, start, end):
+        rows = self.db.execute_query("""
+            SELECT COUNT(*), COALESCE(SUM(s.quantity), 0),
+                   COALESCE(SUM(s.quantity * s.price), 0), COALESCE(AVG(s.quantity * s.price), 0)
+            FROM sales s
+            JOIN motorcycles m ON s.motorcycle_id = m.id
+            WHERE s.sale_date >= ? AND s.sale_date < ?
+        """, self.date_range(start, end))
+        count, quantity, revenue, average = rows[0] if rows else (0, 0, 0, 0)
+        return {'sales': count, 'quantity': quantity, 'revenue': revenue, 'average': average}
+
+    def totals_by_period(self, start, end, period='day'):
+        """Totals per day, week or month with the running revenue since `start`"""
+        return self._cached(('totals_by_period', start, end, period),
+                            lambda: self._totals_by_period(start, end, period))
+
+    def _totals_by_period(self, start, end, period):
+        if period not in self.PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        rows = self.db.execute_query(f"""
+            SELECT period, sales, quantity, revenue,
+                   SUM(revenue) OVER (ORDER BY period) as running_revenue
+            FROM (
+                SELECT {self.PERIODS[period]} as period, COUNT(*) as sales,
+                       SUM(s.quantity) as quantity, SUM(s.quantity * s.price) as revenue
+                FROM sales s
+                JOIN motorcycles m ON s.motorcycle_id = m.id
+                WHERE s.sale_date >= ? AND s.sale_date < ?
+                GROUP BY period
+            )
+            ORDER BY period
+        """, self.date_range(start, end))
+        return [{
+            'period': row[0],
+            'sales': row[1],
+            'quantity': row[2],
+            'revenue': row[3],
+            'running_revenue': row[4]
+        } for row in rows]
+
+    def totals_by_model(self, start, end, limit=None):
+        """Totals per motorcycle model, best revenue first, with rank and share of revenue.
+
+        With `limit`, only the top models are returned; ties share a rank
+        and are all kept.
+        """
+        return self._cached(('totals_by_model', start, end, limit),
+                            lambda: self._totals_by_model(start, end, limit))
+
+    def _totals_by_model(self, start, end, limit):
+        query = """
+            SELECT name, sales, quantity, revenue, rank, share FROM (
+                SELECT m.name, COUNT(*) as sales, SUM(s.quantity) as quantity,
+                       SUM(s.quantity * s.price) as revenue,
+                       RANK() OVER (ORDER BY SUM(s.quantity * s.price) DESC) as rank,
+                       SUM(s.quantity * s.price) * 1.0
+                           / SUM(SUM(s.quantity * s.price)) OVER () as share
+                FROM sales s
+                JOIN motorcycles m ON s.motorcycle_id = m.id
+                WHERE s.sale_date >= ? AND s.sale_date < ?
+                GROUP BY m.id
+            )
+        """
+        params = list(self.date_range(start, end))
+        if limit is not None:
+            query += " WHERE rank <= ?"
+            params.append(limit)
+        query += " ORDER BY rank, name"
+        return [{
+            'name': row[0],
+            'sales': row[1],
+            'quantity': row[2],
+            'revenue': row[3],
+            'rank': row[4],
+            'share': row[5] or 0.0
+        } for row in self.db.execute_query(query, params)]
+
+    def top_models(self, start, end, n=5):
+        """The `n` best-selling models by revenue"""
+        return self.totals_by_model(start, end, limit=n)
+
+    def totals_by_client(self, start, end, limit=None):
+        """Totals per client name, best revenue first"""
+        return self._cached(('totals_by_client', start, end, limit),
+                            lambda: self._totals_by_client(start, end, limit))
+
+    def _totals_by_client(self, start, end, limit):
+        query = """
+            SELECT client_name, sales, quantity, revenue, rank FROM (
+                SELECT s.client_name, COUNT(*) as sales, SUM(s.quantity) as quantity,
+                       SUM(s.quantity * s.price) as revenue,
+                       RANK() OVER (ORDER BY SUM(s.quantity * s.price) DESC) as rank
+                FROM sales s
+                JOIN motorcycles m ON s.motorcycle_id = m.id
+                WHERE s.sale_date >= ? AND s.sale_date < ?
+                GROUP BY s.client_name
+            )
+        """
+        params = list(self.date_range(start, end))
+        if limit is not None:
+            query += " WHERE rank <= ?"
+            params.append(limit)
+        query += " ORDER BY rank, client_name"
+        return [{
+            'client': row[0],
+            'sales': row[1],
+            'quantity': row[2],
+            'revenue': row[3],
+            'rank': row[4]
+        } for row in self.db.execute_query(query, params)]
@@ -0,0 +1,215 @@
+from datetime import date, datetime
+
+class StockLedger:
+    """Append-only stock history: one stock_ledger row per change, with the balance after it.
+
+    InventoryManager appends to the ledger in the same transaction as the
+    quantity update, so `balance` is simply the new motorcycles.quantity.
+    Rows are appended in time order, event_time being when the change was
+    recorded (CURRENT_TIMESTAMP, UTC like sale_date); a sale imported with
+    an older date still appears when it was imported. Only the backfill of
+    a database that predates the ledger replays history at its own dates.
+
+    The stock at a given time is the balance of the last row at or before
+    it, a single seek on idx_ledger_motorcycle_time. verify() recomputes
+    running balances with a window function from the last checkpoint;
+    checkpoint() moves the checkpoints to the newest rows once verified.
+    """
+
+    KINDS = ('opening', 'entry', 'output', 'sale', 'adjustment')
+    # Rows holding a stock change for each source table, with its ledger kind
+    SOURCES = {
+        'sales': ("-quantity", "'sale'"),
+        'inventory_movements': ("entries - outputs",
+                                "CASE WHEN entries >= outputs THEN 'entry' ELSE 'output' END"),
+    }
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def timestamp(when):
+        """'YYYY-MM-DD HH:MM:SS' for a datetime, the end of the day for a date or 'YYYY-MM-DD'"""
+        if isinstance(when, datetime):
+            return when.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(when, date):
+            return when.strftime('%Y-%m-%d 23:59:59')
+        when = str(when)
+        return f"{when} 23:59:59" if len(when) == 10 else when
+
+    def append(self, cursor, motorcycle_id, kind, delta, ref_id=None, comment=None):
+        """Record one change; run after motorcycles.quantity was updated"""
+        cursor.execute("""
+            INSERT INTO stock_ledger (motorcycle_id, kind, delta, balance, ref_id, comment)
+            SELECT id, ?, ?, quantity, ?, ? FROM motorcycles WHERE id = ?
+        """, (kind, delta, ref_id, comment, motorcycle_id))
+
+    @staticmethod
+    def last_id(cursor, table):
+        """Highest id of `table`, taken before a bulk insert to find its rows with append_rows()"""
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        return cursor.fetchone()[0]
+
+    def append_rows(self, cursor, table, after_id):
+        """Record every row of `table` (sales or inventory_movements) with an id above `after_id`.
+
+        For bulk writes: run once all the rows are in and the quantities
+        updated. Balances are worked back from the current quantity in id
+        order, so the rows of one model get consecutive running balances.
+        """
+        delta, kind = self.SOURCES[table]
+        comment = "comment" if table == 'inventory_movements' else "NULL"
+        cursor.execute(f"""
+            INSERT INTO stock_ledger (motorcycle_id, kind, delta, balance, ref_id, comment)
+            SELECT r.motorcycle_id, r.kind, r.delta,
+                   m.quantity - SUM(r.delta) OVER (PARTITION BY r.motorcycle_id)
+                              + SUM(r.delta) OVER (PARTITION BY r.motorcycle_id ORDER BY r.id
+                                                   ROWS UNBOUNDED PRECEDING),
+                   r.id, r.comment
+            FROM (SELECT id, motorcycle_id, {delta} as delta, {kind} as kind, {comment} as comment
+                  FROM {table} WHERE id > ?) r
+            JOIN motorcycles m ON m.id = r.motorcycle_id
+            ORDER BY r.id
+        """, (after_id,))
+
+    def backfill(self, cursor):
+        """Build the ledger of a database that predates it from movements and sales.
+
+        Stock seeded without a movement becomes an 'opening' row, so the
+        last balance of each model matches its current quantity.
+        """
+        cursor.execute("""
+            INSERT INTO stock_ledger (motorcycle_id, event_time, kind, delta, balance, ref_id, comment)
+            WITH events AS (
+                SELECT motorcycle_id, movement_date as event_time, 1 as seq,
+                       CASE WHEN entries >= outputs THEN 'entry' ELSE 'output' END as kind,
+                       entries - outputs as delta, id as ref_id, comment
+                FROM inventory_movements
+                UNION ALL
+                SELECT motorcycle_id, sale_date, 2, 'sale', -quantity, id, NULL
+                FROM sales
+            ), totals AS (
+                SELECT motorcycle_id, SUM(delta) as delta, MIN(event_time) as first_time
+                FROM events
+                GROUP BY motorcycle_id
+            ), history AS (
+                SELECT m.id as motorcycle_id,
+                       COALESCE(MIN(m.created_at, t.first_time), m.created_at) as event_time,
+                       0 as seq, 'opening' as kind, m.quantity - COALESCE(t.delta, 0) as delta,
+                       NULL as ref_id, NULL as comment
+                FROM motorcycles m
+                LEFT JOIN totals t ON t.motorcycle_id = m.id
+                WHERE m.quantity != COALESCE(t.delta, 0)
+                UNION ALL
+                SELECT e.* FROM events e JOIN motorcycles m ON m.id = e.motorcycle_id
+            )
+            SELECT motorcycle_id, event_time, kind, delta,
+                   SUM(delta) OVER (PARTITION BY motorcycle_id ORDER BY event_time, seq, ref_id
+                                    ROWS UNBOUNDED PRECEDING),
+                   ref_id, comment
+            FROM history
+            ORDER BY event_time, seq, ref_id
+        """)
+        return cursor.rowcount
+
+    def balance_at(self, motorcycle_name, when):
+        """Stock of a motorcycle at `when` (datetime, date for its end, or string); None if unknown"""
+        rows = self.db.execute_query("""
+            SELECT COALESCE((
+                SELECT balance FROM stock_ledger
+                WHERE motorcycle_id = m.id AND event_time <= ?
+                ORDER BY event_time DESC, id DESC
+                LIMIT 1
+            ), 0)
+            FROM motorcycles m
+            WHERE m.name = ?
+        """, (self.timestamp(when), motorcycle_name))
+        return rows[0][0] if rows else None
+
+    def history(self, motorcycle_name, limit=100, offset=0):
+        """Latest ledger rows of a motorcycle, newest first"""
+        rows = self.db.execute_query("""
+            SELECT l.id, l.event_time, l.kind, l.delta, l.balance, l.ref_id, l.comment
+            FROM stock_ledger l
+            JOIN motorcycles m ON m.id = l.motorcycle_id
+            WHERE m.name = ?
+            ORDER BY l.event_time DESC, l.id DESC
+            LIMIT ? OFFSET ?
+        """, (motorcycle_name, limit, offset))
+        return [{'id': row[0], 'time': row[1], 'kind': row[2], 'delta': row[3],
+                 'balance': row[4], 'ref_id': row[5], 'comment': row[6]} for row in rows]
+
+    def verify(self, cursor, full=False):
+        """Recompute balances in bulk; returns a list of problem descriptions.
+
+        Starts from each model's last checkpoint unless `full`. Flags rows
+        whose balance is not the running sum of deltas, rows out of time
+        order, and models whose last balance differs from their quantity.
+        """
+        if full:
+            base = "SELECT id as motorcycle_id, 0 as ledger_id, 0 as balance FROM motorcycles"
+        else:
+            base = """
+                SELECT m.id as motorcycle_id, COALESCE(c.ledger_id, 0) as ledger_id,
+                       COALESCE(c.balance, 0) as balance
+                FROM motorcycles m
+                LEFT JOIN stock_checkpoints c ON c.motorcycle_id = m.id
+                 AND c.ledger_id = (SELECT MAX(ledger_id) FROM stock_checkpoints
+                                    WHERE motorcycle_id = m.id)
+            """
+        cursor.execute(f"""
+            WITH base AS ({base}), recomputed AS (
+                SELECT l.id, l.motorcycle_id, l.event_time, l.balance,
+                       b.balance + SUM(l.delta) OVER w as expected,
+                       LAG(l.event_time) OVER w as previous_time
+                -- Every model is checkpointed at once, so the newest checkpoint
+                -- marks where the unverified rows start: read them by rowid
+                -- range rather than walking the whole time index
+                FROM stock_ledger l NOT INDEXED
+                CROSS JOIN base b ON b.motorcycle_id = l.motorcycle_id
+                WHERE l.id > (SELECT MAX(ledger_id) FROM base)
+                WINDOW w AS (PARTITION BY l.motorcycle_id ORDER BY l.id ROWS UNBOUNDED PRECEDING)
+            )
+            SELECT m.name, r.id, r.balance, r.expected, r.event_time, r.previous_time
+            FROM recomputed r
+            JOIN motorcycles m ON m.id = r.motorcycle_id
+            WHERE r.balance != r.expected OR r.event_time < r.previous_time
+            ORDER BY r.id
+        """)
+        problems = []
+        for name, ledger_id, balance, expected, event_time, previous_time in cursor.fetchall():
+            if balance != expected:
+                problems.append(f"stock_ledger: {name} row {ledger_id} has balance {balance}, "
+                                f"expected {expected}")
+            else:
+                problems.append(f"stock_ledger: {name} row {ledger_id} at {event_time} "
+                                f"is before the previous row ({previous_time})")
+
+        cursor.execute("""
+            SELECT name, quantity, balance FROM (
+                SELECT m.name, m.quantity, COALESCE((
+                    SELECT balance FROM stock_ledger
+                    WHERE motorcycle_id = m.id
+                    ORDER BY event_time DESC, id DESC
+                    LIMIT 1
+                ), 0) as balance
+                FROM motorcycles m
+            )
+            WHERE balance != quantity
+        """)
+        problems += [f"stock_ledger: {name} ends at {balance} but stock is {quantity}"
+                     for name, quantity, balance in cursor.fetchall()]
+        return problems
+
+    def checkpoint(self, cursor):
+        """Checkpoint the last ledger row of every model not checkpointed there yet"""
+        cursor.execute("""
+            INSERT OR IGNORE INTO stock_checkpoints (motorcycle_id, ledger_id, event_time, balance)
+            SELECT l.motorcycle_id, l.id, l.event_time, l.balance
+            FROM motorcycles m
+            JOIN stock_ledger l ON l.id = (SELECT id FROM stock_ledger
+                                           WHERE motorcycle_id = m.id
+                                           ORDER BY event_time DESC, id DESC
+                                           LIMIT 1)
+        """)
+        return cursor.rowcount
@@ -0,0 +1,94 @@
+import time
+import threading
+
+
+class StorageProfile:
+    """PRAGMA settings applied to every connection opened on inventory.db.
+
+    journal_mode is persistent and only set from the write connection; the
+    other settings are per connection. The checkpoint policy decides when the
+    writer folds the WAL back into the main database file.
+    """
+
+    JOURNAL_MODES = ('wal', 'delete', 'truncate', 'persist', 'memory', 'off')
+    SYNCHRONOUS_LEVELS = ('off', 'normal', 'full', 'extra')
+    TEMP_STORES = ('default', 'file', 'memory')
+    CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+    def __init__(self, journal_mode='wal', synchronous='normal', cache_size=-16000,
+                 mmap_size=64 * 1024 * 1024, temp_store='memory', busy_timeout=5000,
+                 wal_autocheckpoint=1000, checkpoint_every=500, checkpoint_interval=300.0,
+                 checkpoint_mode='PASSIVE'):
+        if journal_mode not in self.JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        if synchronous not in self.SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unknown synchronous level: {synchronous}")
+        if temp_store not in self.TEMP_STORES:
+            raise ValueError(f"Unknown temp store: {temp_store}")
+        if checkpoint_mode not in self.CHECKPOINT_MODES:
+            raise ValueError(f"Unknown checkpoint mode: {checkpoint_mode}")
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)
+        self.mmap_size = int(mmap_size)
+        self.temp_store = temp_store
+        self.busy_timeout = int(busy_timeout)
+        self.wal_autocheckpoint = int(wal_autocheckpoint)
+        self.checkpoint_every = int(checkpoint_every)
+        self.checkpoint_interval = float(checkpoint_interval)
+        self.checkpoint_mode = checkpoint_mode
+
+    @classmethod
+    def durable(cls):
+        """WAL with fsync on every commit, for machines prone to power loss"""
+        return cls(synchronous='full')
+
+    @classmethod
+    def legacy(cls):
+        """SQLite defaults: rollback journal, synchronous=FULL, no checkpoints"""
+        return cls(journal_mode='delete', synchronous='full', cache_size=-2000,
+                   mmap_size=0, temp_store='default', checkpoint_every=0,
+                   checkpoint_interval=0)
+
+    def apply(self, conn, read_only=False):
+        """Apply the per-connection PRAGMAs"""
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+        conn.execute(f"PRAGMA cache_size = {self.cache_size}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+        if read_only:
+            conn.execute("PRAGMA query_only = 1")
+            return
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        if self.journal_mode == 'wal':
+            conn.execute(f"PRAGMA wal_autocheckpoint = {self.wal_autocheckpoint}")
+
+    def checkpoint_policy(self):
+        return CheckpointPolicy(self)
+
+
+class CheckpointPolicy:
+    """Tracks committed writes and says when a WAL checkpoint is due"""
+
+    def __init__(self, profile):
+        self.enabled = profile.journal_mode == 'wal'
+        self.every = profile.checkpoint_every
+        self.interval = profile.checkpoint_interval
+        self.mode = profile.checkpoint_mode
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._last = time.monotonic()
+
+    def record_write(self):
+        """Count a committed write; True when a checkpoint should run now"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._writes += 1
+            due = (self.every and self._writes >= self.every) or \
+                  (self.interval and time.monotonic() - self._last >= self.interval)
+            if due:
+                self._writes = 0
+                self._last = time.monotonic()
+            return bool(due)
@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import Future
+
+class WriteBatcher:
+    """Group commit: queued writes share one transaction on a single thread.
+
+    A write is a function taking a cursor on the open transaction. The
+    queue is flushed when `max_batch` writes are waiting or `window_ms`
+    after the first of them arrived, whichever comes first; with
+    window_ms=0 whatever piled up during the previous commit goes out
+    at once. Each write runs in its own savepoint, so one that raises is
+    undone alone and its future gets the exception. Futures are resolved
+    only after COMMIT returns, i.e. as durable as the storage profile's
+    synchronous level makes any other commit.
+
+    Writes run one after the other on the write connection, so a stock
+    check in a write sees every write queued before it.
+    """
+
+    def __init__(self, db, window_ms=5, max_batch=100):
+        if window_ms < 0 or max_batch < 1:
+            raise ValueError("window_ms must be >= 0 and max_batch >= 1")
+        self.db = db
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self.largest = 0
+        self._queue = []
+        self._first_queued = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='write-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, write, on_commit=None):
+        """Queue `write(cursor)`; returns a Future of its result.
+
+        `on_commit(result)` runs on the writer thread after the commit and
+        before the future is resolved, e.g. to invalidate a read cache so
+        the caller never sees stale data once its write is done.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("write batcher is closed")
+            if not self._queue:
+                self._first_queued = time.monotonic()
+            self._queue.append((write, on_commit, future))
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                if self._queue:
+                    remaining = self._first_queued + self.window - time.monotonic()
+                    if remaining <= 0 or len(self._queue) >= self.max_batch or self._closed:
+                        break
+                    self._condition.wait(remaining)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+            batch = self._queue[:self.max_batch]
+            del self._queue[:self.max_batch]
+            # The rest waited through this flush already: send it with the next one
+            self._first_queued = time.monotonic() - self.window if self._queue else None
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        outcomes = []
+        try:
+            with self.db.transaction() as cursor:
+                for write, _, _ in batch:
+                    cursor.execute("SAVEPOINT batched_write")
+                    try:
+                        outcomes.append((True, write(cursor)))
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO batched_write")
+                        outcomes.append((False, e))
+                    cursor.execute("RELEASE batched_write")
+        except Exception as e:
+            print(f"Error committing write batch: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.writes += len(batch)
+        self.largest = max(self.largest, len(batch))
+        for (_, on_commit, future), (ok, value) in zip(batch, outcomes):
+            if not ok:
+                future.set_exception(value)
+                continue
+            if on_commit is not None:
+                try:
+                    on_commit(value)
+                except Exception as e:
+                    print(f"Error in write commit hook: {e}")
+            future.set_result(value)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'writes': self.writes,
+            'largest_batch': self.largest,
+            'writes_per_batch': round(self.writes / self.batches, 2) if self.batches else 0.0,
+            'queued': len(self._queue),
+        }
+
+    def close(self):
+        """Flush what is queued, then stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
@@ -0,0 +1,135 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from utils.instrumentation import SPANS, export_json, snapshot
+
+class DiagnosticsFrame(ttk.Frame):
+    """Onglet de diagnostic : temps SQL par requête, requêtes lentes et mesures de l'interface.
+
+    Les mesures 'task.*' correspondent au travail en arrière-plan d'une
+    action (SQL, PDF), 'ui.*' à son affichage et 'table.*' au remplissage
+    des tableaux : on voit ainsi où passe le temps d'un « Rafraîchir ».
+    """
+
+    def __init__(self, parent, inventory_manager, task_runner):
+        super().__init__(parent)
+        self.inventory_manager = inventory_manager
+        self.task_runner = task_runner
+        self.query_stats = inventory_manager.db.query_stats
+
+        # Barre d'outils
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(toolbar, text="Seuil requête lente (ms):").pack(side=tk.LEFT, padx=5)
+        self.slow_var = tk.StringVar(value=f"{self.query_stats.slow_ms:g}" if self.query_stats else "")
+        slow_entry = ttk.Entry(toolbar, textvariable=self.slow_var, width=8)
+        slow_entry.pack(side=tk.LEFT, padx=5)
+        slow_entry.bind('<Return>', lambda e: self.apply_threshold())
+        ttk.Button(toolbar, text="Appliquer", command=self.apply_threshold).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Actualiser", command=self.refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Réinitialiser", command=self.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Exporter JSON...", command=self.export).pack(side=tk.LEFT, padx=5)
+        if self.query_stats is None:
+            ttk.Label(toolbar, text="(mesure SQL désactivée : lancer avec --stats)").pack(side=tk.LEFT, padx=5)
+
+        panes = ttk.PanedWindow(self, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.queries_tree = self.create_tree(panes, "Requêtes SQL (temps cumulé)", (
+            ('Nombre', 70), ('Total ms', 90), ('Moyenne', 80), ('p95', 70), ('Max', 80),
+            ('Erreurs', 60), ('Requête', 600)))
+        self.slow_tree = self.create_tree(panes, "Requêtes lentes", (
+            ('Heure', 150), ('ms', 80), ('Requête', 700)))
+        self.slow_tree.bind('<<TreeviewSelect>>', self.show_plan)
+        self.plan_text = tk.Text(panes, height=5, wrap='none')
+        panes.add(self.plan_text, weight=1)
+        self.spans_tree = self.create_tree(panes, "Mesures (actions, affichage, PDF)", (
+            ('Mesure', 220), ('Nombre', 70), ('Total ms', 90), ('Moyenne', 80), ('p95', 70),
+            ('Max', 80)))
+
+        self._slow = []
+        self.refresh()
+
+    def create_tree(self, panes, title, columns):
+        frame = ttk.LabelFrame(panes, text=title, style='Modern.TLabelframe')
+        panes.add(frame, weight=2)
+        tree = ttk.Treeview(frame, columns=[name for name, _ in columns], show='headings',
+                            style='Modern.Treeview', height=6)
+        for name, width in columns:
+            tree.heading(name, text=name)
+            tree.column(name, width=width, stretch=name == 'Requête')
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        return tree
+
+    def refresh(self):
+        """Recharge les trois tableaux depuis les mesures en mémoire"""
+        data = snapshot(self.query_stats)
+        sql = data.get('sql', {'queries': [], 'slow': []})
+
+        self.queries_tree.delete(*self.queries_tree.get_children())
+        for query in sql['queries']:
+            self.queries_tree.insert('', tk.END, values=(
+                query['count'], f"{query['total_ms']:.1f}", f"{query['mean_ms']:.2f}",
+                f"{query['p95_ms']:.2f}", f"{query['max_ms']:.2f}", query['errors'], query['sql']))
+
+        self._slow = list(reversed(sql['slow']))
+        self.slow_tree.delete(*self.slow_tree.get_children())
+        for index, entry in enumerate(self._slow):
+            self.slow_tree.insert('', tk.END, iid=str(index),
+                                  values=(entry['time'], f"{entry['ms']:.1f}", entry['sql']))
+        self.plan_text.delete('1.0', tk.END)
+
+        self.spans_tree.delete(*self.spans_tree.get_children())
+        for entry in data['spans']:
+            self.spans_tree.insert('', tk.END, values=(
+                entry['name'], entry['count'], f"{entry['total_ms']:.1f}", f"{entry['mean_ms']:.2f}",
+                f"{entry['p95_ms']:.2f}", f"{entry['max_ms']:.2f}"))
+
+    def show_plan(self, event=None):
+        """Affiche le plan d'exécution de la requête lente sélectionnée"""
+        selection = self.slow_tree.selection()
+        self.plan_text.delete('1.0', tk.END)
+        if not selection:
+            return
+        entry = self._slow[int(selection[0])]
+        plan = entry['plan']
+        if plan is None:
+            text = "Plan non capturé (COMMIT, ou curseur abandonné avant la fin)"
+        else:
+            text = "\n".join(plan) or "Pas de plan (requête sans lecture de table)"
+        self.plan_text.insert('1.0', f"{entry['sql']}\n\n{text}")
+
+    def apply_threshold(self):
+        """Change le seuil à partir duquel une requête est journalisée comme lente"""
+        if self.query_stats is None:
+            return
+        try:
+            slow_ms = float(self.slow_var.get().replace(',', '.'))
+            if slow_ms < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Erreur", "Le seuil doit être un nombre positif de millisecondes")
+            return
+        self.query_stats.slow_ms = slow_ms
+
+    def reset(self):
+        """Remet toutes les mesures à zéro"""
+        if self.query_stats is not None:
+            self.query_stats.reset()
+        SPANS.reset()
+        self.refresh()
+
+    def export(self):
+        """Enregistre toutes les mesures dans un fichier JSON"""
+        path = filedialog.asksaveasfilename(
+            title="Exporter les mesures", defaultextension=".json",
+            initialfile="diagnostics.json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            export_json(path, self.query_stats)
+            messagebox.showinfo("Succès", f"Mesures exportées dans {path}")
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Erreur lors de l'export: {str(e)}")
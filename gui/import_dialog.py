@@ -0,0 +1,66 @@
+from tkinter import filedialog, messagebox
+
+class ImportDialog:
+    """Import d'un fichier CSV/Excel en deux temps : validation à blanc, puis import confirmé.
+
+    Les deux passes tournent dans le TaskRunner ; `on_imported` est appelé
+    dans le thread Tk une fois des lignes réellement importées.
+    """
+
+    TITLES = {'stock': "Importer du stock", 'sales': "Importer des ventes"}
+    MAX_ERRORS_SHOWN = 10
+
+    def __init__(self, parent, inventory_manager, task_runner, kind, on_imported=None):
+        self.parent = parent
+        self.inventory_manager = inventory_manager
+        self.task_runner = task_runner
+        self.kind = kind
+        self.on_imported = on_imported
+        self.path = None
+
+    def open(self):
+        self.path = filedialog.askopenfilename(
+            parent=self.parent, title=self.TITLES[self.kind],
+            filetypes=[("Tableurs", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")])
+        if self.path:
+            self.run(dry_run=True)
+
+    def run(self, dry_run):
+        self.task_runner.submit(
+            self.import_rows, dry_run,
+            on_success=self.on_checked if dry_run else self.on_done,
+            on_error=lambda e: messagebox.showerror("Erreur", f"Erreur lors de l'import: {str(e)}")
+        )
+
+    def import_rows(self, dry_run):
+        """Exécuté hors du thread Tk"""
+        from utils.bulk_import import import_file
+
+        return import_file(self.inventory_manager, self.path, self.kind, dry_run=dry_run)
+
+    def describe(self, report):
+        lines = [report.summary()]
+        for line, message in report.errors[:self.MAX_ERRORS_SHOWN]:
+            lines.append(f"Ligne {line}: {message}")
+        if len(report.errors) > self.MAX_ERRORS_SHOWN:
+            lines.append(f"... et {len(report.errors) - self.MAX_ERRORS_SHOWN} autres erreurs")
+        return "\n".join(lines)
+
+    def on_checked(self, report):
+        if not report.imported:
+            messagebox.showerror("Import", self.describe(report) + "\n\nAucune ligne à importer.")
+            return
+        if messagebox.askyesno("Import", self.describe(report) + "\n\nImporter les lignes valides ?"):
+            self.run(dry_run=False)
+
+    def on_done(self, report):
+        if report.errors and messagebox.askyesno(
+                "Import", self.describe(report) + "\n\nEnregistrer le rapport d'erreurs ?"):
+            path = filedialog.asksaveasfilename(parent=self.parent, defaultextension=".csv",
+                                                initialfile="erreurs_import.csv")
+            if path:
+                report.write_errors(path)
+        elif not report.errors:
+            messagebox.showinfo("Succès", self.describe(report))
+        if report.imported and self.on_imported is not None:
+            self.on_imported()
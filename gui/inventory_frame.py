@@ -1,30 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from tkcalendar import DateEntry
-from database.inventory_manager import InventoryManager
+from gui.virtual_table import VirtualTable
+from gui.import_dialog import ImportDialog
 
 class InventoryFrame(ttk.Frame):
-    def __init__(self, parent, db_path):
+    def __init__(self, parent, inventory_manager, task_runner):
         super().__init__(parent)
-        self.inventory_manager = InventoryManager(db_path)
+        self.inventory_manager = inventory_manager
+        self.task_runner = task_runner
         
-        # Create treeview
+        # Create virtual table (only visible rows exist in Tk)
         columns = ('Date', 'Marques', 'Stock Précédent', 'Entrées', 'Sorties', 'Prix', 'Quantité Finale', 'Commentaire')
-        self.tree = ttk.Treeview(self, columns=columns, show='headings', style='Modern.Treeview')
+        self.table = VirtualTable(self, columns, task_runner=task_runner, name='inventory')
+        self.table.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Configure columns
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Layout
-        self.tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Mode détaillé : une ligne par mouvement, chargée par pages
+        self.ledger_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self, text="Détail des mouvements", variable=self.ledger_var,
+                        command=self.refresh_inventory).pack(anchor='w', padx=5)
         
         # Form frame
         self.create_form_frame()
@@ -34,6 +28,8 @@ class InventoryFrame(ttk.Frame):
     
     def create_form_frame(self):
         """Crée le formulaire d'ajout/modification"""
+        from tkcalendar import DateEntry
+        
         form_frame = ttk.LabelFrame(self, text="Ajouter/Modifier Stock", style='Modern.TLabelframe')
         form_frame.pack(fill=tk.X, padx=5, pady=5)
         
@@ -76,30 +72,48 @@ class InventoryFrame(ttk.Frame):
         ttk.Button(buttons_frame, text="Modifier", command=self.modify_stock).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Supprimer", command=self.delete_stock).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Rafraîchir", command=self.refresh_inventory).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons_frame, text="Importer...", command=self.import_stock).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Nettoyer Base", command=self.clear_database).pack(side=tk.RIGHT, padx=5)
     
     def refresh_inventory(self):
         """Rafraîchit l'affichage de l'inventaire"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            inventory = self.inventory_manager.get_inventory()
-            for item in inventory:
-                # Convertir le dictionnaire en liste de valeurs dans le bon ordre
-                values = [
-                    item.get('date', ''),
-                    item.get('motorcycle', ''),
-                    item.get('prev_stock', 0),
-                    item.get('entries', 0),
-                    item.get('outputs', 0),
-                    f"{item.get('price', 0.0):.2f}",
-                    item.get('balance', 0),
-                    item.get('comment', '')
-                ]
-                self.tree.insert('', 'end', values=values)
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du rafraîchissement: {str(e)}")
+        # La clé 'inventory' fait qu'un rafraîchissement plus récent remplace l'ancien
+        if self.ledger_var.get():
+            self.task_runner.submit(
+                self.inventory_manager.count_inventory_ledger,
+                key='inventory',
+                on_success=lambda count: self.table.set_source(count, self.fetch_ledger),
+                on_error=self.show_refresh_error
+            )
+        else:
+            self.task_runner.submit(
+                self.inventory_manager.get_inventory,
+                key='inventory',
+                on_success=lambda inventory: self.table.set_rows([self.to_values(item) for item in inventory]),
+                on_error=self.show_refresh_error
+            )
+    
+    def show_refresh_error(self, e):
+        messagebox.showerror("Erreur", f"Erreur lors du rafraîchissement: {str(e)}")
+    
+    def fetch_ledger(self, offset, limit):
+        """Charge une page du détail des mouvements"""
+        ledger = self.inventory_manager.get_inventory_ledger(limit=limit, offset=offset)
+        return [self.to_values(item) for item in ledger]
+    
+    @staticmethod
+    def to_values(item):
+        """Convertit le dictionnaire en tuple de valeurs dans l'ordre des colonnes"""
+        return (
+            item.get('date', ''),
+            item.get('motorcycle', ''),
+            item.get('prev_stock', ''),
+            item.get('entries', 0),
+            item.get('outputs', 0),
+            f"{item.get('price', 0.0):.2f}",
+            item.get('balance', ''),
+            item.get('comment', '')
+        )
     
     def save_stock(self):
         """Enregistre les modifications dans la base de données"""
@@ -113,29 +127,44 @@ class InventoryFrame(ttk.Frame):
                 messagebox.showerror("Erreur", "Le nom est obligatoire!")
                 return
             
-            if self.inventory_manager.save_motorcycle(name, entries, price, comment):
-                self.clear_form()
-                self.refresh_inventory()
-                messagebox.showinfo("Succès", "Stock enregistré avec succès!")
-            else:
-                messagebox.showerror("Erreur", "Erreur lors de l'enregistrement!")
+            self.task_runner.submit(
+                self.inventory_manager.save_motorcycle, name, entries, price, comment,
+                on_success=self.on_stock_saved,
+                on_error=lambda e: messagebox.showerror(
+                    "Erreur", f"Erreur lors de l'enregistrement: {str(e)}")
+            )
         except ValueError:
             messagebox.showerror("Erreur", "Valeurs invalides!")
     
+    def on_stock_saved(self, saved):
+        if saved:
+            self.clear_form()
+            self.refresh_inventory()
+            self.event_generate('<<StockChanged>>')
+            messagebox.showinfo("Succès", "Stock enregistré avec succès!")
+        else:
+            messagebox.showerror("Erreur", "Erreur lors de l'enregistrement!")
+    
+    def import_stock(self):
+        """Importe un fichier fournisseur (CSV ou Excel)"""
+        ImportDialog(self, self.inventory_manager, self.task_runner, 'stock',
+                     on_imported=self.on_stock_imported).open()
+    
+    def on_stock_imported(self):
+        self.refresh_inventory()
+        self.event_generate('<<StockChanged>>')
+    
     def add_stock(self):
         """Ajoute un nouveau stock"""
         self.save_stock()
     
     def modify_stock(self):
         """Modifie le stock sélectionné"""
-        selection = self.tree.selection()
-        if not selection:
+        values = self.table.selected_values()
+        if not values:
             messagebox.showwarning("Attention", "Veuillez sélectionner un élément à modifier")
             return
         
-        item = self.tree.item(selection[0])
-        values = item['values']
-        
         self.name_var.set(values[1])  # Marques
         self.entries_var.set(values[3])  # Entrées
         self.price_var.set(values[5])  # Prix
@@ -143,20 +172,27 @@ class InventoryFrame(ttk.Frame):
     
     def delete_stock(self):
         """Supprime le stock sélectionné"""
-        selection = self.tree.selection()
-        if not selection:
+        values = self.table.selected_values()
+        if not values:
             messagebox.showwarning("Attention", "Veuillez sélectionner un élément à supprimer")
             return
         
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer cet élément?"):
-            item = self.tree.item(selection[0])
-            name = item['values'][1]  # Le nom est dans la deuxième colonne
-            
-            if self.inventory_manager.delete_motorcycle(name):
-                self.refresh_inventory()
-                messagebox.showinfo("Succès", "Stock supprimé avec succès!")
-            else:
-                messagebox.showerror("Erreur", "Erreur lors de la suppression!")
+            name = values[1]  # Le nom est dans la deuxième colonne
+            self.task_runner.submit(
+                self.inventory_manager.delete_motorcycle, name,
+                on_success=self.on_stock_deleted,
+                on_error=lambda e: messagebox.showerror(
+                    "Erreur", f"Erreur lors de la suppression: {str(e)}")
+            )
+    
+    def on_stock_deleted(self, deleted):
+        if deleted:
+            self.refresh_inventory()
+            self.event_generate('<<StockChanged>>')
+            messagebox.showinfo("Succès", "Stock supprimé avec succès!")
+        else:
+            messagebox.showerror("Erreur", "Erreur lors de la suppression!")
     
     def clear_form(self):
         """Nettoie le formulaire"""
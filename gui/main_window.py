@@ -1,15 +1,27 @@
 import tkinter as tk
 from tkinter import ttk
-from database.db_manager import DatabaseManager
+from database.inventory_manager import InventoryManager
+from database.query_stats import QueryStats
 from gui.inventory_frame import InventoryFrame
 from gui.sales_frame import SalesFrame
 from gui.reports_frame import ReportsFrame
+from gui.diagnostics_frame import DiagnosticsFrame
+from gui.task_runner import TaskRunner
 
 class MainWindow:
-    def __init__(self, master):
+    def __init__(self, master, query_stats=False):
         self.master = master
         self.db_path = 'inventory.db'
         
+        # Un seul gestionnaire (et donc un seul pool de connexions) pour tous les onglets.
+        # Sur demande, chaque requête est chronométrée pour l'onglet Diagnostics
+        self.query_stats = QueryStats(slow_ms=100) if query_stats else None
+        self.inventory_manager = InventoryManager(self.db_path, query_stats=self.query_stats)
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Les requêtes et PDF tournent en arrière-plan pour ne pas figer la fenêtre
+        self.task_runner = TaskRunner(master, on_busy=self.set_busy)
+        
         # Header frame avec style moderne
         header_frame = ttk.Frame(master, style='Header.TFrame')
         header_frame.pack(fill='x', padx=10, pady=5)
@@ -35,16 +47,76 @@ class MainWindow:
         )
         contact_label.pack(pady=(0, 10))
         
+        # Barre d'état avec indicateur d'activité
+        status_frame = ttk.Frame(master)
+        status_frame.pack(side='bottom', fill='x', padx=5, pady=(0, 5))
+        self.status_label = ttk.Label(status_frame, text="")
+        self.status_label.pack(side='left')
+        self.busy_bar = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        
         # Create notebook for tabs
         self.notebook = ttk.Notebook(master)
         self.notebook.pack(expand=True, fill='both', padx=5, pady=5)
         
-        # Create frames with database path
-        self.inventory_frame = InventoryFrame(self.notebook, self.db_path)
-        self.sales_frame = SalesFrame(self.notebook, self.db_path)
-        self.reports_frame = ReportsFrame(self.notebook, self.db_path)
+        # Les onglets sont construits à leur première ouverture
+        self.inventory_frame = None
+        self.sales_frame = None
+        self.reports_frame = None
+        self.diagnostics_frame = None
+        self.tabs = {}
+        for attr, text, frame_class in (
+            ('inventory_frame', 'Inventaire', InventoryFrame),
+            ('sales_frame', 'Ventes', SalesFrame),
+            ('reports_frame', 'Rapports', ReportsFrame),
+            ('diagnostics_frame', 'Diagnostics', DiagnosticsFrame),
+        ):
+            container = ttk.Frame(self.notebook)
+            self.notebook.add(container, text=text)
+            self.tabs[str(container)] = (attr, frame_class, container)
+        
+        # Le premier onglet est construit une fois la fenêtre affichée
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        self.master.after_idle(self.on_tab_changed)
+        
+        # Les index qu'une migration a différés sur une grosse base sont construits en arrière-plan
+        self.task_runner.submit(self.inventory_manager.db.build_pending_indexes, key='build_indexes')
         
-        # Add frames to notebook
-        self.notebook.add(self.inventory_frame, text='Inventaire')
-        self.notebook.add(self.sales_frame, text='Ventes')
-        self.notebook.add(self.reports_frame, text='Rapports')
\ No newline at end of file
+        # Une vente ou une entrée de stock met à jour les autres onglets
+        self.master.bind('<<StockChanged>>', self.on_stock_changed)
+    
+    def on_tab_changed(self, event=None):
+        """Construit l'onglet sélectionné s'il ne l'a pas encore été"""
+        tab = self.tabs.get(self.notebook.select())
+        if tab is None:
+            return
+        attr, frame_class, container = tab
+        if getattr(self, attr) is None:
+            frame = frame_class(container, self.inventory_manager, self.task_runner)
+            frame.pack(expand=True, fill='both')
+            setattr(self, attr, frame)
+    
+    def on_stock_changed(self, event):
+        """Rafraîchit les onglets déjà construits, sauf celui qui a modifié le stock"""
+        if self.inventory_frame is not None and event.widget is not self.inventory_frame:
+            self.inventory_frame.refresh_inventory()
+        if self.sales_frame is not None and event.widget is not self.sales_frame:
+            self.sales_frame.refresh_motos()
+        if self.reports_frame is not None:
+            self.reports_frame.refresh_report()
+    
+    def set_busy(self, busy):
+        """Affiche ou masque l'indicateur d'activité"""
+        if busy:
+            self.status_label.configure(text="Traitement en cours...")
+            self.busy_bar.pack(side='right')
+            self.busy_bar.start(10)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+            self.status_label.configure(text="")
+    
+    def on_close(self):
+        """Ferme proprement les connexions avant de quitter"""
+        self.task_runner.shutdown()
+        self.inventory_manager.close()
+        self.master.destroy()
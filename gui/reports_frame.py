@@ -1,84 +1,205 @@
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from tkcalendar import DateEntry
-from database.inventory_manager import InventoryManager
-from utils.pdf_generator import PDFGenerator
+from gui.virtual_table import VirtualTable
 
 class ReportsFrame(ttk.Frame):
-    def __init__(self, parent, db_path):
+    PERIODS = {'Jour': 'day', 'Semaine': 'week', 'Mois': 'month'}
+    TOP_MODELS = 5
+    
+    def __init__(self, parent, inventory_manager, task_runner):
         super().__init__(parent)
-        self.inventory_manager = InventoryManager(db_path)
+        self.inventory_manager = inventory_manager
+        self.task_runner = task_runner
+        
+        # Import différé : tkcalendar n'est chargé qu'à l'ouverture de l'onglet
+        from tkcalendar import DateEntry
         
         # Filters frame
         filters_frame = ttk.LabelFrame(self, text="Filtres", style='Modern.TLabelframe')
         filters_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        # Date filter
-        ttk.Label(filters_frame, text="Date:").pack(side=tk.LEFT, padx=5, pady=5)
-        self.date_filter = DateEntry(filters_frame, width=12, background='darkblue',
-                                   foreground='white', borderwidth=2)
-        self.date_filter.pack(side=tk.LEFT, padx=5, pady=5)
+        # Période (bornes incluses)
+        ttk.Label(filters_frame, text="Du:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.start_filter = DateEntry(filters_frame, width=12, background='darkblue',
+                                    foreground='white', borderwidth=2)
+        self.start_filter.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        ttk.Label(filters_frame, text="Au:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.end_filter = DateEntry(filters_frame, width=12, background='darkblue',
+                                  foreground='white', borderwidth=2)
+        self.end_filter.pack(side=tk.LEFT, padx=5, pady=5)
         
         # Buttons
         ttk.Button(filters_frame, text="Filtrer", command=self.apply_filter).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(filters_frame, text="Imprimer Rapport", command=self.print_report).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(filters_frame, text="Actualiser", command=self.refresh_report).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(filters_frame, text="Factures de la période", command=self.print_invoices).pack(side=tk.LEFT, padx=5, pady=5)
+        self.progress_label = ttk.Label(filters_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=5, pady=5)
         
-        # Create treeview
+        # Résumé de la période
+        self.create_summary_frame()
+        
+        # Create virtual table, fed page by page from the database
         columns = ('Date', 'Moto', 'Client', 'Quantité', 'Prix unitaire', 'Total')
-        self.tree = ttk.Treeview(self, columns=columns, show='headings', style='Modern.Treeview')
+        self.table = VirtualTable(self, columns, task_runner=task_runner, name='report')
+        self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Load initial data
+        self.refresh_report()
+    
+    def create_summary_frame(self):
+        """Crée les panneaux de synthèse : totaux, évolution par période et meilleurs modèles"""
+        summary_frame = ttk.LabelFrame(self, text="Résumé", style='Modern.TLabelframe')
+        summary_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        # Configure columns
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
+        header = ttk.Frame(summary_frame)
+        header.pack(fill=tk.X, padx=5, pady=5)
+        self.summary_label = ttk.Label(header, text="")
+        self.summary_label.pack(side=tk.LEFT, padx=5)
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.period_var = tk.StringVar(value='Jour')
+        period_box = ttk.Combobox(header, textvariable=self.period_var, state='readonly',
+                                  values=list(self.PERIODS), width=10)
+        period_box.pack(side=tk.RIGHT, padx=5)
+        period_box.bind('<<ComboboxSelected>>', lambda e: self.refresh_summary())
+        ttk.Label(header, text="Regrouper par:").pack(side=tk.RIGHT, padx=5)
         
-        # Layout
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        panels = ttk.Frame(summary_frame)
+        panels.pack(fill=tk.X, padx=5, pady=5)
         
-        # Load initial data
-        self.refresh_report()
+        self.periods_tree = ttk.Treeview(panels, columns=('Période', 'Ventes', 'Quantité', 'CA', 'CA cumulé'),
+                                         show='headings', height=6)
+        self.models_tree = ttk.Treeview(panels, columns=('Rang', 'Modèle', 'Quantité', 'CA', 'Part'),
+                                        show='headings', height=6)
+        for tree in (self.periods_tree, self.models_tree):
+            for col in tree['columns']:
+                tree.heading(col, text=col)
+                tree.column(col, width=90)
+            tree.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    
+    def selected_range(self):
+        """Bornes de la période choisie, remises dans l'ordre si nécessaire"""
+        start, end = self.start_filter.get_date(), self.end_filter.get_date()
+        return (start, end) if start <= end else (end, start)
     
     def apply_filter(self):
         self.refresh_report()
     
     def print_report(self):
-        try:
-            selected_date = self.date_filter.get_date()
-            sales_data = self.inventory_manager.get_sales_report(selected_date)
-            
-            if not sales_data:
-                messagebox.showinfo("Info", "Aucune donnée à imprimer pour cette date.")
-                return
-                
-            filename = PDFGenerator.generate_sales_report(selected_date, sales_data)
+        start, end = self.selected_range()
+        self.task_runner.submit(
+            self.build_report, start, end,
+            on_success=self.on_report_built,
+            on_error=lambda e: messagebox.showerror(
+                "Erreur", f"Erreur lors de la génération du rapport: {str(e)}")
+        )
+    
+    def build_report(self, start, end):
+        """Charge les ventes et génère le PDF (exécuté hors du thread Tk)"""
+        from utils.pdf_generator import PDFGenerator
+        
+        if not self.inventory_manager.count_sales_report(start, end):
+            return None
+        sales = self.inventory_manager.iter_sales(start, end)
+        if start == end:
+            return PDFGenerator.generate_sales_report(start, sales)
+        return PDFGenerator.generate_sales_report_range(start, end, sales)
+    
+    def on_report_built(self, filename):
+        if filename is None:
+            messagebox.showinfo("Info", "Aucune donnée à imprimer pour cette période.")
+        else:
             messagebox.showinfo("Succès", f"Rapport généré: {filename}")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la génération du rapport: {str(e)}")
+    
+    def print_invoices(self):
+        """Réédite toutes les factures de la période sélectionnée"""
+        start, end = self.selected_range()
+        self.task_runner.submit(
+            self.build_invoices, start, end,
+            on_success=self.on_invoices_built,
+            on_error=lambda e: messagebox.showerror(
+                "Erreur", f"Erreur lors de la génération des factures: {str(e)}")
+        )
+    
+    def build_invoices(self, start, end):
+        """Génère les factures en parallèle (exécuté hors du thread Tk)"""
+        from utils.invoice_batch import generate_invoices
+        
+        return generate_invoices(
+            self.inventory_manager, start=start, end=end,
+            progress=lambda done, total: self.task_runner.post(self.show_progress, done, total)
+        )
+    
+    def show_progress(self, done, total):
+        self.progress_label.configure(text=f"Factures : {done}/{total}")
+    
+    def on_invoices_built(self, filenames):
+        self.progress_label.configure(text="")
+        if not filenames:
+            messagebox.showinfo("Info", "Aucune vente pour cette période.")
+        else:
+            messagebox.showinfo("Succès", f"{len(filenames)} factures générées dans {os.path.dirname(filenames[0])}")
     
     def refresh_report(self):
         """Rafraîchir l'affichage des ventes"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        try:
-            selected_date = self.date_filter.get_date()
-            sales_data = self.inventory_manager.get_sales_report(selected_date)
-            
-            for sale in sales_data:
-                self.tree.insert('', 'end', values=(
-                    sale['date'],
-                    sale['motorcycle'],
-                    sale['client'],
-                    sale['quantity'],
-                    f"{sale['price']:.2f}",
-                    f"{sale['total']:.2f}"
-                ))
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du rafraîchissement: {str(e)}")
\ No newline at end of file
+        start, end = self.selected_range()
+        # Un filtre plus récent remplace le rafraîchissement en cours
+        self.task_runner.submit(
+            self.inventory_manager.count_sales_report, start, end,
+            key='report',
+            on_success=lambda count: self.table.set_source(
+                count, lambda offset, limit: self.fetch_sales(start, end, offset, limit)),
+            on_error=lambda e: messagebox.showerror(
+                "Erreur", f"Erreur lors du rafraîchissement: {str(e)}")
+        )
+        self.refresh_summary()
+    
+    def fetch_sales(self, start, end, offset, limit):
+        """Charge une page de ventes"""
+        sales_data = self.inventory_manager.get_sales_report(start, limit=limit, offset=offset, end=end)
+        return [(
+            sale['date'],
+            sale['motorcycle'],
+            sale['client'],
+            sale['quantity'],
+            f"{sale['price']:.2f}",
+            f"{sale['total']:.2f}"
+        ) for sale in sales_data]
+    
+    def refresh_summary(self):
+        """Recalcule les panneaux de synthèse en arrière-plan"""
+        start, end = self.selected_range()
+        period = self.PERIODS[self.period_var.get()]
+        self.task_runner.submit(
+            self.load_summary, start, end, period,
+            key='report_summary',
+            on_success=self.show_summary,
+            on_error=lambda e: messagebox.showerror(
+                "Erreur", f"Erreur lors du calcul du résumé: {str(e)}")
+        )
+    
+    def load_summary(self, start, end, period):
+        """Agrégats calculés par SQLite (exécuté hors du thread Tk)"""
+        analytics = self.inventory_manager.analytics
+        return (analytics.summary(start, end),
+                analytics.totals_by_period(start, end, period),
+                analytics.top_models(start, end, self.TOP_MODELS))
+    
+    def show_summary(self, result):
+        summary, periods, models = result
+        self.summary_label.configure(
+            text=f"{summary['sales']} ventes, {summary['quantity']} motos, "
+                 f"CA {summary['revenue']:,.0f} FCFA (moyenne {summary['average']:,.0f})")
+        self.periods_tree.delete(*self.periods_tree.get_children())
+        for row in periods:
+            self.periods_tree.insert('', tk.END, values=(
+                row['period'], row['sales'], row['quantity'],
+                f"{row['revenue']:,.0f}", f"{row['running_revenue']:,.0f}"))
+        self.models_tree.delete(*self.models_tree.get_children())
+        for row in models:
+            self.models_tree.insert('', tk.END, values=(
+                row['rank'], row['name'], row['quantity'],
+                f"{row['revenue']:,.0f}", f"{row['share']:.0%}"))
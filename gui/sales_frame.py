@@ -1,14 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from database.inventory_manager import InventoryManager
+from gui.import_dialog import ImportDialog
 
 class SalesFrame(ttk.Frame):
-    def __init__(self, parent, db_path):
+    def __init__(self, parent, inventory_manager, task_runner):
         super().__init__(parent)
-        self.inventory_manager = InventoryManager(db_path)
+        self.inventory_manager = inventory_manager
+        self.task_runner = task_runner
         
         # Sales form
         form_frame = ttk.LabelFrame(self, text="Enregistrer une vente", style='Modern.TLabelframe')
@@ -73,6 +71,11 @@ class SalesFrame(ttk.Frame):
                   style='Modern.TButton',
                   command=self.refresh_motos).pack(side=tk.LEFT, padx=5)
         
+        # Import button
+        ttk.Button(buttons_frame, text="Importer des ventes...", 
+                  style='Modern.TButton',
+                  command=self.import_sales).pack(side=tk.LEFT, padx=5)
+        
         # Configure grid weights
         grid_frame.columnconfigure(1, weight=1)
         grid_frame.columnconfigure(3, weight=1)
@@ -84,11 +87,13 @@ class SalesFrame(ttk.Frame):
     
     def refresh_motos(self):
         """Rafraîchit la liste des motos disponibles"""
-        try:
-            inventory = self.inventory_manager.get_inventory()
-            self.moto_combo['values'] = [item['motorcycle'] for item in inventory]
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du rafraîchissement des motos: {str(e)}")
+        self.task_runner.submit(
+            self.inventory_manager.list_motorcycle_names,
+            key='motos',
+            on_success=lambda names: self.moto_combo.configure(values=names),
+            on_error=lambda e: messagebox.showerror(
+                "Erreur", f"Erreur lors du rafraîchissement des motos: {str(e)}")
+        )
     
     def record_sale(self):
         """Enregistre une nouvelle vente"""
@@ -108,16 +113,34 @@ class SalesFrame(ttk.Frame):
                 messagebox.showerror("Erreur", "Veuillez entrer le nom du client!")
                 return
             
-            # TODO: Implement save_sale in InventoryManager
-            if self.inventory_manager.save_sale(name, qty, price, client_name, client_address, client_phone):
-                self.clear_form()
-                self.refresh_motos()
-                messagebox.showinfo("Succès", "Vente enregistrée avec succès!")
-            else:
-                messagebox.showerror("Erreur", "Erreur lors de l'enregistrement de la vente!")
+            self.task_runner.submit(
+                self.inventory_manager.save_sale,
+                name, qty, price, client_name, client_address, client_phone,
+                on_success=self.on_sale_recorded,
+                on_error=lambda e: messagebox.showerror(
+                    "Erreur", f"Erreur lors de l'enregistrement de la vente: {str(e)}")
+            )
         except ValueError:
             messagebox.showerror("Erreur", "Valeurs invalides!")
     
+    def on_sale_recorded(self, recorded):
+        if recorded:
+            self.clear_form()
+            self.refresh_motos()
+            self.event_generate('<<StockChanged>>')
+            messagebox.showinfo("Succès", "Vente enregistrée avec succès!")
+        else:
+            messagebox.showerror("Erreur", "Erreur lors de l'enregistrement de la vente!")
+    
+    def import_sales(self):
+        """Importe un fichier de ventes (CSV ou Excel)"""
+        ImportDialog(self, self.inventory_manager, self.task_runner, 'sales',
+                     on_imported=self.on_sales_imported).open()
+    
+    def on_sales_imported(self):
+        self.refresh_motos()
+        self.event_generate('<<StockChanged>>')
+    
     def clear_form(self):
         """Nettoie le formulaire"""
         self.moto_var.set('')
@@ -141,33 +164,28 @@ class SalesFrame(ttk.Frame):
                 messagebox.showerror("Erreur", "Veuillez remplir tous les champs obligatoires!")
                 return
             
-            # Créer le PDF
-            filename = f"facture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            c = canvas.Canvas(filename, pagesize=letter)
-            
-            # En-tête
-            c.setFont("Helvetica-Bold", 14)
-            c.drawString(50, 800, "NOUHOU BAMMA TOURE")
-            c.setFont("Helvetica", 10)
-            c.drawString(50, 785, "Vendeur des motos")
-            c.drawString(50, 770, "Tel : (+223) 77873789 / 90434307 / 83211674")
-            c.drawString(50, 755, "Adresse : 5eme Quartier GAO Rep.Du Mali")
-            
-            # Informations client
-            c.drawString(50, 680, "Information Client:")
-            c.drawString(70, 660, f"Nom: {client_name}")
-            c.drawString(70, 640, f"Adresse: {client_address}")
-            c.drawString(70, 620, f"Téléphone: {client_phone}")
-            
-            # Détails de la vente
-            c.drawString(50, 580, "Détails de la vente:")
-            c.drawString(70, 560, f"Moto: {name}")
-            c.drawString(70, 540, f"Quantité: {qty}")
-            c.drawString(70, 520, f"Prix unitaire: {price:,.2f} FCFA")
-            c.drawString(70, 500, f"Total: {qty * price:,.2f} FCFA")
-            
-            c.save()
-            messagebox.showinfo("Succès", f"Facture générée: {filename}")
-            
+            self.task_runner.submit(
+                self.write_invoice, name, qty, price, client_name, client_address, client_phone,
+                on_success=lambda filename: messagebox.showinfo("Succès", f"Facture générée: {filename}"),
+                on_error=self.show_invoice_error
+            )
         except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la génération de la facture: {str(e)}")
\ No newline at end of file
+            self.show_invoice_error(e)
+    
+    def show_invoice_error(self, e):
+        messagebox.showerror("Erreur", f"Erreur lors de la génération de la facture: {str(e)}")
+    
+    @staticmethod
+    def write_invoice(name, qty, price, client_name, client_address, client_phone):
+        """Écrit la facture PDF (exécuté hors du thread Tk)"""
+        # ReportLab n'est importé qu'à la première facture
+        from utils.invoice_generator import InvoiceGenerator
+        
+        return InvoiceGenerator.generate_invoice({
+            'name': name,
+            'quantity': qty,
+            'price': price,
+            'client_name': client_name,
+            'client_address': client_address,
+            'client_phone': client_phone
+        })
@@ -0,0 +1,102 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from utils.instrumentation import span
+
+class TaskRunner:
+    """Exécute les traitements lents (requêtes, PDF) hors du thread Tk.
+
+    Les résultats sont remis au thread Tk par une file lue via root.after,
+    car Tk ne doit être manipulé que depuis son propre thread. Une tâche
+    soumise avec une clé annule ou ignore la tâche précédente de même clé :
+    seul le résultat le plus récent est affiché.
+
+    Chaque tâche est chronométrée en deux mesures : 'task.<nom>' pour le
+    travail en arrière-plan (SQL, PDF) et 'ui.<nom>' pour son affichage
+    dans le thread Tk, le nom étant la clé ou à défaut celui de la fonction.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=50, on_busy=None):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='gestion-motos')
+        self._results = queue.Queue()
+        self._latest = {}
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, **kwargs):
+        """Lance `fn(*args, **kwargs)` en arrière-plan et renvoie le Future"""
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+        name = key or getattr(fn, '__name__', 'tache')
+        future = self.executor.submit(self._timed, name, fn, *args, **kwargs)
+        if key is not None:
+            self._latest[key] = future
+        self._set_pending(self._pending + 1)
+        future.add_done_callback(
+            lambda f: self._results.put((f, key, name, on_success, on_error))
+        )
+        return future
+
+    @staticmethod
+    def _timed(name, fn, /, *args, **kwargs):
+        with span(f"task.{name}"):
+            return fn(*args, **kwargs)
+
+    def post(self, callback, *args):
+        """Demande l'exécution de `callback(*args)` dans le thread Tk (appelable de tout thread)"""
+        self._results.put((None, None, None, lambda _: callback(*args), None))
+
+    def is_busy(self):
+        return self._pending > 0
+
+    def shutdown(self):
+        """Annule les tâches en attente et attend celles en cours"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _set_pending(self, pending):
+        was_busy = self._pending > 0
+        self._pending = pending
+        if pending > 0 and not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+        if self.on_busy is not None and was_busy != (pending > 0):
+            self.on_busy(pending > 0)
+
+    def _poll(self):
+        while True:
+            try:
+                future, key, name, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if future is None:
+                on_success(None)
+                continue
+            self._deliver(future, key, name, on_success, on_error)
+
+        if self._pending > 0:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
+
+    def _deliver(self, future, key, name, on_success, on_error):
+        self._set_pending(self._pending - 1)
+        if future.cancelled():
+            return
+        if key is not None:
+            if self._latest.get(key) is not future:
+                return  # Résultat périmé : une tâche plus récente l'a remplacé
+            del self._latest[key]
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                print(f"Erreur dans une tâche d'arrière-plan: {error}")
+        elif on_success is not None:
+            with span(f"ui.{name}"):
+                on_success(future.result())
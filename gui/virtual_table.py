@@ -0,0 +1,204 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from utils.instrumentation import span
+
+class VirtualTable(ttk.Frame):
+    """Treeview virtuel : seules les lignes visibles existent dans Tk.
+
+    Les données viennent soit d'une liste en mémoire (set_rows), soit d'une
+    source paginée (set_source) interrogée par fenêtres au fil du défilement.
+    Chaque rafraîchissement compare les valeurs affichées et ne touche que
+    les lignes qui ont changé.
+
+    Avec un `task_runner`, les fenêtres sont chargées en arrière-plan sous
+    la clé '<name>.page' : les lignes apparaissent vides le temps du
+    chargement, et une fenêtre demandée plus tard remplace la précédente.
+    """
+
+    def __init__(self, parent, columns, style='Modern.Treeview', window=200,
+                 task_runner=None, name='table'):
+        super().__init__(parent)
+        self.columns = columns
+        self.window = window
+        self.task_runner = task_runner
+        self.name = name
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', style=style,
+                                 selectmode='browse')
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.row_height = int(ttk.Style().lookup(style, 'rowheight') or 20)
+        self._visible = 1
+        self._offset = 0
+        self._count = 0
+        self._slots = []
+        self._shown = []
+
+        # Source des données
+        self._rows = []
+        self._fetch = None
+        self._window_start = 0
+        self._window_rows = None
+        self._loading = None
+        self._generation = 0
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Prior>', lambda e: self.scroll(-self._visible))
+        self.tree.bind('<Next>', lambda e: self.scroll(self._visible))
+
+    # --- Données -------------------------------------------------------
+
+    def set_rows(self, rows):
+        """Remplace les données par une liste en mémoire de tuples de valeurs"""
+        self._fetch = None
+        self._rows = rows
+        self._count = len(rows)
+        self._window_rows = None
+        self._render()
+
+    def set_source(self, count, fetch):
+        """Source paginée : `count` lignes, `fetch(offset, limit)` renvoie une fenêtre"""
+        self._rows = []
+        self._fetch = fetch
+        self._count = count
+        # Les fenêtres encore en chargement viennent de l'ancienne source
+        self._loading = None
+        self._generation += 1
+        if self._offset >= count:
+            self._offset = 0
+        if self.task_runner is None:
+            self._window_rows = None
+            self._window_start = 0
+        else:
+            # L'ancienne fenêtre reste affichée jusqu'à l'arrivée de la nouvelle,
+            # qui ne redessine alors que les lignes modifiées
+            self._load(self._window_around(self._offset))
+        self._render()
+
+    def row(self, index):
+        """Valeurs de la ligne `index` (relatif à toutes les données)"""
+        if self._fetch is None:
+            return self._rows[index]
+        start = self._window_start
+        if self._window_rows is not None and start <= index < start + self.window:
+            # Au-delà des lignes reçues : la source a moins de lignes que prévu
+            return self._window_rows[index - start] if index - start < len(self._window_rows) else ()
+        start = self._window_around(index)
+        if self.task_runner is None:
+            self._window_start = start
+            with span('table.fetch'):
+                self._window_rows = self._fetch(start, self.window)
+            return self.row(index)
+        if self._loading is None or not (self._loading <= index < self._loading + self.window):
+            self._load(start)
+        return ()
+
+    def _window_around(self, index):
+        """Début de la fenêtre centrée sur la zone visible, pour limiter les allers-retours"""
+        return max(0, index - (self.window - self._visible) // 2)
+
+    def _load(self, start):
+        """Charge la fenêtre commençant à `start` en arrière-plan, puis réaffiche"""
+        self._loading = start
+        generation = self._generation
+        self.task_runner.submit(
+            self._fetch, start, self.window,
+            key=f'{self.name}.page',
+            on_success=lambda rows: self._on_loaded(generation, start, rows),
+            on_error=lambda e: self._on_load_error(generation, e)
+        )
+
+    def _on_loaded(self, generation, start, rows):
+        if generation != self._generation:
+            return
+        self._loading = None
+        self._window_start = start
+        self._window_rows = rows
+        self._render()
+
+    def _on_load_error(self, generation, e):
+        if generation != self._generation:
+            return
+        self._loading = None
+        messagebox.showerror("Erreur", f"Erreur lors du chargement des lignes: {str(e)}")
+
+    def selected_values(self):
+        """Valeurs de la ligne sélectionnée, ou None"""
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._slots:
+            return None
+        # Une ligne encore en chargement n'a pas de valeurs
+        return self.row(self._offset + self._slots.index(selection[0])) or None
+
+    def __len__(self):
+        return self._count
+
+    # --- Affichage -----------------------------------------------------
+
+    def _render(self):
+        """Met à jour uniquement les lignes visibles dont les valeurs ont changé"""
+        with span('table.render'):
+            self._render_rows()
+
+    def _render_rows(self):
+        self._offset = max(0, min(self._offset, self._count - self._visible))
+        needed = max(0, min(self._visible, self._count - self._offset))
+
+        while len(self._slots) < needed:
+            self._slots.append(self.tree.insert('', 'end', values=()))
+            self._shown.append(None)
+        while len(self._slots) > needed:
+            self.tree.delete(self._slots.pop())
+            self._shown.pop()
+
+        for i, iid in enumerate(self._slots):
+            values = tuple(self.row(self._offset + i))
+            if values != self._shown[i]:
+                self.tree.item(iid, values=values)
+                self._shown[i] = values
+
+        if self._count:
+            first = self._offset / self._count
+            last = min(1.0, (self._offset + self._visible) / self._count)
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+    def scroll(self, delta):
+        """Décale la zone visible de `delta` lignes"""
+        self.scroll_to(self._offset + delta)
+        return 'break'
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), self._count - self._visible))
+        if offset != self._offset:
+            self._offset = offset
+            self.tree.selection_set(())
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(float(value) * self._count)
+        elif action == 'scroll':
+            step = self._visible if unit == 'pages' else 1
+            self.scroll(int(value) * step)
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        # Une ligne est réservée à l'en-tête des colonnes
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
@@ -1,16 +1,46 @@
-import tkinter as tk
-from gui.main_window import MainWindow
-from gui.styles import apply_modern_style
+import sys
+from utils.startup_timer import StartupTimer
+
+# python main.py --startup-report : affiche le détail du temps de démarrage
+# python main.py --stats : chronomètre chaque requête SQL (onglet Diagnostics)
+timer = StartupTimer(enabled='--startup-report' in sys.argv)
 
 def main():
+    # Importés ici : les processus de factures ('spawn') ré-importent ce
+    # module et n'ont besoin ni de Tk ni de l'interface
+    import tkinter as tk
+    from tkinter import messagebox
+    from database.migrator import MigrationError
+    from gui.main_window import MainWindow
+    from gui.styles import apply_modern_style
+    timer.mark("imports")
+    
     root = tk.Tk()
     root.title("Gestion de Vente de Motos")
     root.geometry("1024x768")
+    timer.mark("tk root")
     
     # Apply modern style
     apply_modern_style()
     
-    app = MainWindow(root)
+    try:
+        app = MainWindow(root, query_stats='--stats' in sys.argv)
+    except MigrationError as e:
+        # Schéma modifié ou plus récent que l'application : ne rien écrire dessus
+        messagebox.showerror("Erreur", f"Base de données incompatible: {e}")
+        root.destroy()
+        return
+    timer.mark("main window")
+    
+    if timer.enabled:
+        def first_window(event):
+            if event.widget is root:
+                root.unbind('<Map>')
+                timer.mark("first window mapped")
+                timer.stop()
+                print(timer.report())
+        root.bind('<Map>', first_window)
+    
     root.mainloop()
 
 if __name__ == "__main__":
@@ -1,12 +1,47 @@
+from bisect import bisect_right
 from typing import Dict, List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from .motorcycle import Motorcycle
-from .stock_movement import StockMovement
+from .movement_store import MovementStore
+
+class MovementIndex:
+    """Running balances per day of one motorcycle's movements.
+
+    `days` is kept sorted and `balances[i]` is the stock at the end of
+    `days[i]`, so the stock on any date is a bisect away.
+    """
+    def __init__(self):
+        self.days: List[date] = []
+        self.balances: List[int] = []
+
+    def add(self, day: date, delta: int) -> None:
+        if self.days and day == self.days[-1]:
+            self.balances[-1] += delta
+        elif not self.days or day > self.days[-1]:
+            self.days.append(day)
+            self.balances.append((self.balances[-1] if self.balances else 0) + delta)
+        else:
+            # Back-dated movement: insert its day and shift the later balances
+            i = bisect_right(self.days, day)
+            if i and self.days[i - 1] == day:
+                i -= 1
+            else:
+                self.days.insert(i, day)
+                self.balances.insert(i, self.balances[i - 1] if i else 0)
+            for j in range(i, len(self.balances)):
+                self.balances[j] += delta
+
+    def balance_on(self, day: date) -> int:
+        """Stock at the end of `day` (0 before the first movement)"""
+        i = bisect_right(self.days, day)
+        return self.balances[i - 1] if i else 0
 
 class Inventory:
     def __init__(self):
         self.motorcycles: Dict[str, Motorcycle] = {}
-        self.movements: List[StockMovement] = []
+        # Columnar store: a few dozen bytes per movement instead of one object each
+        self.movements = MovementStore()
+        self._index: Dict[str, MovementIndex] = {}
         self._initialize_inventory()
     
     def _initialize_inventory(self):
@@ -38,23 +73,19 @@ class Inventory:
         return list(self.motorcycles.values())
     
     def get_previous_stock(self, name: str, date: datetime) -> int:
-        previous_date = date - timedelta(days=1)
-        previous_movements = [m for m in self.movements 
-                            if m.motorcycle_name == name and 
-                            m.date.date() <= previous_date.date()]
-        
-        if not previous_movements:
+        index = self._index.get(name)
+        if index is None:
             return 0
-            
-        total_entries = sum(m.entries for m in previous_movements)
-        total_outputs = sum(m.outputs for m in previous_movements)
-        return total_entries - total_outputs
+        previous_date = date - timedelta(days=1)
+        return index.balance_on(previous_date.date())
     
     def add_movement(self, name: str, date: datetime, entries: int = 0, outputs: int = 0, price: float = 0.0, comment: str = "") -> None:
         if name not in self.motorcycles:
             self.motorcycles[name] = Motorcycle(name)
-        movement = StockMovement(name, date, entries, outputs, price, comment)
-        self.movements.append(movement)
+        if not isinstance(date, datetime):
+            date = datetime.now()
+        self.movements.append(name, date, entries, outputs, price, comment)
+        self._index.setdefault(name, MovementIndex()).add(date.date(), entries - outputs)
         
         # Mise à jour de la quantité dans l'objet Motorcycle
         motorcycle = self.motorcycles[name]
@@ -72,35 +103,37 @@ class Inventory:
         return False
     
     def get_daily_movements(self, name: str = None) -> List[dict]:
-        movements = self.movements
-        if name:
-            movements = [m for m in movements if m.motorcycle_name == name]
+        store = self.movements
+        rows = store.rows(name) if name else range(len(store))
         
         consolidated = {}
-        for movement in movements:
-            key = movement.motorcycle_name
+        for row in rows:
+            key = store.names[store.motorcycle[row]]
+            price = store.price[row]
+            comment = store.comments.get(row, "")
             if key not in consolidated:
-                prev_stock = self.get_previous_stock(key, movement.date)
+                movement_date = store.date(row)
+                prev_stock = self.get_previous_stock(key, movement_date)
                 consolidated[key] = {
-                    'date': movement.date,
+                    'date': movement_date,
                     'motorcycle': key,
                     'prev_stock': prev_stock,
                     'entries': 0,
                     'outputs': 0,
-                    'price': movement.price,
+                    'price': price,
                     'balance': 0,
-                    'comment': movement.comment
+                    'comment': comment
                 }
             
-            consolidated[key]['entries'] += movement.entries
-            consolidated[key]['outputs'] += movement.outputs
+            consolidated[key]['entries'] += store.entries[row]
+            consolidated[key]['outputs'] += store.outputs[row]
             consolidated[key]['balance'] = (consolidated[key]['prev_stock'] + 
                                           consolidated[key]['entries'] - 
                                           consolidated[key]['outputs'])
-            if movement.price > 0:
-                consolidated[key]['price'] = movement.price
-            if movement.comment:
-                consolidated[key]['comment'] = movement.comment
+            if price > 0:
+                consolidated[key]['price'] = price
+            if comment:
+                consolidated[key]['comment'] = comment
         
         result = []
         for data in consolidated.values():
@@ -1,4 +1,6 @@
 class Motorcycle:
+    __slots__ = ('name', 'quantity', 'price')
+
     def __init__(self, name: str, quantity: int = 0, price: float = 0.0):
         self.name = name
         self.quantity = quantity
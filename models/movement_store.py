@@ -0,0 +1,102 @@
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .stock_movement import StockMovement
+
+class MovementStore:
+    """Columnar, append-only storage for stock movements.
+
+    Each field lives in its own typed array ('q' for integers, 'd' for
+    timestamps and prices) and motorcycle names are stored once and
+    referenced by code, so a movement costs a few dozen bytes instead of
+    a full object. Comments are rare and kept in a sparse dict keyed by
+    row. The rows of each motorcycle and its running balance are kept
+    per code, so per-model reads never scan the whole store.
+    """
+    __slots__ = ('names', '_codes', '_rows', '_totals', 'motorcycle', 'timestamp',
+                 'entries', 'outputs', 'price', 'comments')
+
+    def __init__(self, movements: Iterable[StockMovement] = ()):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._rows: List[array] = []
+        self._totals: List[int] = []
+        self.motorcycle = array('q')
+        self.timestamp = array('d')
+        self.entries = array('q')
+        self.outputs = array('q')
+        self.price = array('d')
+        self.comments: Dict[int, str] = {}
+        for movement in movements:
+            self.append(movement.motorcycle_name, movement.date, movement.entries,
+                        movement.outputs, movement.price, movement.comment)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, row: int) -> StockMovement:
+        return StockMovement(self.names[self.motorcycle[row]], self.date(row),
+                             self.entries[row], self.outputs[row],
+                             self.price[row], self.comments.get(row, ""))
+
+    def __iter__(self) -> Iterator[StockMovement]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def date(self, row: int) -> datetime:
+        return datetime.fromtimestamp(self.timestamp[row])
+
+    def rows(self, name: str) -> Sequence[int]:
+        """Row numbers of one motorcycle's movements, in insertion order"""
+        code = self._codes.get(name)
+        return self._rows[code] if code is not None else ()
+
+    def code(self, name: str) -> int:
+        """Interned code of a motorcycle name, allocated on first use"""
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(sys.intern(name))
+            self._rows.append(array('q'))
+            self._totals.append(0)
+        return code
+
+    def append(self, name: str, date: datetime, entries: int = 0, outputs: int = 0,
+               price: float = 0.0, comment: str = "") -> None:
+        row = len(self)
+        if comment:
+            self.comments[row] = comment
+        code = self.code(name)
+        self._rows[code].append(row)
+        self._totals[code] += entries - outputs
+        self.motorcycle.append(code)
+        self.timestamp.append(date.timestamp())
+        self.entries.append(entries)
+        self.outputs.append(outputs)
+        self.price.append(price)
+
+    def totals(self) -> Dict[str, Tuple[int, int]]:
+        """(entries, outputs) per motorcycle in one pass over the columns"""
+        entries = [0] * len(self.names)
+        outputs = [0] * len(self.names)
+        for code, e, o in zip(self.motorcycle, self.entries, self.outputs):
+            entries[code] += e
+            outputs[code] += o
+        return {name: (entries[i], outputs[i]) for i, name in enumerate(self.names)}
+
+    def balance(self, name: str, until: Optional[datetime] = None) -> int:
+        """Entries minus outputs of a motorcycle, optionally up to a date"""
+        code = self._codes.get(name)
+        if code is None:
+            return 0
+        if until is None:
+            return self._totals[code]
+        limit = until.timestamp()
+        timestamp, entries, outputs = self.timestamp, self.entries, self.outputs
+        return sum(entries[row] - outputs[row] for row in self._rows[code] if timestamp[row] <= limit)
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the columns and row indexes (names and comments excluded)"""
+        return sum(column.itemsize * len(column) for column in
+                   (self.motorcycle, self.timestamp, self.entries, self.outputs, self.price, *self._rows))
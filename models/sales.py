@@ -1,10 +1,16 @@
+import sys
+from array import array
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Tuple
+from .movement_store import MovementStore
 
 class Sale:
+    __slots__ = ('motorcycle_name', 'quantity', 'price', 'date',
+                 'client_name', 'client_address', 'client_phone')
+
     def __init__(self, motorcycle_name: str, quantity: int, price: float, 
                  client_name: str = "", client_address: str = "", client_phone: str = ""):
-        self.motorcycle_name = motorcycle_name
+        self.motorcycle_name = sys.intern(motorcycle_name)
         self.quantity = quantity
         self.price = price
         self.date = datetime.now()
@@ -13,23 +19,35 @@ class Sale:
         self.client_phone = client_phone
         
 class SalesManager:
+    """Sales in columns: a MovementStore holds model, date, quantity (as
+    outputs) and price, and each distinct client is stored once and
+    referenced by code, so long sessions do not keep one object per sale"""
     def __init__(self):
-        self.sales: List[Sale] = []
+        self.sales = MovementStore()
+        self.clients: List[Tuple[str, str, str]] = []
+        self._client_codes: Dict[Tuple[str, str, str], int] = {}
+        self.client = array('q')
     
     def record_sale(self, motorcycle_name: str, quantity: int, price: float,
                    client_name: str, client_address: str, client_phone: str) -> None:
-        sale = Sale(motorcycle_name, quantity, price, client_name, client_address, client_phone)
-        self.sales.append(sale)
+        client = (client_name, client_address, client_phone)
+        code = self._client_codes.get(client)
+        if code is None:
+            code = self._client_codes[client] = len(self.clients)
+            self.clients.append(client)
+        self.sales.append(motorcycle_name, datetime.now(), outputs=quantity, price=price)
+        self.client.append(code)
     
     def get_sales_report(self) -> List[dict]:
+        store = self.sales
         return [
             {
-                "date": sale.date.strftime("%Y-%m-%d %H:%M"),
-                "motorcycle": sale.motorcycle_name,
-                "quantity": sale.quantity,
-                "price": sale.price,
-                "total": sale.quantity * sale.price,
-                "client": sale.client_name
+                "date": store.date(row).strftime("%Y-%m-%d %H:%M"),
+                "motorcycle": store.names[store.motorcycle[row]],
+                "quantity": store.outputs[row],
+                "price": store.price[row],
+                "total": store.outputs[row] * store.price[row],
+                "client": self.clients[self.client[row]][0]
             }
-            for sale in self.sales
-        ]
\ No newline at end of file
+            for row in range(len(store))
+        ]
@@ -1,9 +1,12 @@
+import sys
 from datetime import datetime
 
 class StockMovement:
+    __slots__ = ('motorcycle_name', 'date', 'entries', 'outputs', 'price', 'comment')
+
     def __init__(self, motorcycle_name: str, date: datetime, entries: int = 0, 
                  outputs: int = 0, price: float = 0.0, comment: str = ""):
-        self.motorcycle_name = motorcycle_name
+        self.motorcycle_name = sys.intern(motorcycle_name)
         self.date = date if isinstance(date, datetime) else datetime.now()
         self.entries = entries
         self.outputs = outputs
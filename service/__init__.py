@@ -0,0 +1,3 @@
+"""
+Local HTTP/JSON service package
+"""
@@ -0,0 +1,273 @@
+"""Local HTTP/JSON service so several counters can share one inventory database.
+
+Run with: python -m service.server [--db inventory.db] [--port 8765]
+
+Endpoints:
+    GET  /health
+    GET  /inventory
+    GET  /motorcycles
+    GET  /sales?from=YYYY-MM-DD&to=YYYY-MM-DD&limit=100&offset=0
+    GET  /reports/summary?from=YYYY-MM-DD&to=YYYY-MM-DD&top=5
+    POST /sales  {"name", "quantity", "price", "client_name", "client_address", "client_phone"}
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from database.inventory_manager import InventoryManager
+
+MAX_BODY = 64 * 1024
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class InventoryService:
+    """asyncio HTTP/1.1 server (keep-alive, JSON only) over InventoryManager.
+
+    Reads run concurrently on a thread pool, each on a pooled read-only
+    connection. Sales go through the database's group commit: with the
+    default window_ms=0 nothing waits for a timer, and the sales that
+    arrive while one transaction commits share the next one.
+    """
+
+    def __init__(self, db_path, readers=4, max_batch=128, window_ms=0):
+        self.inventory_manager = InventoryManager(db_path, pool_size=readers)
+        self.batcher = self.inventory_manager.db.enable_batching(window_ms=window_ms,
+                                                                 max_batch=max_batch)
+        self.readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='reader')
+        self.requests = 0
+        self.started = time.time()
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/inventory'): self.inventory,
+            ('GET', '/motorcycles'): self.motorcycles,
+            ('GET', '/sales'): self.sales,
+            ('GET', '/reports/summary'): self.summary,
+            ('POST', '/sales'): self.record_sale,
+        }
+        self._server = None
+        self._indexes = None
+
+    async def read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.readers, fn, *args)
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        # Indexes deferred by a migration are built while requests are served
+        self._indexes = asyncio.get_running_loop().run_in_executor(
+            None, self.inventory_manager.db.build_pending_indexes)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.readers.shutdown(wait=True)
+        if self._indexes is not None:
+            await self._indexes
+        # Flushes the sales still queued before closing the connections
+        await asyncio.get_running_loop().run_in_executor(None, self.inventory_manager.close)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, {'error': "malformed request line"}, close=True)
+                    break
+                headers = await self.read_headers(reader)
+                length = self.content_length(headers)
+                if length is None:
+                    await self.respond(writer, 400, {'error': "invalid Content-Length"}, close=True)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {'error': "body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                status, payload = await self.dispatch(method, target, body)
+                await self.respond(writer, status, payload, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_headers(reader):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    def content_length(headers):
+        """Body length from the headers, or None when it is not a non-negative integer"""
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    async def dispatch(self, method, target, body):
+        self.requests += 1
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                return 405, {'error': f"{method} not allowed on {url.path}"}
+            return 404, {'error': f"no route for {url.path}"}
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == 'POST':
+                try:
+                    data = json.loads(body or b'{}')
+                except ValueError:
+                    raise HTTPError(400, "body is not valid JSON")
+                return await handler(data)
+            return await handler(query)
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e}")
+            return 500, {'error': "internal error"}
+
+    @staticmethod
+    async def respond(writer, status, payload, close=False):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    @staticmethod
+    def date_range(query):
+        try:
+            start = date.fromisoformat(query['from']) if 'from' in query else date.today()
+            end = date.fromisoformat(query['to']) if 'to' in query else start
+        except ValueError as e:
+            raise HTTPError(400, f"invalid date: {e}")
+        return start, end
+
+    @staticmethod
+    def int_param(query, name, default):
+        try:
+            return int(query.get(name, default))
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an integer")
+
+    @staticmethod
+    def quantity(value):
+        """A whole number of motorcycles: 2 or 2.0, but not 1.9 or true"""
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise HTTPError(400, f"quantity must be a whole number, not {value!r}")
+        return int(value)
+
+    async def health(self, query):
+        return 200, {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'group_commit': self.batcher.stats(),
+            'cache': self.inventory_manager.cache.stats(),
+        }
+
+    async def inventory(self, query):
+        return 200, {'inventory': await self.read(self.inventory_manager.get_inventory)}
+
+    async def motorcycles(self, query):
+        return 200, {'motorcycles': await self.read(self.inventory_manager.list_motorcycle_names)}
+
+    async def sales(self, query):
+        start, end = self.date_range(query)
+        limit = self.int_param(query, 'limit', 100)
+        offset = self.int_param(query, 'offset', 0)
+        # SQLite reads a negative LIMIT as "no limit"
+        if limit < 1 or offset < 0:
+            raise HTTPError(400, "limit must be at least 1 and offset not negative")
+        limit = min(limit, 1000)
+        rows = await self.read(lambda: self.inventory_manager.get_sales_report(
+            start, limit=limit, offset=offset, end=end))
+        return 200, {'start': str(start), 'end': str(end), 'sales': rows}
+
+    async def summary(self, query):
+        start, end = self.date_range(query)
+        top = self.int_param(query, 'top', 5)
+        if top < 1:
+            raise HTTPError(400, "top must be at least 1")
+        analytics = self.inventory_manager.analytics
+        totals = await self.read(analytics.summary, start, end)
+        models = await self.read(analytics.top_models, start, end, top)
+        return 200, dict(totals, start=str(start), end=str(end), top_models=models)
+
+    async def record_sale(self, data):
+        try:
+            sale = (str(data['name']), self.quantity(data['quantity']), float(data['price']),
+                    str(data['client_name']), str(data.get('client_address') or ''),
+                    str(data.get('client_phone') or ''))
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPError(400, f"invalid sale: {e}")
+        if sale[1] <= 0 or not sale[0] or not sale[3]:
+            raise HTTPError(400, "name, client_name and a positive quantity are required")
+        if not await asyncio.wrap_future(self.inventory_manager.save_sale_async(*sale)):
+            if sale[0] not in await self.read(self.inventory_manager.list_motorcycle_names):
+                raise HTTPError(404, f"unknown motorcycle: {sale[0]}")
+            raise HTTPError(409, f"insufficient stock for {sale[0]}")
+        return 201, {'recorded': True}
+
+
+async def serve(db_path, host, port, readers, max_batch, window_ms):
+    service = InventoryService(db_path, readers=readers, max_batch=max_batch, window_ms=window_ms)
+    address = await service.start(host, port)
+    print(f"Service listening on http://{address[0]}:{address[1]}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gestion de Vente de Motos - service HTTP local")
+    parser.add_argument('--db', default='inventory.db', help="chemin de la base SQLite")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--readers', type=int, default=4, help="concurrent read connections")
+    parser.add_argument('--max-batch', type=int, default=128, help="sales per group commit")
+    parser.add_argument('--window-ms', type=float, default=0,
+                        help="wait up to this long for more sales before committing a group")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.readers, args.max_batch,
+                          args.window_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+"""
+Replication of the local database to a remote backend
+"""
@@ -0,0 +1,204 @@
+import json
+import time
+import zlib
+from utils.data_export import TABLES
+
+# Parents first: a target with foreign keys gets the motorcycles before their rows
+SYNC_TABLES = ('motorcycles', 'inventory_movements', 'sales')
+
+
+def _serialize(batch):
+    return json.dumps(batch, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_batch(batch):
+    """Compact JSON of a batch, zlib-compressed"""
+    return zlib.compress(_serialize(batch))
+
+
+def decode_batch(payload):
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+class SyncWorker:
+    """Pushes local changes to a target in compressed, idempotent batches.
+
+    Changes are captured only while at least one target is registered in
+    sync_state. A new target first receives a snapshot of the replicated
+    tables, read in id order and resumed where it stopped. After that, each batch holds
+    the sync_changes after the acknowledged cursor, coalesced to the
+    latest state of each row: an upsert of the current row or a delete.
+
+    Targets apply a batch in one transaction along with its last seq. A
+    batch sent again after a lost acknowledgement is skipped there, and
+    the local cursor catches up with the target's on the next run. When
+    the target is unreachable (its `offline_errors`), the run stops with
+    status 'offline' and the next one resumes from the cursor.
+    """
+
+    def __init__(self, db, target, source='gestionmoto', batch_size=500):
+        self.db = db
+        self.target = target
+        self.source = source
+        self.batch_size = batch_size
+
+    def sync_once(self, max_batches=None):
+        """Push everything pending (or `max_batches` batches); returns a report dict"""
+        started = time.perf_counter()
+        report = {'target': self.target.name, 'status': 'ok', 'batches': 0, 'rows': 0, 'deletes': 0,
+                  'raw_bytes': 0, 'bytes': 0}
+        try:
+            state = self._load_state()
+            if state['snapshot_table'] is None:
+                remote = self.target.cursor(self.source)
+                if remote is not None and remote > state['last_seq']:
+                    # The target applied a batch whose acknowledgement was lost
+                    state['last_seq'] = remote
+                    self._save_state(state, 0)
+            while max_batches is None or report['batches'] < max_batches:
+                if state['snapshot_table'] is not None:
+                    batch = self._snapshot_batch(state)
+                else:
+                    batch = self._changes_batch(state)
+                    if batch is None:
+                        break
+                if batch['tables']:
+                    self._send(batch, report)
+                self._save_state(state, batch['rows'])
+        except self.target.offline_errors as e:
+            report['status'] = 'offline'
+            report['error'] = str(e)
+        seconds = time.perf_counter() - started
+        report['seconds'] = round(seconds, 3)
+        report['rows_per_s'] = round((report['rows'] + report['deletes']) / seconds, 1) if seconds else 0.0
+        report.update(self.lag())
+        return report
+
+    def run_forever(self, interval=30.0, stop=None, on_report=None, max_backoff=300.0):
+        """Sync every `interval` seconds until `stop` (a threading.Event) is set.
+
+        While the target is offline, retries back off up to `max_backoff`.
+        """
+        delay = interval
+        while stop is None or not stop.is_set():
+            report = self.sync_once()
+            if on_report is not None:
+                on_report(report)
+            delay = min(delay * 2, max_backoff) if report['status'] == 'offline' else interval
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                break
+
+    def lag(self):
+        """Changes not yet acknowledged by the target, and the age of the oldest one in seconds"""
+        state = self._load_state(create=False)
+        last_seq = state['last_seq'] if state else 0
+        with self.db.get_connection(read_only=True) as conn:
+            pending, lag = conn.execute("""
+                SELECT COUNT(*), (julianday('now') - julianday(MIN(changed_at))) * 86400
+                FROM sync_changes WHERE seq > ?
+            """, (last_seq,)).fetchone()
+        return {'pending': pending, 'lag_s': round(lag or 0.0, 1),
+                'snapshot': state['snapshot_table'] if state else 'motorcycles',
+                'last_seq': last_seq, 'last_sync': state['last_sync'] if state else None}
+
+    def forget(self):
+        """Drop this target's cursor, so changes it never took stop being kept for it"""
+        def write(cursor):
+            cursor.execute("DELETE FROM sync_state WHERE target = ?", (self.target.name,))
+            cursor.execute("""
+                DELETE FROM sync_changes
+                WHERE seq <= (SELECT COALESCE(MIN(last_seq), (SELECT MAX(seq) FROM sync_changes))
+                              FROM sync_state)
+            """)
+        self.db.run_write(write)
+
+    def _load_state(self, create=True):
+        """This target's sync_state row as a dict, created on first contact"""
+        with self.db.get_connection(read_only=True) as conn:
+            row = conn.execute("""
+                SELECT last_seq, snapshot_table, snapshot_id, last_sync FROM sync_state WHERE target = ?
+            """, (self.target.name,)).fetchone()
+        if row is None and create:
+            # A new target starts with a snapshot; changes up to now are already in it
+            self.db.run_write(lambda cursor: cursor.execute("""
+                INSERT OR IGNORE INTO sync_state (target, last_seq, snapshot_table)
+                SELECT ?, COALESCE(MAX(seq), 0), ? FROM sync_changes
+            """, (self.target.name, SYNC_TABLES[0])))
+            return self._load_state()
+        if row is None:
+            return None
+        return {'last_seq': row[0], 'snapshot_table': row[1], 'snapshot_id': row[2], 'last_sync': row[3]}
+
+    def _save_state(self, state, rows):
+        """Record the acknowledged position, and prune the changes every target has"""
+        def write(cursor):
+            cursor.execute("""
+                UPDATE sync_state SET last_seq = ?, snapshot_table = ?, snapshot_id = ?,
+                       rows_synced = rows_synced + ?, last_sync = CURRENT_TIMESTAMP
+                WHERE target = ?
+            """, (state['last_seq'], state['snapshot_table'], state['snapshot_id'], rows,
+                  self.target.name))
+            cursor.execute("DELETE FROM sync_changes WHERE seq <= (SELECT MIN(last_seq) FROM sync_state)")
+        self.db.run_write(write)
+
+    def _snapshot_batch(self, state):
+        """Next `batch_size` rows of the snapshot; advances `state` past them"""
+        table = state['snapshot_table']
+        columns = [name for name, _ in TABLES[table]]
+        with self.db.get_connection(read_only=True) as conn:
+            rows = [list(row) for row in conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                (state['snapshot_id'], self.batch_size))]
+        if len(rows) < self.batch_size:
+            index = SYNC_TABLES.index(table) + 1
+            state['snapshot_table'] = SYNC_TABLES[index] if index < len(SYNC_TABLES) else None
+            state['snapshot_id'] = 0
+        else:
+            state['snapshot_id'] = rows[-1][0]
+        return {'source': self.source, 'to_seq': None, 'rows': len(rows),
+                'tables': {table: {'columns': columns, 'upserts': rows, 'deletes': []}} if rows else {}}
+
+    def _changes_batch(self, state):
+        """Batch of the next `batch_size` changes, or None when there are none"""
+        with self.db.get_connection(read_only=True) as conn:
+            changes = conn.execute("""
+                SELECT seq, table_name, row_id, op FROM sync_changes
+                WHERE seq > ? ORDER BY seq LIMIT ?
+            """, (state['last_seq'], self.batch_size)).fetchall()
+            if not changes:
+                return None
+            # Only the last change of each row matters
+            latest = {}
+            for _, table, row_id, op in changes:
+                latest[(table, row_id)] = op
+            tables = {}
+            rows = 0
+            for table in SYNC_TABLES:
+                upserts = [row_id for (name, row_id), op in latest.items() if name == table and op == 'upsert']
+                deletes = [row_id for (name, row_id), op in latest.items() if name == table and op == 'delete']
+                if not upserts and not deletes:
+                    continue
+                columns = [name for name, _ in TABLES[table]]
+                # Rows deleted since their change are skipped: their delete comes later
+                current = [list(row) for row in conn.execute(
+                    f"SELECT {', '.join(columns)} FROM {table} "
+                    f"WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+                    (json.dumps(upserts),))]
+                tables[table] = {'columns': columns, 'upserts': current, 'deletes': deletes}
+                rows += len(current)
+        batch = {'source': self.source, 'from_seq': state['last_seq'], 'to_seq': changes[-1][0],
+                 'rows': rows, 'tables': tables}
+        state['last_seq'] = batch['to_seq']
+        return batch
+
+    def _send(self, batch, report):
+        raw = _serialize(batch)
+        payload = zlib.compress(raw)
+        self.target.apply(self.source, payload)
+        report['batches'] += 1
+        report['rows'] += batch['rows']
+        report['deletes'] += sum(len(t['deletes']) for t in batch['tables'].values())
+        report['raw_bytes'] += len(raw)
+        report['bytes'] += len(payload)
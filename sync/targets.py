@@ -0,0 +1,171 @@
+import sqlite3
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+from utils.data_export import DATE_COLUMNS, TABLES
+from sync.engine import SYNC_TABLES, decode_batch
+
+
+class SqlTarget:
+    """Applies sync batches to a SQL database with INSERT ... ON CONFLICT upserts.
+
+    The replicated tables are created on first connection if missing,
+    without foreign keys: the replica mirrors the shop's database as it is.
+    sync_cursor keeps the last seq applied per source in the same
+    transaction as the rows, which makes every batch idempotent.
+    Subclasses open the connection and give the SQL types and placeholder.
+    """
+
+    placeholder = '?'
+    types = {'int': 'INTEGER', 'float': 'REAL', 'text': 'TEXT', 'date': 'TEXT'}
+    # Errors meaning "unreachable, try again later" rather than a bug
+    offline_errors = ()
+
+    def __init__(self, name):
+        self.name = name
+        self._conn = None
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def connection(self):
+        if self._conn is None:
+            conn = self._connect()
+            try:
+                self._create_tables(conn)
+            except BaseException:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def _create_tables(self, conn):
+        cursor = conn.cursor()
+        for table in SYNC_TABLES:
+            columns = []
+            for name, kind in TABLES[table]:
+                kind = 'date' if DATE_COLUMNS.get(table) == name else kind
+                columns.append(f"{name} {self.types[kind]}{' PRIMARY KEY' if name == 'id' else ''}")
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})")
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS sync_cursor (
+                source TEXT PRIMARY KEY,
+                last_seq {self.types['int']} NOT NULL,
+                updated_at TEXT
+            )
+        """)
+        conn.commit()
+
+    def cursor(self, source):
+        """Last seq applied for `source`, or None before its first change batch"""
+        try:
+            conn = self.connection()
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT last_seq FROM sync_cursor WHERE source = {self.placeholder}", (source,))
+            row = cursor.fetchone()
+            conn.rollback()
+        except self.offline_errors:
+            self.close()
+            raise
+        return row[0] if row else None
+
+    def apply(self, source, payload):
+        """Apply one compressed batch in a single transaction; returns False if it was already applied"""
+        batch = decode_batch(payload)
+        conn = self.connection()
+        p = self.placeholder
+        try:
+            cursor = conn.cursor()
+            to_seq = batch['to_seq']
+            if to_seq is not None:
+                cursor.execute(f"SELECT last_seq FROM sync_cursor WHERE source = {p}", (source,))
+                row = cursor.fetchone()
+                if row is not None and row[0] >= to_seq:
+                    conn.rollback()
+                    return False
+            for table in SYNC_TABLES:
+                data = batch['tables'].get(table)
+                if data and data['upserts']:
+                    columns = data['columns']
+                    cursor.executemany(f"""
+                        INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([p] * len(columns))})
+                        ON CONFLICT (id) DO UPDATE SET
+                        {', '.join(f'{c} = EXCLUDED.{c}' for c in columns if c != 'id')}
+                    """, data['upserts'])
+            # Children before parents
+            for table in reversed(SYNC_TABLES):
+                data = batch['tables'].get(table)
+                if data and data['deletes']:
+                    cursor.executemany(f"DELETE FROM {table} WHERE id = {p}",
+                                       [(row_id,) for row_id in data['deletes']])
+            if to_seq is not None:
+                cursor.execute(f"""
+                    INSERT INTO sync_cursor (source, last_seq, updated_at) VALUES ({p}, {p}, {p})
+                    ON CONFLICT (source) DO UPDATE SET
+                    last_seq = EXCLUDED.last_seq, updated_at = EXCLUDED.updated_at
+                """, (source, to_seq, datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')))
+            conn.commit()
+            return True
+        except self.offline_errors:
+            self.close()
+            raise
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class SQLiteTarget(SqlTarget):
+    """Another SQLite file standing in for the remote backend (tests, or a copy on a USB key)"""
+
+    offline_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path):
+        super().__init__(f"sqlite:{path}")
+        self.path = str(path)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0)
+
+
+class PostgresTarget(SqlTarget):
+    """PostgreSQL (or Supabase) through psycopg 3, which is only imported here"""
+
+    placeholder = '%s'
+    types = {'int': 'BIGINT', 'float': 'DOUBLE PRECISION', 'text': 'TEXT', 'date': 'TIMESTAMP'}
+
+    def __init__(self, dsn):
+        try:
+            import psycopg
+        except ImportError:
+            raise ValueError("psycopg est requis pour synchroniser vers PostgreSQL "
+                             "(pip install 'psycopg[binary]')")
+        parts = urlsplit(dsn)
+        # The target name is stored locally: keep the password out of it
+        netloc = parts.netloc.rsplit('@', 1)[-1]
+        if parts.username:
+            netloc = f"{parts.username}@{netloc}"
+        super().__init__(urlunsplit((parts.scheme, netloc, parts.path, '', '')))
+        self.dsn = dsn
+        self._psycopg = psycopg
+        self.offline_errors = (psycopg.OperationalError, OSError)
+
+    def _connect(self):
+        return self._psycopg.connect(self.dsn, connect_timeout=10)
+
+
+def open_target(url):
+    """Target from 'postgresql://...' / 'postgres://...' or 'sqlite:FILE' (or a plain .db path)"""
+    if url.startswith(('postgresql://', 'postgres://')):
+        return PostgresTarget(url)
+    if url.startswith('sqlite:'):
+        return SQLiteTarget(url[len('sqlite:'):])
+    if url.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SQLiteTarget(url)
+    raise ValueError(f"Cible de synchronisation inconnue: {url}")
@@ -0,0 +1,10 @@
+import pytest
+from database.inventory_manager import InventoryManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """InventoryManager on a fresh database file, closed after the test"""
+    manager = InventoryManager(tmp_path / 'inventory.db')
+    yield manager
+    manager.close()
@@ -0,0 +1,39 @@
+from utils.bulk_import import import_file
+
+
+def write_stock(tmp_path, names):
+    path = tmp_path / 'stock.csv'
+    lines = ["nom;entrees;prix"] + [f"{name};2;400000" for name in names]
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return str(path)
+
+
+def test_new_models_are_counted_once_across_chunks(manager, tmp_path):
+    manager.save_motorcycle('Connue', 1, 400000.0)
+    path = write_stock(tmp_path, ['Connue', 'A', 'B', 'A', 'C', 'B'])
+
+    report = import_file(manager, path, 'stock', dry_run=True, chunk_size=2)
+    assert report.ok and report.new_models == 3
+
+    report = import_file(manager, path, 'stock', chunk_size=2)
+    assert report.ok and report.imported == 6 and report.new_models == 3
+    assert import_file(manager, path, 'stock', chunk_size=2).new_models == 0
+
+
+def test_rejected_chunk_creates_no_models(manager, tmp_path, monkeypatch):
+    import_entries = manager.import_entries
+    calls = []
+
+    def fail_second_chunk(records, ids):
+        calls.append(records)
+        if len(calls) == 2:
+            raise RuntimeError("disque plein")
+        return import_entries(records, ids)
+    monkeypatch.setattr(manager, 'import_entries', fail_second_chunk)
+
+    report = import_file(manager, write_stock(tmp_path, ['A', 'B', 'C', 'D', 'C']), 'stock', chunk_size=2)
+    assert report.imported == 3 and len(report.errors) == 2
+    # C is created by the third chunk, D never is
+    assert report.new_models == 3
+    index = manager.get_motorcycle_index()
+    assert {'A', 'B', 'C'} <= index.keys() and 'D' not in index
@@ -0,0 +1,32 @@
+import struct
+import zlib
+from utils.columnar import ColumnarWriter, iter_columns, iter_rows, read_footer
+
+COLUMNS = [('id', 'int'), ('price', 'float'), ('client', 'text')]
+ROWS = [(1, 550000.0, 'Aïssata'), (2, None, None), (-3, 0.5, '')]
+
+
+def test_rows_survive_a_round_trip(tmp_path):
+    path = tmp_path / 'sales.col'
+    with ColumnarWriter(path, COLUMNS) as writer:
+        writer.write_rows(ROWS[:2])
+        writer.write_rows(ROWS[2:])
+
+    assert read_footer(path)['rows'] == 3
+    assert list(iter_rows(path)) == ROWS
+    assert [group['price'] for group in iter_columns(path, ['price'])] == [[550000.0, None], [0.5]]
+
+
+def test_numbers_are_little_endian_on_every_host(tmp_path):
+    path = tmp_path / 'sales.col'
+    with ColumnarWriter(path, COLUMNS) as writer:
+        writer.write_rows(ROWS)
+
+    group = read_footer(path)['groups'][0]
+    with open(path, 'rb') as f:
+        f.seek(group['offset'])
+        ids = zlib.decompress(f.read(group['sizes'][0]))
+        f.seek(group['offset'] + sum(group['sizes'][:2]))
+        clients = zlib.decompress(f.read(group['sizes'][2]))
+    assert ids == bytes(3) + struct.pack('<3q', 1, 2, -3)
+    assert clients[3:3 + 12] == struct.pack('<3I', len('Aïssata'.encode('utf-8')), 0, 0)
@@ -0,0 +1,137 @@
+import sqlite3
+import pytest
+from database.db_manager import DatabaseManager
+from database.migrator import MIGRATIONS_DIR, MigrationError, Migrator, latest_version, load_migrations
+
+ITEMS = "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL);\n"
+PRICES = "ALTER TABLE items ADD COLUMN price REAL;\n"
+ONLINE_INDEX = "-- online\nCREATE INDEX IF NOT EXISTS idx_items_name ON items(name);\n"
+
+
+def write_migrations(directory, *scripts):
+    directory.mkdir(exist_ok=True)
+    for version, (name, sql) in enumerate(scripts, start=1):
+        (directory / f"{version:04d}_{name}.sql").write_text(sql, encoding='utf-8')
+    return directory
+
+
+def recorded(conn):
+    return conn.execute("SELECT version, status FROM schema_migrations ORDER BY version").fetchall()
+
+
+def index_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                        (name,)).fetchone() is not None
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'test.db', isolation_level=None)
+    yield conn
+    conn.close()
+
+
+def test_fresh_database_gets_every_migration_once(tmp_path, conn):
+    migrations = write_migrations(tmp_path / 'migrations', ('items', ITEMS), ('prices', PRICES))
+    migrator = Migrator(migrations)
+
+    assert migrator.migrate(conn) == [1, 2]
+    assert migrator.user_version(conn) == 2
+    assert recorded(conn) == [(1, 'applied'), (2, 'applied')]
+    # Current: nothing to do
+    assert migrator.migrate(conn) == []
+
+    write_migrations(tmp_path / 'migrations', ('items', ITEMS), ('prices', PRICES),
+                     ('name_index', ONLINE_INDEX))
+    assert migrator.migrate(conn) == [3]
+    assert index_exists(conn, 'idx_items_name')
+
+
+def test_versions_stamped_before_schema_migrations_are_adopted(tmp_path, conn):
+    conn.executescript(ITEMS + "PRAGMA user_version = 1;")
+    migrations = write_migrations(tmp_path / 'migrations', ('items', ITEMS), ('prices', PRICES))
+
+    assert Migrator(migrations).migrate(conn) == [2]
+    assert recorded(conn) == [(1, 'adopted'), (2, 'applied')]
+
+
+def test_edited_migration_is_refused(tmp_path, conn):
+    migrations = write_migrations(tmp_path / 'migrations', ('items', ITEMS))
+    migrator = Migrator(migrations)
+    migrator.migrate(conn)
+
+    write_migrations(migrations, ('items', ITEMS.replace('name TEXT', 'label TEXT')), ('prices', PRICES))
+    with pytest.raises(MigrationError, match='0001_items'):
+        migrator.migrate(conn)
+    # Rolled back: still at version 1, without the new column
+    assert migrator.user_version(conn) == 1
+    assert 'price' not in [row[1] for row in conn.execute("PRAGMA table_info(items)")]
+    assert [m['checksum_ok'] for m in migrator.status(conn)] == [False, True]
+
+
+def test_line_endings_do_not_change_checksums(tmp_path):
+    lf = write_migrations(tmp_path / 'lf', ('items', ITEMS))
+    crlf = tmp_path / 'crlf'
+    crlf.mkdir()
+    (crlf / '0001_items.sql').write_bytes(ITEMS.replace('\n', '\r\n').encode('utf-8'))
+
+    assert load_migrations(lf)[0].checksum == load_migrations(crlf)[0].checksum
+
+
+def test_online_migration_on_a_large_table_is_left_pending(tmp_path, conn):
+    migrations = write_migrations(tmp_path / 'migrations', ('items', ITEMS), ('name_index', ONLINE_INDEX))
+    migrator = Migrator(migrations, online_threshold=10)
+    migrator.migrate(conn)  # Both applied: the table is empty
+    conn.execute("DROP INDEX idx_items_name")
+    conn.execute("DELETE FROM schema_migrations WHERE version = 2")
+    conn.execute("PRAGMA user_version = 1")
+    conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(10)])
+
+    assert migrator.migrate(conn) == [2]
+    assert recorded(conn) == [(1, 'applied'), (2, 'pending')]
+    assert migrator.user_version(conn) == 2
+    assert not index_exists(conn, 'idx_items_name')
+
+    assert migrator.build_pending(conn) == [2]
+    assert recorded(conn) == [(1, 'applied'), (2, 'applied')]
+    assert index_exists(conn, 'idx_items_name')
+    assert migrator.build_pending(conn) == []
+
+
+def test_online_migration_may_only_create_indexes(tmp_path):
+    migrations = write_migrations(tmp_path / 'migrations', ('items', "-- online\n" + ITEMS))
+    with pytest.raises(MigrationError, match='online'):
+        load_migrations(migrations)
+
+
+def test_gaps_in_numbering_are_refused(tmp_path):
+    migrations = write_migrations(tmp_path / 'migrations', ('items', ITEMS))
+    (migrations / '0003_prices.sql').write_text(PRICES, encoding='utf-8')
+    with pytest.raises(MigrationError, match='follow each other'):
+        load_migrations(migrations)
+
+
+def test_newer_database_is_refused(tmp_path, conn):
+    migrations = write_migrations(tmp_path / 'migrations', ('items', ITEMS))
+    conn.execute("PRAGMA user_version = 5")
+    with pytest.raises(MigrationError, match='newer'):
+        Migrator(migrations).migrate(conn)
+
+
+def test_database_manager_applies_the_shipped_migrations(tmp_path):
+    db = DatabaseManager(tmp_path / 'inventory.db')
+    try:
+        assert db.migrations_applied == list(range(1, latest_version(MIGRATIONS_DIR) + 1))
+        with db.get_connection() as conn:
+            assert all(m['status'] == 'applied' and m['checksum_ok'] for m in db.migrator.status(conn))
+    finally:
+        db.close()
+
+
+def test_database_manager_refuses_to_start_on_a_newer_schema(tmp_path):
+    path = tmp_path / 'inventory.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"PRAGMA user_version = {latest_version(MIGRATIONS_DIR) + 1}")
+    conn.close()
+    with pytest.raises(MigrationError):
+        DatabaseManager(path)
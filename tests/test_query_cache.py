@@ -0,0 +1,30 @@
+from database.inventory_manager import InventoryManager
+
+
+def stock(manager, name):
+    return {item['motorcycle']: item['balance'] for item in manager.get_inventory()}.get(name)
+
+
+def test_writes_from_another_manager_invalidate_the_cache(manager):
+    other = InventoryManager(manager.db.db_path)
+    try:
+        manager.save_motorcycle('Test', 40, 500000.0)
+        assert stock(manager, 'Test') == 40
+        names = len(manager.list_motorcycle_names())
+        assert stock(manager, 'Test') == 40  # Served from cache
+        assert manager.cache.hits > 0
+
+        other.save_sale('Test', 5, 550000.0, "Client", "", "")
+        other.save_motorcycle('Nouveau', 1, 400000.0)
+
+        assert stock(manager, 'Test') == 35
+        assert len(manager.list_motorcycle_names()) == names + 1
+    finally:
+        other.close()
+
+
+def test_unchanged_database_is_served_from_cache(manager):
+    manager.list_motorcycle_names()
+    hits = manager.cache.hits
+    manager.list_motorcycle_names()
+    assert manager.cache.hits == hits + 1
@@ -0,0 +1,22 @@
+import sqlite3
+from datetime import date
+
+
+def test_sales_of_deleted_motorcycles_are_left_out(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    manager.save_sale('Test', 2, 550000.0, "Client", "Gao", "")
+    with sqlite3.connect(manager.db.db_path) as conn:
+        # A sale left behind by a motorcycle deleted before foreign keys were enforced
+        conn.execute("""
+            INSERT INTO sales (motorcycle_id, quantity, price, client_name) VALUES (999, 1, 100.0, 'Autre')
+        """)
+    conn.close()
+
+    today = date.today()
+    analytics = manager.analytics
+    report = manager.get_sales_report(today)
+    assert analytics.summary(today, today)['sales'] == len(report) == 1
+    assert analytics.summary(today, today)['revenue'] == 1100000.0
+    assert [row['sales'] for row in analytics.totals_by_period(today, today)] == [1]
+    assert [row['name'] for row in analytics.top_models(today, today)] == ['Test']
+    assert [row['client'] for row in analytics.totals_by_client(today, today)] == ['Client']
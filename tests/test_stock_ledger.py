@@ -0,0 +1,99 @@
+import sqlite3
+from datetime import date, timedelta
+
+
+def checkpoints(manager):
+    return manager.db.execute_query("SELECT COUNT(*) FROM stock_checkpoints")[0][0]
+
+
+def raw_connection(manager):
+    """A plain connection to the same file, to corrupt it behind the manager's back"""
+    return sqlite3.connect(manager.db.db_path)
+
+
+def test_writes_keep_the_ledger_consistent(manager):
+    manager.save_motorcycle('Test', 10, 500000.0, "livraison")
+    manager.save_sale('Test', 3, 550000.0, "Client", "Gao", "")
+    manager.adjust_stock('Test', 5, "inventaire")
+
+    assert manager.verify_stock_ledger() == []
+    assert manager.verify_stock_ledger(full=True) == []
+    assert [row['balance'] for row in reversed(manager.ledger.history('Test'))] == [10, 7, 5]
+    assert manager.get_stock_at('Test', date.today() + timedelta(days=1)) == 5
+    assert manager.get_stock_at('Test', date.today() - timedelta(days=1)) == 0
+    assert manager.get_stock_at('Inconnue', date.today()) is None
+
+
+def test_verify_is_read_only(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+
+    assert manager.verify_stock_ledger() == []
+    assert manager.check_integrity() == []
+    assert checkpoints(manager) == 0
+
+
+def test_checkpoint_moves_the_verification_start(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+
+    problems, written = manager.checkpoint_stock_ledger()
+    assert problems == []
+    assert written == checkpoints(manager) > 0
+    # Nothing new since: a second run has nothing to checkpoint
+    assert manager.checkpoint_stock_ledger() == ([], 0)
+
+    manager.save_sale('Test', 4, 550000.0, "Client", "", "")
+    problems, written = manager.checkpoint_stock_ledger()
+    assert problems == [] and written == 1
+
+
+def test_drifted_balance_is_reported_and_not_checkpointed(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    motorcycle_id = manager.get_motorcycle_index()['Test'][0]
+    with raw_connection(manager) as conn:
+        # A +2 change recorded with the balance of a +1
+        conn.execute("UPDATE motorcycles SET quantity = 12 WHERE id = ?", (motorcycle_id,))
+        conn.execute("""
+            INSERT INTO stock_ledger (motorcycle_id, kind, delta, balance) VALUES (?, 'entry', 2, 11)
+        """, (motorcycle_id,))
+
+    problems = manager.verify_stock_ledger()
+    assert any("has balance 11, expected 12" in problem for problem in problems)
+    assert any("ends at 11 but stock is 12" in problem for problem in problems)
+
+    problems, written = manager.checkpoint_stock_ledger()
+    assert problems and written == 0
+    assert checkpoints(manager) == 0
+
+
+def test_rows_before_a_checkpoint_are_only_seen_by_a_full_verify(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    manager.checkpoint_stock_ledger()
+    motorcycle_id = manager.get_motorcycle_index()['Test'][0]
+    with raw_connection(manager) as conn:
+        # Rewrite the checkpointed history: the triggers forbid it, so bypass them
+        conn.execute("DROP TRIGGER stock_ledger_no_update")
+        conn.execute("UPDATE stock_ledger SET delta = 9 WHERE motorcycle_id = ?", (motorcycle_id,))
+
+    assert manager.verify_stock_ledger() == []
+    assert any("expected 9" in problem for problem in manager.verify_stock_ledger(full=True))
+
+
+def test_ledger_is_append_only(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    with raw_connection(manager) as conn:
+        for statement in ("UPDATE stock_ledger SET balance = 0", "DELETE FROM stock_ledger"):
+            try:
+                conn.execute(statement)
+            except sqlite3.IntegrityError as e:
+                assert 'append-only' in str(e)
+            else:
+                raise AssertionError(f"{statement} was allowed")
+
+
+def test_deleting_a_motorcycle_removes_its_ledger(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    manager.checkpoint_stock_ledger()
+
+    assert manager.delete_motorcycle('Test')
+    assert manager.ledger.history('Test') == []
+    assert manager.verify_stock_ledger(full=True) == []
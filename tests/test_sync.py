@@ -0,0 +1,141 @@
+import sqlite3
+import pytest
+from sync.engine import SyncWorker, decode_batch, encode_batch
+from sync.targets import SQLiteTarget
+
+
+@pytest.fixture
+def replica(tmp_path):
+    target = SQLiteTarget(tmp_path / 'replica.db')
+    yield target
+    target.close()
+
+
+def changelog(manager):
+    return manager.db.execute_query("SELECT COUNT(*) FROM sync_changes")[0][0]
+
+
+def rows(path, table):
+    with sqlite3.connect(path) as conn:
+        result = conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+    conn.close()
+    return result
+
+
+def local_rows(manager, table):
+    return [tuple(row) for row in manager.db.execute_query(f"SELECT * FROM {table} ORDER BY id")]
+
+
+def assert_replicated(manager, replica):
+    for table in ('motorcycles', 'sales', 'inventory_movements'):
+        assert rows(replica.path, table) == local_rows(manager, table), table
+
+
+def test_batches_survive_encoding():
+    batch = {'source': 'shop', 'to_seq': 3, 'rows': 1,
+             'tables': {'sales': {'columns': ['id', 'client_name'], 'upserts': [[1, 'Aïssata']],
+                                  'deletes': [2]}}}
+    assert decode_batch(encode_batch(batch)) == batch
+
+
+def test_nothing_is_captured_without_a_target(manager):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    manager.save_sale('Test', 1, 550000.0, "Client", "", "")
+    assert changelog(manager) == 0
+
+
+def test_snapshot_resumes_where_it_stopped(manager, replica):
+    for i in range(5):
+        manager.save_motorcycle(f"Modèle {i}", 3, 400000.0)
+    worker = SyncWorker(manager.db, replica, batch_size=4)
+
+    report = worker.sync_once(max_batches=2)
+    assert report['status'] == 'ok' and report['batches'] == 2
+    assert worker.lag()['snapshot'] is not None
+
+    report = worker.sync_once()
+    assert report['status'] == 'ok'
+    assert worker.lag()['snapshot'] is None
+    assert_replicated(manager, replica)
+
+
+def test_changes_are_coalesced_and_pruned(manager, replica):
+    worker = SyncWorker(manager.db, replica)
+    worker.sync_once()
+
+    manager.save_motorcycle('Test', 10, 500000.0)
+    for _ in range(3):
+        manager.save_sale('Test', 1, 550000.0, "Client", "Gao", "")
+    assert changelog(manager) > 0
+
+    report = worker.sync_once()
+    assert report['status'] == 'ok' and report['batches'] == 1
+    # The motorcycle changed four times but is sent once
+    assert report['rows'] == 1 + 3 + 1
+    assert changelog(manager) == 0
+    assert worker.lag()['pending'] == 0
+    assert_replicated(manager, replica)
+
+    assert manager.delete_motorcycle('Test')
+    report = worker.sync_once()
+    assert report['deletes'] > 0
+    assert_replicated(manager, replica)
+
+
+def test_offline_target_is_retried_from_the_cursor(manager, tmp_path):
+    manager.save_motorcycle('Test', 10, 500000.0)
+    # A directory that does not exist yet: the connection fails
+    unreachable = SQLiteTarget(tmp_path / 'usb' / 'replica.db')
+    worker = SyncWorker(manager.db, unreachable)
+
+    report = worker.sync_once()
+    assert report['status'] == 'offline'
+    assert worker.lag()['snapshot'] == 'motorcycles'
+
+    (tmp_path / 'usb').mkdir()
+    manager.save_sale('Test', 2, 550000.0, "Client", "", "")
+    report = worker.sync_once()
+    assert report['status'] == 'ok'
+    assert_replicated(manager, unreachable)
+    unreachable.close()
+
+
+def test_a_batch_applied_twice_changes_nothing(manager, replica):
+    worker = SyncWorker(manager.db, replica)
+    worker.sync_once()
+    manager.save_motorcycle('Test', 10, 500000.0)
+
+    state = worker._load_state()
+    batch = worker._changes_batch(state)
+    payload = encode_batch(batch)
+    assert replica.apply(worker.source, payload) is True
+    assert replica.apply(worker.source, payload) is False
+    assert replica.cursor(worker.source) == batch['to_seq']
+
+
+def test_lost_acknowledgement_is_not_sent_again(manager, replica):
+    worker = SyncWorker(manager.db, replica)
+    worker.sync_once()
+    manager.save_motorcycle('Test', 10, 500000.0)
+
+    # The target applies the batch but the worker never records it
+    batch = worker._changes_batch(worker._load_state())
+    replica.apply(worker.source, encode_batch(batch))
+
+    report = worker.sync_once()
+    assert report['status'] == 'ok' and report['batches'] == 0
+    assert worker.lag()['last_seq'] == batch['to_seq']
+    assert changelog(manager) == 0
+    assert_replicated(manager, replica)
+
+
+def test_forgetting_the_last_target_stops_capture(manager, replica):
+    worker = SyncWorker(manager.db, replica)
+    worker.sync_once()
+    manager.save_motorcycle('Test', 10, 500000.0)
+    assert changelog(manager) > 0
+
+    worker.forget()
+    assert changelog(manager) == 0
+    manager.save_motorcycle('Test', 1, 500000.0)
+    assert changelog(manager) == 0
@@ -0,0 +1,316 @@
+import csv
+import time
+import unicodedata
+from datetime import datetime
+from itertools import islice
+
+# Accepted column headers, compared without case or accents
+STOCK_COLUMNS = {
+    'name': ('nom', 'name', 'marque', 'marques', 'moto', 'modele'),
+    'entries': ('entrees', 'entries', 'quantite', 'quantity', 'qte'),
+    'price': ('prix', 'price', 'prix unitaire'),
+    'comment': ('commentaire', 'comment'),
+    'date': ('date',),
+}
+SALES_COLUMNS = {
+    'name': ('nom', 'name', 'marque', 'moto', 'modele'),
+    'quantity': ('quantite', 'quantity', 'qte'),
+    'price': ('prix', 'price', 'prix unitaire'),
+    'client_name': ('client', 'nom du client', 'client_name'),
+    'client_address': ('adresse', 'client_address'),
+    'client_phone': ('telephone', 'tel', 'client_phone'),
+    'date': ('date',),
+}
+REQUIRED = {
+    'stock': ('name', 'entries'),
+    'sales': ('name', 'quantity', 'price', 'client_name'),
+}
+# Tried after ISO 8601
+DATE_FORMATS = ('%d/%m/%Y %H:%M', '%d/%m/%Y', '%d/%m/%y')
+
+
+class ImportReport:
+    """Outcome of an import: counters and the rejected rows with their reason"""
+
+    def __init__(self, kind, dry_run):
+        self.kind = kind
+        self.dry_run = dry_run
+        self.rows = 0
+        self.imported = 0
+        self.new_models = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'dry_run': self.dry_run,
+            'rows': self.rows,
+            'imported': self.imported,
+            'new_models': self.new_models,
+            'errors': [{'line': line, 'message': message} for line, message in self.errors],
+            'seconds': round(self.elapsed, 3),
+        }
+
+    def write_errors(self, path):
+        """Write the rejected rows as a CSV file (line;message)"""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(['ligne', 'erreur'])
+            writer.writerows(self.errors)
+
+    def summary(self):
+        verb = "à importer" if self.dry_run else "importées"
+        text = f"{self.imported}/{self.rows} lignes {verb}"
+        if self.new_models:
+            text += f", {self.new_models} nouveaux modèles"
+        if self.errors:
+            text += f", {len(self.errors)} erreurs"
+        return text
+
+
+def _normalize(header):
+    header = unicodedata.normalize('NFKD', str(header or '')).encode('ascii', 'ignore').decode()
+    return ' '.join(header.lower().replace('_', ' ').split())
+
+
+def _column_map(headers, columns):
+    """{field: position} for the headers that match a known column"""
+    positions = {}
+    normalized = [_normalize(h) for h in headers]
+    for field, aliases in columns.items():
+        for alias in aliases:
+            alias = _normalize(alias)
+            if alias in normalized:
+                positions[field] = normalized.index(alias)
+                break
+    return positions
+
+
+def read_rows(path):
+    """Yield (line number, list of cells) from a CSV or Excel file, header first.
+
+    CSV files may use ',', ';' or tabs. .xlsx files need openpyxl, which
+    is only imported for them.
+    """
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("openpyxl est requis pour importer des fichiers Excel (pip install openpyxl)")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for line, row in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+                yield line, ['' if cell is None else cell for cell in row]
+        finally:
+            workbook.close()
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        for line, row in enumerate(csv.reader(f, dialect), start=1):
+            yield line, row
+
+
+def parse_number(value, cast=float):
+    """Number from a cell, accepting '1 200,50' as well as '1200.50'"""
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        text = str(value).replace('\u00a0', '').replace(' ', '').strip()
+        if ',' in text and '.' not in text:
+            text = text.replace(',', '.')
+        number = float(text)
+    if cast is int:
+        if number != int(number):
+            raise ValueError(value)
+        return int(number)
+    return float(number)
+
+
+def parse_date(value):
+    """'YYYY-MM-DD HH:MM:SS' from a cell, or None for an empty cell"""
+    if value in ('', None):
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(' ', 'seconds')
+    text = str(value).strip()
+    try:
+        # ISO dates are the common case and fromisoformat is much cheaper than strptime
+        return datetime.fromisoformat(text).isoformat(' ', 'seconds')
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).isoformat(' ', 'seconds')
+        except ValueError:
+            pass
+    raise ValueError(value)
+
+
+def _cell(row, positions, field):
+    position = positions.get(field)
+    if position is None or position >= len(row):
+        return ''
+    value = row[position]
+    return value.strip() if isinstance(value, str) else value
+
+
+def _parse_stock_row(row, positions):
+    name = str(_cell(row, positions, 'name')).strip()
+    if not name:
+        raise ValueError("nom manquant")
+    try:
+        entries = parse_number(_cell(row, positions, 'entries'), int)
+    except ValueError:
+        raise ValueError(f"entrées invalides: {_cell(row, positions, 'entries')!r}")
+    if entries <= 0:
+        raise ValueError(f"entrées doivent être positives: {entries}")
+    price = _cell(row, positions, 'price')
+    try:
+        price = parse_number(price) if price != '' else 0.0
+    except ValueError:
+        raise ValueError(f"prix invalide: {price!r}")
+    if price < 0:
+        raise ValueError(f"prix négatif: {price}")
+    try:
+        date = parse_date(_cell(row, positions, 'date'))
+    except ValueError:
+        raise ValueError(f"date invalide: {_cell(row, positions, 'date')!r}")
+    return (name, entries, price, str(_cell(row, positions, 'comment')), date)
+
+
+def _parse_sale_row(row, positions):
+    name = str(_cell(row, positions, 'name')).strip()
+    if not name:
+        raise ValueError("nom manquant")
+    try:
+        quantity = parse_number(_cell(row, positions, 'quantity'), int)
+    except ValueError:
+        raise ValueError(f"quantité invalide: {_cell(row, positions, 'quantity')!r}")
+    if quantity <= 0:
+        raise ValueError(f"quantité doit être positive: {quantity}")
+    try:
+        price = parse_number(_cell(row, positions, 'price'))
+    except ValueError:
+        raise ValueError(f"prix invalide: {_cell(row, positions, 'price')!r}")
+    client_name = str(_cell(row, positions, 'client_name')).strip()
+    if not client_name:
+        raise ValueError("nom du client manquant")
+    try:
+        date = parse_date(_cell(row, positions, 'date'))
+    except ValueError:
+        raise ValueError(f"date invalide: {_cell(row, positions, 'date')!r}")
+    return (name, quantity, price, client_name,
+            str(_cell(row, positions, 'client_address')),
+            str(_cell(row, positions, 'client_phone')), date)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_file(inventory_manager, path, kind, dry_run=False, chunk_size=5000, progress=None):
+    """Stream a supplier spreadsheet of stock entries ('stock') or sales ('sales') into the database.
+
+    Rows are validated one by one; invalid rows are reported with their
+    line number and skipped. Valid rows are written with executemany, one
+    transaction per `chunk_size` rows, and daily_stock is rebuilt once at
+    the end for the models touched. Sales are checked against the stock
+    left by the rows before them. With `dry_run`, everything is validated
+    and counted but nothing is written. `progress(rows)` is called after
+    each chunk. Returns an ImportReport.
+    """
+    columns, parse_row = {
+        'stock': (STOCK_COLUMNS, _parse_stock_row),
+        'sales': (SALES_COLUMNS, _parse_sale_row),
+    }[kind]
+    report = ImportReport(kind, dry_run)
+    started = time.perf_counter()
+
+    rows = read_rows(path)
+    header = next(rows, None)
+    if header is None:
+        report.add_error(1, "fichier vide")
+        return report
+    positions = _column_map(header[1], columns)
+    missing = [field for field in REQUIRED[kind] if field not in positions]
+    if missing:
+        report.add_error(header[0], f"colonnes manquantes: {', '.join(missing)}")
+        return report
+
+    index = inventory_manager.get_motorcycle_index()
+    ids = {name: motorcycle_id for name, (motorcycle_id, _) in index.items()}
+    stock = {name: quantity for name, (_, quantity) in index.items()}
+    touched = set()
+    # Models created by the chunks written so far (or that would be, in a dry run)
+    created = set()
+
+    def valid_rows():
+        for line, row in rows:
+            if not any(str(cell).strip() for cell in row):
+                continue
+            report.rows += 1
+            try:
+                record = parse_row(row, positions)
+            except ValueError as e:
+                report.add_error(line, str(e))
+                continue
+            name = record[0]
+            if kind == 'sales':
+                if name not in stock:
+                    report.add_error(line, f"moto inconnue: {name}")
+                    continue
+                if stock[name] < record[1]:
+                    report.add_error(line, f"stock insuffisant pour {name}: {stock[name]} < {record[1]}")
+                    continue
+                stock[name] -= record[1]
+            yield line, record
+
+    for chunk in _chunks(valid_rows(), chunk_size):
+        records = [record for _, record in chunk]
+        new_models = set()
+        if kind == 'stock':
+            new_models = {record[0] for record in records} - ids.keys() - created
+        if not dry_run:
+            try:
+                if kind == 'stock':
+                    touched |= inventory_manager.import_entries(records, ids)
+                else:
+                    touched |= inventory_manager.import_sales(records, ids)
+            except Exception as e:
+                for line, record in chunk:
+                    report.add_error(line, f"lot rejeté: {e}")
+                    if kind == 'sales':
+                        # Not sold after all: later rows may still use this stock
+                        stock[record[0]] += record[1]
+                continue
+        # Counted once the chunk is committed: a rejected chunk creates nothing
+        created |= new_models
+        report.new_models += len(new_models)
+        report.imported += len(records)
+        if progress:
+            progress(report.rows)
+
+    if touched:
+        inventory_manager.rebuild_daily_stock(touched)
+    report.errors.sort()
+    report.elapsed = time.perf_counter() - started
+    return report
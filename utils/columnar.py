@@ -0,0 +1,134 @@
+import json
+import struct
+import zlib
+
+MAGIC = b'MOTOCOL1'
+TYPES = ('int', 'float', 'text')
+
+
+class ColumnarWriter:
+    """Writes rows as a compact column-oriented binary file, one row group per write_rows() call.
+
+    Layout: MAGIC, then row groups, then a JSON footer and its length
+    (8 bytes, little endian) and MAGIC again. In a row group each column
+    is stored as a zlib block: a null mask (one byte per row) followed by
+    int64 or float64 values, or for text the uint32 byte lengths and the
+    UTF-8 data. Numbers are little endian whatever the host, so files
+    move between machines. Only one row group is held in memory at a time.
+    """
+
+    def __init__(self, path, columns):
+        """`columns` is a list of (name, type) with type in TYPES"""
+        for name, kind in columns:
+            if kind not in TYPES:
+                raise ValueError(f"Unknown column type for {name}: {kind}")
+        self.path = path
+        self.columns = list(columns)
+        self.groups = []
+        self.rows = 0
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+
+    def write_rows(self, rows):
+        """Append one row group; `rows` is a sequence of tuples in column order"""
+        if not rows:
+            return
+        group = {'offset': self._file.tell(), 'rows': len(rows), 'sizes': []}
+        for position, (_, kind) in enumerate(self.columns):
+            values = [row[position] for row in rows]
+            block = zlib.compress(self._encode(values, kind), 6)
+            self._file.write(block)
+            group['sizes'].append(len(block))
+        self.groups.append(group)
+        self.rows += len(rows)
+
+    @staticmethod
+    def _encode(values, kind):
+        nulls = bytes(value is None for value in values)
+        has_nulls = any(nulls)
+        if kind == 'int':
+            data = [0 if value is None else int(value) for value in values] if has_nulls else values
+            return nulls + _pack('q', data)
+        if kind == 'float':
+            data = ([0.0 if value is None else float(value) for value in values]
+                    if has_nulls else list(map(float, values)))
+            return nulls + _pack('d', data)
+        encoded = [b'' if value is None else str(value).encode('utf-8') for value in values]
+        return nulls + _pack('I', [len(value) for value in encoded]) + b''.join(encoded)
+
+    def close(self):
+        footer = json.dumps({
+            'columns': [{'name': name, 'type': kind} for name, kind in self.columns],
+            'rows': self.rows,
+            'groups': self.groups,
+        }).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(struct.pack('<Q', len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _pack(code, values):
+    """Little-endian, standard-size encoding of `values` with a struct format code"""
+    return struct.pack(f'<{len(values)}{code}', *values)
+
+
+def _unpack(code, data, count):
+    return struct.unpack_from(f'<{count}{code}', data)
+
+
+def read_footer(path):
+    """Schema and row group index of a columnar file"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        f.seek(-(8 + len(MAGIC)), 2)
+        length = struct.unpack('<Q', f.read(8))[0]
+        f.seek(-(8 + len(MAGIC) + length), 2)
+        return json.loads(f.read(length))
+
+
+def iter_columns(path, columns=None):
+    """Yield each row group as {column name: list of values}, reading only `columns`"""
+    footer = read_footer(path)
+    schema = footer['columns']
+    wanted = set(columns) if columns is not None else {c['name'] for c in schema}
+    with open(path, 'rb') as f:
+        for group in footer['groups']:
+            offset = group['offset']
+            result = {}
+            for column, size in zip(schema, group['sizes']):
+                if column['name'] in wanted:
+                    f.seek(offset)
+                    result[column['name']] = _decode(zlib.decompress(f.read(size)),
+                                                     column['type'], group['rows'])
+                offset += size
+            yield result
+
+
+def iter_rows(path):
+    """Yield the rows of a columnar file as tuples in column order"""
+    names = [c['name'] for c in read_footer(path)['columns']]
+    for group in iter_columns(path):
+        yield from zip(*(group[name] for name in names))
+
+
+def _decode(data, kind, count):
+    nulls = data[:count]
+    data = data[count:]
+    if kind in ('int', 'float'):
+        values = _unpack('q' if kind == 'int' else 'd', data, count)
+        return [None if null else value for null, value in zip(nulls, values)]
+    lengths = _unpack('I', data, count)
+    values = []
+    position = 4 * count
+    for null, length in zip(nulls, lengths):
+        values.append(None if null else data[position:position + length].decode('utf-8'))
+        position += length
+    return values
@@ -0,0 +1,163 @@
+import csv
+import json
+import os
+from datetime import datetime
+from utils.columnar import ColumnarWriter
+
+# Exported tables: column name and type, in file order
+TABLES = {
+    'motorcycles': [('id', 'int'), ('name', 'text'), ('quantity', 'int'),
+                    ('price', 'float'), ('created_at', 'text')],
+    'sales': [('id', 'int'), ('motorcycle_id', 'int'), ('quantity', 'int'), ('price', 'float'),
+              ('client_name', 'text'), ('client_address', 'text'), ('client_phone', 'text'),
+              ('sale_date', 'text')],
+    'inventory_movements': [('id', 'int'), ('motorcycle_id', 'int'), ('entries', 'int'),
+                            ('outputs', 'int'), ('price', 'float'), ('comment', 'text'),
+                            ('movement_date', 'text')],
+}
+INVENTORY_COLUMNS = [('date', 'text'), ('motorcycle', 'text'), ('prev_stock', 'int'),
+                     ('entries', 'int'), ('outputs', 'int'), ('price', 'float'),
+                     ('balance', 'int'), ('comment', 'text')]
+# Append-only tables can be exported incrementally by id; the others are small and
+# updated in place, so they are always exported in full
+INCREMENTAL_TABLES = ('sales', 'inventory_movements')
+DATE_COLUMNS = {'sales': 'sale_date', 'inventory_movements': 'movement_date',
+                'motorcycles': 'created_at'}
+EXTENSIONS = {'csv': 'csv', 'columnar': 'mcol'}
+STATE_FILE = 'export_state.json'
+
+
+class CsvWriter:
+    """Same interface as ColumnarWriter, for CSV output"""
+
+    def __init__(self, path, columns):
+        self.rows = 0
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class DataExporter:
+    """Streams tables of the inventory database to CSV or columnar files.
+
+    Tables are read in id order, `chunk_size` rows at a time with
+    `WHERE id > ?` (no OFFSET rescans), so memory stays bounded whatever the
+    table size. With `incremental`, sales and movements only export the
+    rows added since the last run, as recorded in export_state.json in the
+    output directory.
+    """
+
+    def __init__(self, inventory_manager, output_dir='exports', fmt='csv', chunk_size=5000):
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.inventory_manager = inventory_manager
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+
+    def load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_state(self, state):
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def _open(self, name, columns):
+        path = os.path.join(self.output_dir, f"{name}.{EXTENSIONS[self.fmt]}")
+        writer = CsvWriter(path, columns) if self.fmt == 'csv' else ColumnarWriter(path, columns)
+        return path, writer
+
+    def iter_chunks(self, table, since_id=0, since_date=None):
+        """Yield lists of rows of `table` with id > `since_id`, in id order.
+
+        Read errors are raised: an export cut short must not look complete.
+        """
+        columns = ', '.join(name for name, _ in TABLES[table])
+        query = f"SELECT {columns} FROM {table} WHERE id > ?"
+        params = [since_id]
+        if since_date is not None:
+            query += f" AND {DATE_COLUMNS[table]} >= ?"
+            params.append(since_date)
+        query += " ORDER BY id LIMIT ?"
+        while True:
+            # One query per chunk, so the read connection is not held between chunks
+            rows = list(self.inventory_manager.db.iter_query(query, params + [self.chunk_size],
+                                                             self.chunk_size))
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+            params[0] = rows[-1][0]
+            if len(rows) < self.chunk_size:
+                return
+
+    def export_table(self, table, since_id=0, since_date=None):
+        """Export one table; returns {'table', 'path', 'rows', 'last_id'}"""
+        name = table if not since_id else f"{table}_from_{since_id + 1}"
+        path, writer = self._open(name, TABLES[table])
+        last_id = since_id
+        try:
+            for rows in self.iter_chunks(table, since_id, since_date):
+                writer.write_rows(rows)
+                last_id = rows[-1][0]
+        finally:
+            writer.close()
+        if since_id and not writer.rows:
+            # Nothing new since the last run: no empty file to pick up
+            os.remove(path)
+            path = None
+        return {'table': table, 'path': path, 'rows': writer.rows, 'last_id': last_id}
+
+    def export_inventory(self):
+        """Export the computed inventory view (one row per motorcycle)"""
+        path, writer = self._open('inventory', INVENTORY_COLUMNS)
+        try:
+            writer.write_rows([tuple(item[name] for name, _ in INVENTORY_COLUMNS)
+                               for item in self.inventory_manager.get_inventory()])
+        finally:
+            writer.close()
+        return {'table': 'inventory', 'path': path, 'rows': writer.rows, 'last_id': None}
+
+    def export(self, tables=None, incremental=False, since_date=None):
+        """Export `tables` (default: all, plus the inventory view) and record the last ids exported.
+
+        The state is saved only once every table is written, and not for a
+        `since_date` export, which skips older rows an incremental run
+        would still have to export.
+        """
+        tables = list(tables) if tables is not None else list(TABLES) + ['inventory']
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = self.load_state()
+        results = []
+        exported = {}
+        for table in tables:
+            if table == 'inventory':
+                results.append(self.export_inventory())
+                continue
+            if table not in TABLES:
+                raise ValueError(f"Unknown table: {table}")
+            since_id = 0
+            if incremental and table in INCREMENTAL_TABLES:
+                since_id = state.get(table, {}).get('last_id', 0)
+            result = self.export_table(table, since_id, since_date)
+            results.append(result)
+            if table in INCREMENTAL_TABLES:
+                exported[table] = {'last_id': result['last_id'],
+                                   'exported_at': datetime.now().isoformat(timespec='seconds')}
+        if incremental or since_date is None:
+            state.update(exported)
+            self.save_state(state)
+        return results
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from database.query_stats import Histogram
+
+
+class SpanRecorder:
+    """Named wall-clock timers: one histogram per span name and the latest spans in order.
+
+    Spans wrap whole operations (a frame refresh, a PDF) where QueryStats
+    only sees SQL, so the two together tell where a slow action goes.
+    """
+
+    def __init__(self, max_recent=500):
+        self.spans = {}
+        self.recent = deque(maxlen=max_recent)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, started=None):
+        ms = seconds * 1000.0
+        with self._lock:
+            histogram = self.spans.get(name)
+            if histogram is None:
+                histogram = self.spans[name] = Histogram()
+            histogram.add(ms)
+            self.recent.append({
+                'name': name,
+                'start': datetime.fromtimestamp(started or time.time() - seconds).isoformat(timespec='milliseconds'),
+                'ms': round(ms, 3),
+                'thread': threading.current_thread().name,
+            })
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block under `name`, whether it returns or raises"""
+        started_wall = time.time()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, started_wall)
+
+    def timed(self, name):
+        """Decorator timing every call of the function under `name`"""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.recent.clear()
+
+    def as_dict(self):
+        with self._lock:
+            spans = [dict(histogram.as_dict(), name=name) for name, histogram in self.spans.items()]
+            recent = list(self.recent)
+        spans.sort(key=lambda s: s['total_ms'], reverse=True)
+        return {'spans': spans, 'recent': recent}
+
+
+# Process-wide recorder used by the GUI and the PDF generators
+SPANS = SpanRecorder()
+span = SPANS.span
+timed = SPANS.timed
+
+
+def snapshot(query_stats=None):
+    """Spans, and SQL statistics when given, as one JSON-serializable dict"""
+    data = {'generated': datetime.now().isoformat(timespec='seconds')}
+    data.update(SPANS.as_dict())
+    if query_stats is not None:
+        data['sql'] = query_stats.as_dict()
+    return data
+
+
+def export_json(path, query_stats=None):
+    """Write snapshot() to `path`; returns the path"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(query_stats), f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,70 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.instrumentation import timed
+from utils.invoice_generator import InvoiceGenerator
+
+# Measured with 'spawn': a worker needs ~0.25 s to start and import ReportLab,
+# then renders an invoice in ~2.5 ms
+WORKER_START_S = 0.25
+INVOICE_S = 0.0025
+
+def parallel_threshold(workers):
+    """Smallest batch that renders faster on `workers` processes than in this one"""
+    if workers <= 1:
+        return math.inf
+    # Workers start side by side: the batch must save more than one start-up
+    return math.ceil(WORKER_START_S / (INVOICE_S * (1 - 1 / workers)))
+
+def _render_chunk(sales, output_dir):
+    """Worker: render a chunk of invoices and return their filenames"""
+    return [InvoiceGenerator.generate_invoice(sale, output_dir=output_dir) for sale in sales]
+
+@timed('pdf.invoice_batch')
+def generate_invoices(inventory_manager, sale_ids=None, start=None, end=None,
+                      output_dir='factures', workers=None, chunk_size=25, progress=None):
+    """Render the invoices of many sales in parallel worker processes.
+
+    Sales are selected by `sale_ids` and/or an inclusive `start`/`end` date
+    range. Each invoice is named after its sale id, so re-running a batch
+    overwrites the same files instead of piling up duplicates.
+    `progress(done, total)` is called from the calling thread as chunks
+    finish. Without `workers`, a batch uses every CPU once it is large
+    enough to repay the start of the workers (see parallel_threshold).
+    Returns the list of generated filenames, in sale id order.
+    """
+    sales = inventory_manager.get_sales_for_invoices(sale_ids=sale_ids, start=start, end=end)
+    total = len(sales)
+    if not total:
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+
+    chunks = [sales[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = cpus if total >= parallel_threshold(cpus) else 1
+    workers = min(workers, len(chunks))
+    results = {}
+    done = 0
+
+    if workers <= 1:
+        for index, chunk in enumerate(chunks):
+            results[index] = _render_chunk(chunk, output_dir)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    else:
+        # 'spawn' keeps the workers clear of the GUI's threads and Tk state
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {executor.submit(_render_chunk, chunk, output_dir): index
+                       for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                done += len(chunks[index])
+                if progress:
+                    progress(done, total)
+
+    return [filename for index in range(len(chunks)) for filename in results[index]]
\ No newline at end of file
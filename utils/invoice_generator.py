@@ -1,58 +1,58 @@
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
 from reportlab.lib.units import cm
 from datetime import datetime
+import os
+from utils.instrumentation import timed
+from utils.letterhead import Letterhead
+
+INVOICE_HEADERS = ['Description', 'Quantité', 'Prix unitaire', 'Montant']
+INVOICE_COLUMNS = [2*cm, 8*cm, 12*cm, 16*cm]
 
 class InvoiceGenerator:
     @staticmethod
-    def generate_invoice(sale_data: dict) -> str:
-        filename = f"facture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    def invoice_filename(sale_data: dict, output_dir: str = '.') -> str:
+        """Deterministic name for recorded sales, collision-free name otherwise"""
+        if sale_data.get('id') is not None:
+            return os.path.join(output_dir, f"facture_{sale_data['id']:06d}.pdf")
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        filename = os.path.join(output_dir, f"facture_{stamp}.pdf")
+        suffix = 1
+        while os.path.exists(filename):
+            filename = os.path.join(output_dir, f"facture_{stamp}_{suffix}.pdf")
+            suffix += 1
+        return filename
+
+    @staticmethod
+    @timed('pdf.invoice')
+    def generate_invoice(sale_data: dict, filename: str = None, output_dir: str = '.') -> str:
+        """Render one invoice; `sale_data` may carry the sale 'id' and 'date'"""
+        filename = filename or InvoiceGenerator.invoice_filename(sale_data, output_dir)
+        invoice_date = sale_data.get('date') or datetime.now()
+        if isinstance(invoice_date, str):
+            invoice_date = datetime.fromisoformat(invoice_date)
+        invoice_number = sale_data.get('id') or invoice_date.strftime('%Y%m%d%H%M')
         c = canvas.Canvas(filename, pagesize=A4)
         
-        # En-tête
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(6*cm, 28*cm, "GESTION DES MOTOS")
-        
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(6*cm, 27*cm, "NOUHOU BAMMA TOURE")
-        
-        c.setFont("Helvetica", 12)
-        c.drawString(6*cm, 26.5*cm, "Vendeur des motos")
-        c.drawString(6*cm, 26*cm, "Tél : +223 77873789 / 90434307 / 83211674")
-        c.drawString(6*cm, 25.5*cm, "Adresse : 5eme Quartier GAO Rep.Du Mali")
+        # En-tête (une facture tient sur une page : dessin direct, sans formulaire)
+        Letterhead.draw_company_header(c)
         
         # Numéro et date de facture
         c.setFont("Helvetica-Bold", 12)
-        c.drawString(2*cm, 24*cm, f"FACTURE N° {datetime.now().strftime('%Y%m%d%H%M')}")
-        c.drawString(2*cm, 23.5*cm, f"Date: {datetime.now().strftime('%d/%m/%Y')}")
+        c.drawString(2*cm, 24*cm, f"FACTURE N° {invoice_number}")
+        c.drawString(2*cm, 23.5*cm, f"Date: {invoice_date.strftime('%d/%m/%Y')}")
         
         # Informations client
         c.setFont("Helvetica-Bold", 12)
         c.drawString(2*cm, 22*cm, "CLIENT:")
         c.setFont("Helvetica", 11)
         c.drawString(2*cm, 21.5*cm, f"Nom: {sale_data['client_name']}")
-        c.drawString(2*cm, 21*cm, f"Adresse: {sale_data['client_address']}")
-        c.drawString(2*cm, 20.5*cm, f"Téléphone: {sale_data['client_phone']}")
+        c.drawString(2*cm, 21*cm, f"Adresse: {sale_data.get('client_address') or ''}")
+        c.drawString(2*cm, 20.5*cm, f"Téléphone: {sale_data.get('client_phone') or ''}")
         
         # Tableau des produits
-        def draw_table_header(y):
-            headers = ['Description', 'Quantité', 'Prix unitaire', 'Montant']
-            x_positions = [2*cm, 8*cm, 12*cm, 16*cm]
-            
-            # Fond gris pour l'en-tête
-            c.setFillColor(colors.lightgrey)
-            c.rect(2*cm, y-0.5*cm, 17*cm, 0.8*cm, fill=True)
-            c.setFillColor(colors.black)
-            
-            # Texte de l'en-tête
-            c.setFont("Helvetica-Bold", 11)
-            for header, x in zip(headers, x_positions):
-                c.drawString(x, y, header)
-            
-            return y - 1*cm
-        
-        y = draw_table_header(19*cm)
+        Letterhead.draw_table_header(c, INVOICE_HEADERS, INVOICE_COLUMNS, 11, 19*cm)
+        y = 18*cm
         
         # Données du produit
         c.setFont("Helvetica", 11)
@@ -69,7 +69,7 @@ class InvoiceGenerator:
         c.drawString(16*cm, y, f"{total:,.0f} FCFA")
         
         # Signature
-        c.setFont("Helvetica-Italic", 10)
+        c.setFont("Helvetica-Oblique", 10)
         c.drawString(2*cm, 5*cm, "Signature du vendeur:")
         c.drawString(12*cm, 5*cm, "Signature du client:")
         
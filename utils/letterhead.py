@@ -0,0 +1,59 @@
+import zlib
+from reportlab.lib import colors
+from reportlab.lib.units import cm
+from reportlab.lib.pagesizes import A4
+
+class Letterhead:
+    """Static page chrome shared by reports and invoices.
+
+    Chrome repeated on every page (the table header of multi-page reports)
+    is drawn once per document into a PDF form XObject and then stamped,
+    so each page only carries a reference to it. Set `use_forms` to False
+    to draw it directly on every page (the PDF benchmark's baseline).
+    """
+
+    use_forms = True
+
+    @staticmethod
+    def draw_company_header(c):
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(6*cm, 28*cm, "GESTION DES MOTOS")
+
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(6*cm, 27*cm, "NOUHOU BAMMA TOURE")
+
+        c.setFont("Helvetica", 12)
+        c.drawString(6*cm, 26.5*cm, "Vendeur des motos")
+        c.drawString(6*cm, 26*cm, "Tél : +223 77873789 / 90434307 / 83211674")
+        c.drawString(6*cm, 25.5*cm, "Adresse : 5eme Quartier GAO Rep.Du Mali")
+
+    @staticmethod
+    def draw_table_header(c, headers, x_positions, font_size, y=0):
+        # Fond gris pour l'en-tête
+        c.setFillColor(colors.lightgrey)
+        c.rect(2*cm, y-0.5*cm, 17*cm, 0.8*cm, fill=True)
+        c.setFillColor(colors.black)
+
+        # Texte de l'en-tête
+        c.setFont("Helvetica-Bold", font_size)
+        for header, x in zip(headers, x_positions):
+            c.drawString(x, y, header)
+
+    @classmethod
+    def stamp_table_header(cls, c, headers, x_positions, font_size, y):
+        """Draw a grey table header with its baseline at `y`; returns the y of the first row"""
+        if not cls.use_forms:
+            cls.draw_table_header(c, headers, x_positions, font_size, y)
+            return y - 1*cm
+        key = repr((list(headers), [round(x, 2) for x in x_positions], font_size))
+        name = f"table_header_{zlib.crc32(key.encode()):08x}"
+        if not c.hasForm(name):
+            # Drawn around y=0 and positioned with a translation when stamped
+            c.beginForm(name, lowerx=0, lowery=-1*cm, upperx=A4[0], uppery=1*cm)
+            cls.draw_table_header(c, headers, x_positions, font_size)
+            c.endForm()
+        c.saveState()
+        c.translate(0, y)
+        c.doForm(name)
+        c.restoreState()
+        return y - 1*cm
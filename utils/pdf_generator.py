@@ -1,76 +1,123 @@
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
 from reportlab.lib.units import cm
 from datetime import datetime
+from utils.instrumentation import timed
+from utils.letterhead import Letterhead
+
+REPORT_HEADERS = ['Date', 'Moto', 'Client', 'Quantité', 'Prix unitaire', 'Total']
+REPORT_COLUMNS = [2*cm, 4*cm, 8*cm, 12*cm, 14*cm, 16*cm]
 
 class PDFGenerator:
     @staticmethod
-    def generate_sales_report(date: datetime, sales_data: list) -> str:
+    def generate_sales_report(date: datetime, sales_data) -> str:
+        """Sales report of a single day"""
         filename = f"rapport_ventes_{date.strftime('%Y%m%d')}.pdf"
-        c = canvas.Canvas(filename, pagesize=A4)
-        
+        return PDFGenerator.generate_sales_report_range(date, date, sales_data, filename)
+
+    @staticmethod
+    @timed('pdf.sales_report')
+    def generate_sales_report_range(start: datetime, end: datetime, sales, filename: str = None) -> str:
+        """Sales report over an inclusive date range.
+
+        `sales` may be any iterable of sale dicts ordered by date, typically
+        InventoryManager.iter_sales(): rows are drawn as they arrive, with a
+        subtotal whenever the day changes and a per-model summary at the
+        end, so the rows never have to be held in memory at once.
+        """
+        if filename is None:
+            filename = f"rapport_ventes_{start.strftime('%Y%m%d')}_{end.strftime('%Y%m%d')}.pdf"
+        c = canvas.Canvas(filename, pagesize=A4, pageCompression=1)
+
         # En-tête
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(6*cm, 28*cm, "GESTION DES MOTOS")
-        
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(6*cm, 27*cm, "NOUHOU BAMMA TOURE")
-        
-        c.setFont("Helvetica", 12)
-        c.drawString(6*cm, 26.5*cm, "Vendeur des motos")
-        c.drawString(6*cm, 26*cm, "Tél : +223 77873789 / 90434307 / 83211674")
-        c.drawString(6*cm, 25.5*cm, "Adresse : 5eme Quartier GAO Rep.Du Mali")
-        
+        Letterhead.draw_company_header(c)
+
         c.setFont("Helvetica-Bold", 12)
         c.drawString(2*cm, 24*cm, "RAPPORT DES VENTES")
-        c.drawString(2*cm, 23.5*cm, f"Date: {date.strftime('%d/%m/%Y')}")
-        
-        # Tableau
+        if start == end:
+            c.drawString(2*cm, 23.5*cm, f"Date: {start.strftime('%d/%m/%Y')}")
+        else:
+            c.drawString(2*cm, 23.5*cm, f"Période: du {start.strftime('%d/%m/%Y')} au {end.strftime('%d/%m/%Y')}")
+
+        # Tableau : l'en-tête est répété en haut de chaque page, il est donc
+        # dessiné une seule fois dans un formulaire puis estampillé
         def draw_table_header(y):
-            headers = ['Date', 'Moto', 'Client', 'Quantité', 'Prix unitaire', 'Total']
-            x_positions = [2*cm, 4*cm, 8*cm, 12*cm, 14*cm, 16*cm]
-            
-            # Fond gris pour l'en-tête
-            c.setFillColor(colors.lightgrey)
-            c.rect(2*cm, y-0.5*cm, 17*cm, 0.8*cm, fill=True)
-            c.setFillColor(colors.black)
-            
-            # Texte de l'en-tête
+            return Letterhead.stamp_table_header(c, REPORT_HEADERS, REPORT_COLUMNS, 10, y)
+
+        def ensure_room(y, header=True):
+            """Nouvelle page si on arrive en bas de celle-ci"""
+            if y >= 4*cm:
+                return y
+            c.showPage()
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(2*cm, 28*cm, "RAPPORT DES VENTES (suite)")
+            y = draw_table_header(26*cm) if header else 26*cm
+            c.setFont("Helvetica", 10)
+            return y
+
+        def draw_day_total(y, day, quantity, total):
+            y = ensure_room(y)
             c.setFont("Helvetica-Bold", 10)
-            for header, x in zip(headers, x_positions):
-                c.drawString(x, y, header)
-            
+            c.drawString(8*cm, y, f"Sous-total {day}")
+            c.drawString(12*cm, y, str(quantity))
+            c.drawString(16*cm, y, f"{total:,.0f}")
+            c.setFont("Helvetica", 10)
             return y - 1*cm
-        
+
         y = draw_table_header(22*cm)
         total_general = 0
-        
+        multi_day = start != end
+        current_day = None
+        day_quantity = day_total = 0
+        by_model = {}
+
         # Contenu du tableau
         c.setFont("Helvetica", 10)
-        for sale in sales_data:
-            if y < 4*cm:  # Nouvelle page
-                c.showPage()
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(2*cm, 28*cm, "RAPPORT DES VENTES (suite)")
-                y = draw_table_header(26*cm)
-                c.setFont("Helvetica", 10)
-            
-            c.drawString(2*cm, y, sale['date'])
+        for sale in sales:
+            day = str(sale['date'])[:10]
+            if multi_day and current_day is not None and day != current_day:
+                y = draw_day_total(y, current_day, day_quantity, day_total)
+                day_quantity = day_total = 0
+            current_day = day
+
+            y = ensure_room(y)
+            c.drawString(2*cm, y, str(sale['date']))
             c.drawString(4*cm, y, sale['motorcycle'])
             c.drawString(8*cm, y, sale['client'])
             c.drawString(12*cm, y, str(sale['quantity']))
             c.drawString(14*cm, y, f"{sale['price']:,.0f}")
             c.drawString(16*cm, y, f"{sale['total']:,.0f}")
-            
+
             total_general += sale['total']
+            day_quantity += sale['quantity']
+            day_total += sale['total']
+            model = by_model.setdefault(sale['motorcycle'], [0, 0])
+            model[0] += sale['quantity']
+            model[1] += sale['total']
             y -= 0.8*cm
-        
+
+        if multi_day and current_day is not None:
+            y = draw_day_total(y, current_day, day_quantity, day_total)
+
+        # Récapitulatif par modèle
+        if multi_day and by_model:
+            y = ensure_room(y - 0.5*cm, header=False)
+            c.setFont("Helvetica-Bold", 11)
+            c.drawString(2*cm, y, "TOTAL PAR MODÈLE")
+            y -= 0.8*cm
+            c.setFont("Helvetica", 10)
+            for name, (quantity, total) in sorted(by_model.items()):
+                y = ensure_room(y, header=False)
+                c.drawString(4*cm, y, name)
+                c.drawString(12*cm, y, str(quantity))
+                c.drawString(16*cm, y, f"{total:,.0f}")
+                y -= 0.8*cm
+
         # Total général
-        y -= 1*cm
+        y = ensure_room(y - 1*cm, header=False)
         c.setFont("Helvetica-Bold", 11)
         c.drawString(12*cm, y, "TOTAL GÉNÉRAL:")
         c.drawString(16*cm, y, f"{total_general:,.0f} FCFA")
-        
+
         c.save()
-        return filename
\ No newline at end of file
+        return filename
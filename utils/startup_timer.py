@@ -0,0 +1,71 @@
+import builtins
+import sys
+import time
+
+class StartupTimer:
+    """Measures time-to-first-window and which imports it is spent in.
+
+    mark() records named phases; while enabled, every first import of a
+    module is timed as well, with self and cumulative times in the spirit
+    of `python -X importtime`.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.phases = []
+        self.imports = []
+        self._last = self.start
+        self._stack = []
+        self._original_import = None
+        if enabled:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports.append((name, elapsed - children, elapsed, len(self._stack)))
+
+    def mark(self, phase):
+        """Close the current phase under the name `phase`"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, now - self.start))
+        self._last = now
+
+    def stop(self):
+        """Stop timing imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def as_dict(self):
+        return {
+            'phases': [{'phase': p, 'seconds': d, 'cumulative': c} for p, d, c in self.phases],
+            'imports': [{'module': m, 'self': s, 'cumulative': c, 'depth': d}
+                        for m, s, c, d in self.imports],
+        }
+
+    def report(self, top=15):
+        """Text breakdown: phases, then the slowest imports"""
+        lines = ["Startup timing:"]
+        for phase, duration, cumulative in self.phases:
+            lines.append(f"  {phase:<28} {duration * 1000:8.1f} ms  (total {cumulative * 1000:8.1f} ms)")
+        slowest = sorted(self.imports, key=lambda i: i[2], reverse=True)[:top]
+        if slowest:
+            lines.append("Slowest imports (self | cumulative):")
+            for module, own, cumulative, depth in slowest:
+                lines.append(f"  {own * 1e6:9.0f} us | {cumulative * 1e6:9.0f} us | {'  ' * depth}{module}")
+        return "\n".join(lines)